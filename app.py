@@ -1,21 +1,29 @@
-from flask import Flask, render_template, request, jsonify, Response, stream_with_context, session
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context, session, redirect
 import requests
-from bs4 import BeautifulSoup
+import json
 import time
 import re
-import json
 from datetime import datetime, timedelta
 from dateutil.parser import parse
 import urllib3
 import os
 import traceback
 import random
-from werkzeug.utils import secure_filename
 import PyPDF2
-import docx
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import uuid
+import queue
+import threading
+from scrapers import http_client, fetch_engine, html_parser, seek_state, prosple_data, rate_limiter, listing_pages
+from job_store import JobStore, search_key, make_job_id, canonical_link, card_fingerprint, frontier_scope, \
+    SORT_ORDERS, EQUALITY_FILTERS, encode_cursor, decode_cursor
+from job_dedup import Deduplicator
+from refresh_scheduler import RefreshScheduler, DEFAULT_INTERVAL, DEFAULT_TOP_N
+from search_cache import SearchCache, FRESH, STALE, search_ttl
+from search_events import ProgressEvent, MessageEvent, WarningEvent, ErrorEvent, ResultBatch, SourceComplete, SearchComplete
+import search_stream
+from resume_matcher import ResumeMatcher
+from resume_text import ResumeTextExtractor, ResumeTextError
+from resume_advisor import ResumeAdvisor
+from llm_queue import GenerationQueue, QueueFull, INTERACTIVE, BATCH
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -23,25 +31,177 @@ app = Flask(__name__)
 app.secret_key = os.urandom(24)  # Add a secret key for session management
 
 # Add these constants at the top of the file
-UPLOAD_FOLDER = 'uploads'
-ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx'}
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+# Resume formats resume_text can read
+ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'rtf', 'txt'}
+# Largest request body accepted, which bounds resume uploads; resumes are read in memory
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_BYTES', 10 * 1024 * 1024))
+
+# Parallel job detail fetches allowed against GradConnection
+app.config['GRADCONNECTION_CONCURRENCY'] = int(os.environ.get('GRADCONNECTION_CONCURRENCY', 6))
+# Ceiling for the adaptive request rate against Prosple, which blocks aggressive clients
+app.config['PROSPLE_MAX_RATE'] = float(os.environ.get('PROSPLE_MAX_RATE', 1.0))
+# Popular searches are re-scraped this often so they stay fresh in the search cache
+app.config['REFRESH_INTERVAL'] = DEFAULT_INTERVAL
+app.config['REFRESH_TOP_N'] = DEFAULT_TOP_N
+# 'thread' runs the refresh scheduler inside the app; use 'off' when running refresh_scheduler.py as a sidecar
+app.config['REFRESH_SCHEDULER'] = os.environ.get('REFRESH_SCHEDULER', 'thread')
+# Results returned per page by /api/jobs and /search-results, and the most a client may ask for
+app.config['RESULTS_PAGE_SIZE'] = int(os.environ.get('RESULTS_PAGE_SIZE', 50))
+app.config['MAX_RESULTS_PAGE_SIZE'] = 200
+# Jobs returned by /match-resume unless the client asks for another number
+app.config['RESUME_MATCHES'] = 20
+# Most jobs one /analyze-resumes request may ask about
+app.config['MAX_BATCH_ANALYSES'] = int(os.environ.get('MAX_BATCH_ANALYSES', 20))
+
+# Keep the number of parallel detail fetches against GradConnection polite. Set once: every
+# search shares the same per-host limit
+fetch_engine.set_host_limit('au.gradconnection.com', app.config['GRADCONNECTION_CONCURRENCY'])
+
+# Every Prosple request is paced by the shared rate limiter, which backs off on 403/429. Configured
+# once: configuring it again would reset the rate it lowered after being throttled
+rate_limiter.configure('au.prosple.com', rate=min(rate_limiter.DEFAULT_RATE, app.config['PROSPLE_MAX_RATE']),
+                       max_rate=app.config['PROSPLE_MAX_RATE'])
+
+# Persistent store shared by every scraper and route
+job_store = JobStore()
+
+# Complete result sets of recent searches, served before scraping again
+search_cache = SearchCache(job_store)
 
-# Create uploads directory if it doesn't exist
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+# TF-IDF index of every stored job, for ranking jobs against an uploaded resume
+resume_matcher = ResumeMatcher(job_store)
 
-# Global variable to store jobs
-all_jobs = []
+# Resume text, extracted in worker processes and cached by file content
+resume_extractor = ResumeTextExtractor()
+
+# LLM resume suggestions, streamed from Ollama and cached once complete
+resume_advisor = ResumeAdvisor(job_store)
+
+# Every analysis waits here for a free model slot, single ones ahead of batches
+generation_queue = GenerationQueue(resume_advisor)
 
 class CustomError(Exception):
     pass
 
 def add_job_id(job):
-    job_id = str(uuid.uuid4())
-    job['id'] = job_id
-    print(f"Generated job ID: {job_id} for {job.get('title', 'Untitled')} at {job.get('company', 'Unknown Company')}")
+    job['id'] = make_job_id(job)
     return job
 
+def parse_grad_connection_job(content, job_link, current_url):
+    """Extract job data from a GradConnection job details page, or None for skipped companies"""
+    job_soup = html_parser.parse(content)
+
+    # Extract job details
+    job_type = None
+    disciplines = None
+    job_location = None
+    international = None
+    closing_date = None
+    position_start_date = None
+    description = None
+    company_info = None
+
+    # Try to find job details with different selectors
+    job_detail = job_soup.find_all('li', class_='box-content-catagories catagories-list')
+    if not job_detail:
+        job_detail = job_soup.select('.job-details li')
+
+    if job_detail:
+        for detail in job_detail:
+            strong_tag = detail.find('strong', class_='box-content-catagories-bold')
+            if not strong_tag:
+                strong_tag = detail.find('strong')
+
+            if strong_tag:
+                strong_text = strong_tag.get_text().strip()
+                detail_text = detail.get_text().strip()
+
+                if "Job type" in strong_text:
+                    job_type = detail_text.replace(strong_text, "").strip()
+                elif "Disciplines" in strong_text:
+                    disciplines = detail_text.replace(strong_text, "").strip()
+                elif "Locations" in strong_text:
+                    location_text = detail_text.replace(strong_text, "").strip()
+                    if "show more" in location_text:
+                        job_location = location_text.replace("...show more", "").strip()
+                    else:
+                        job_location = location_text
+                elif "ACCEPTS INTERNATIONAL" in strong_text:
+                    international = "Yes"
+                elif "Closing Date" in strong_text:
+                    closing_date_text = detail_text.replace(strong_text, "").strip()
+                    try:
+                        closing_date = parse(closing_date_text)
+                        closing_date = closing_date.strftime("%Y-%m-%d")
+                    except:
+                        closing_date = closing_date_text
+                elif "Position Start Date" in strong_text:
+                    position_start_date = detail_text.replace(strong_text, "").strip()
+
+    # Extract job description
+    description_elem = job_soup.find('div', class_='job-description')
+    if not description_elem:
+        description_elem = job_soup.select_one('.description, .job-details, .opportunity-description')
+    if description_elem:
+        description = description_elem.get_text().strip()
+
+    # Extract company information
+    company_info_elem = job_soup.find('div', class_='employer-profile')
+    if not company_info_elem:
+        company_info_elem = job_soup.select_one('.company-profile, .employer-details')
+    if company_info_elem:
+        company_info = company_info_elem.get_text().strip()
+
+    # Try different selectors for company name and job title
+    company_name_elem = job_soup.find('h1', class_='employers-panel-title')
+    if not company_name_elem:
+        company_name_elem = job_soup.select_one('.company-name')
+
+    program_name_elem = job_soup.find('h1', class_='employers-profile-h1')
+    if not program_name_elem:
+        program_name_elem = job_soup.select_one('.job-title')
+
+    # If we still don't have a job title, try to extract from the URL or page title
+    if not program_name_elem:
+        page_title = job_soup.find('title')
+        if page_title:
+            program_name = page_title.get_text().split(' | ')[0].strip()
+        else:
+            program_name = job_link.split('/')[-1].replace('-', ' ').title()
+    else:
+        program_name = program_name_elem.get_text().strip()
+
+    # If we still don't have a company name, extract from the page or URL
+    if not company_name_elem:
+        company_meta = job_soup.find('meta', property='og:site_name')
+        if company_meta:
+            company_name = company_meta.get('content', 'Unknown Company')
+        else:
+            company_name = job_link.split('/')[3].replace('-', ' ').title()
+    else:
+        company_name = company_name_elem.get_text().strip()
+
+    # Skip certain companies
+    if company_name.lower() in ["readygrad", "gradconnection", "careerdc", "premium graduate placements"]:
+        return None
+
+    job_data = {
+        'title': program_name,
+        'company': company_name,
+        'link': current_url,
+        'job_type': job_type,
+        'disciplines': disciplines,
+        'location': job_location,
+        'international': international,
+        'position_start_date': position_start_date,
+        'closing_date': closing_date,
+        'description': description,
+        'company_info': company_info,
+        'source': 'GradConnection'
+    }
+    return job_data
+
+
 def grad_connection_scrape(job_level, discipline, location="australia"):
     """Scrape job listings from GradConnection"""
     # Set headers to mimic a browser visit
@@ -55,63 +215,46 @@ def grad_connection_scrape(job_level, discipline, location="australia"):
 
     base_url = f'https://au.gradconnection.com/{job_level}/{discipline}/{location}/'
     local_url = 'https://au.gradconnection.com'
-    page_num = 1
     jobs_list = []
-    max_pages = 10  # Increased limit (will continue until no more jobs or pages found)
+    max_pages = 10  # Upper bound on listing pages, whatever the pagination says
     total_jobs_found = 0
     current_progress = 0
-    last_page_count = -1  # Track the number of jobs on the last page to detect the end
+    pages_done = 0
+    seen_links = set()  # Sponsored listings repeat on every page
+    scope = frontier_scope(job_level, discipline, location)
 
-    while page_num <= max_pages:
-        # Construct the URL for the current page
-        if page_num == 1:
-            url = f"{base_url}"
-        else:
-            url = f"{base_url}?page={page_num}"
+    # Page 1 tells us how many pages there are; the rest are then fetched together
+    yield ProgressEvent(current_progress, "Connecting to GradConnection page 1...")
+    pages = listing_pages.ListingPages(
+        lambda page: fetch_engine.FetchRequest(listing_pages.page_url(base_url, page), headers=headers, verify=False,
+                                               timeout=30, context=page, content_class='listing'),
+        max_pages)
 
-        # Send a GET request with increased timeout and retries
-        max_retries = 3
-        retry_count = 0
-        success = False
-        
-        while retry_count < max_retries and not success:
-            try:
-                yield json.dumps({"progress": current_progress, "status": f"Connecting to GradConnection page {page_num}..."})
-                response = requests.get(url, headers=headers, verify=False, timeout=30)  # Increased timeout to 30 seconds
-                
-                # Break the loop if the request failed
-                if response.status_code != 200:
-                    print(f"Failed to retrieve page {page_num}. Status code: {response.status_code}")
-                    yield json.dumps({"warning": f"Failed to retrieve GradConnection page {page_num}. Status code: {response.status_code}"})
-                    break
-                
-                success = True
-                
-            except requests.exceptions.Timeout:
-                retry_count += 1
-                if retry_count < max_retries:
-                    yield json.dumps({"warning": f"Timeout connecting to GradConnection, retrying (attempt {retry_count}/{max_retries})..."})
-                    time.sleep(2 * retry_count)  # Exponential backoff
-                    continue
-                else:
-                    yield json.dumps({"error": "Failed to connect to GradConnection after multiple attempts"})
-                    return jobs_list
-            except Exception as e:
-                print(f"Error accessing GradConnection: {str(e)}")
-                yield json.dumps({"error": f"Error accessing GradConnection: {str(e)}"})
+    for page_num, response in pages:
+        if response.error is not None:
+            print(f"Error accessing GradConnection: {str(response.error)}")
+            yield ErrorEvent(f"Failed to connect to GradConnection page {page_num} after {response.attempts} attempts: {str(response.error)}")
+            if page_num == 1:
                 return jobs_list
+            continue
         
-        if not success:
-            return jobs_list
+        if response.status_code != 200:
+            print(f"Failed to retrieve page {page_num}. Status code: {response.status_code}")
+            yield WarningEvent(f"Failed to retrieve GradConnection page {page_num}. Status code: {response.status_code}")
+            if page_num == 1:
+                return jobs_list
+            continue
             
-        # Parse the HTML content
-        soup = BeautifulSoup(response.content, 'html.parser')
+        # Parse only the listing cards and pagination
+        soup = html_parser.parse(response.content, parse_only=html_parser.GRADCONNECTION_LISTING)
         
         # Find all job listings - try different selectors as the site might have changed
         job_listings = soup.find_all('a', class_='box-header-title')
         
         # If no jobs found with the primary selector, try alternative selectors
         if not job_listings:
+            # The alternative selectors need the whole document
+            soup = html_parser.parse(response.content)
             # Try other potential selectors
             job_listings = soup.find_all('a', class_='job-title')
             if not job_listings:
@@ -121,213 +264,216 @@ def grad_connection_scrape(job_level, discipline, location="australia"):
             if not job_listings:
                 job_listings = soup.select('a[href*="/job/"]')
         
+        # An empty page means the results ended before it
         if not job_listings:
             print(f"No job listings found on page {page_num} using any selector.")
-            yield json.dumps({"warning": f"No job listings found on GradConnection page {page_num}."})
-            break
+            yield WarningEvent(f"No job listings found on GradConnection page {page_num}.")
+            pages.end_at(page_num - 1)
+            continue
         
-        # Check if we've reached the last page (no new jobs)
-        if len(job_listings) == 0 or (last_page_count == len(job_listings) and page_num > 1):
-            print(f"No more job listings found after page {page_num-1}.")
-            yield json.dumps({"warning": f"No more job listings found after GradConnection page {page_num-1}."})
-            break
+        # Request every page the pagination links to before working through this one
+        pages.extend(listing_pages.highest_page_number(soup.select('.pagination a')))
         
-        last_page_count = len(job_listings)
         total_jobs_found += len(job_listings)
-        yield json.dumps({"progress": current_progress, "status": f"Found {len(job_listings)} jobs on GradConnection page {page_num}"})
+        yield ProgressEvent(current_progress, f"Found {len(job_listings)} jobs on GradConnection page {page_num}")
         
-        # Extract details for each job
-        job_index = 0
+        # Collect the detail page URLs for this page, keyed by canonical link so
+        # overlapping selectors and repeated listings can't queue the same posting twice
+        cards = {}
         for job in job_listings:
-            job_index += 1
-            current_progress = ((page_num - 1) * len(job_listings) + job_index) / (total_jobs_found * 1.5) * 50
-            yield json.dumps({"progress": current_progress, "status": f"Scraping GradConnection page {page_num}, job {job_index}/{len(job_listings)}"})
-            
             # Get the job URL - handle different element structures
             job_link = None
             if job.has_attr('href'):
                 job_link = str(job.get('href'))
             
-            if not job_link:
+            if not job_link or "notifyme" in job_link:
                 continue
             
-            if not "notifyme" in job_link:
-                # Ensure the URL is absolute
-                if job_link.startswith('/'):
-                    current_url = local_url + job_link
-                elif job_link.startswith('http'):
-                    current_url = job_link
-                else:
-                    current_url = local_url + '/' + job_link
-                
-                try:
-                    # Fetch job details with increased timeout and retries
-                    max_retries = 3
-                    retry_count = 0
-                    job_response = None
-                    
-                    while retry_count < max_retries and not job_response:
-                        try:
-                            job_response = requests.get(current_url, headers=headers, verify=False, timeout=30)
-                            if job_response.status_code != 200:
-                                print(f"Failed to retrieve job details. Status code: {job_response.status_code}")
-                                break
-                        except requests.exceptions.Timeout:
-                            retry_count += 1
-                            if retry_count < max_retries:
-                                time.sleep(2 * retry_count)
-                                continue
-                            else:
-                                print(f"Failed to retrieve job details after {max_retries} attempts")
-                                break
-                    
-                    if not job_response:
-                        continue
-                        
-                    job_soup = BeautifulSoup(job_response.content, 'html.parser')
-
-                    # Extract job details
-                    job_type = None
-                    disciplines = None
-                    job_location = None
-                    international = None
-                    closing_date = None
-                    position_start_date = None
-                    description = None
-                    company_info = None
-                    
-                    # Try to find job details with different selectors
-                    job_detail = job_soup.find_all('li', class_='box-content-catagories catagories-list')
-                    if not job_detail:
-                        job_detail = job_soup.select('.job-details li')
-                    
-                    if job_detail:
-                        for detail in job_detail:
-                            strong_tag = detail.find('strong', class_='box-content-catagories-bold')
-                            if not strong_tag:
-                                strong_tag = detail.find('strong')
-                            
-                            if strong_tag:
-                                strong_text = strong_tag.get_text().strip()
-                                detail_text = detail.get_text().strip()
-                                
-                                if "Job type" in strong_text:
-                                    job_type = detail_text.replace(strong_text, "").strip()
-                                elif "Disciplines" in strong_text:
-                                    disciplines = detail_text.replace(strong_text, "").strip()
-                                elif "Locations" in strong_text:
-                                    location_text = detail_text.replace(strong_text, "").strip()
-                                    if "show more" in location_text:
-                                        job_location = location_text.replace("...show more", "").strip()
-                                    else:
-                                        job_location = location_text
-                                elif "ACCEPTS INTERNATIONAL" in strong_text:
-                                    international = "Yes"
-                                elif "Closing Date" in strong_text:
-                                    closing_date_text = detail_text.replace(strong_text, "").strip()
-                                    try:
-                                        closing_date = parse(closing_date_text)
-                                        closing_date = closing_date.strftime("%Y-%m-%d")
-                                    except:
-                                        closing_date = closing_date_text
-                                elif "Position Start Date" in strong_text:
-                                    position_start_date = detail_text.replace(strong_text, "").strip()
-                    
-                    # Extract job description
-                    description_elem = job_soup.find('div', class_='job-description')
-                    if not description_elem:
-                        description_elem = job_soup.select_one('.description, .job-details, .opportunity-description')
-                    if description_elem:
-                        description = description_elem.get_text().strip()
-                    
-                    # Extract company information
-                    company_info_elem = job_soup.find('div', class_='employer-profile')
-                    if not company_info_elem:
-                        company_info_elem = job_soup.select_one('.company-profile, .employer-details')
-                    if company_info_elem:
-                        company_info = company_info_elem.get_text().strip()
-                    
-                    # Try different selectors for company name and job title
-                    company_name_elem = job_soup.find('h1', class_='employers-panel-title')
-                    if not company_name_elem:
-                        company_name_elem = job_soup.select_one('.company-name')
-                    
-                    program_name_elem = job_soup.find('h1', class_='employers-profile-h1')
-                    if not program_name_elem:
-                        program_name_elem = job_soup.select_one('.job-title')
-                    
-                    # If we still don't have a job title, try to extract from the URL or page title
-                    if not program_name_elem:
-                        page_title = job_soup.find('title')
-                        if page_title:
-                            program_name = page_title.get_text().split(' | ')[0].strip()
-                        else:
-                            program_name = job_link.split('/')[-1].replace('-', ' ').title()
-                    else:
-                        program_name = program_name_elem.get_text().strip()
-                    
-                    # If we still don't have a company name, extract from the page or URL
-                    if not company_name_elem:
-                        company_meta = job_soup.find('meta', property='og:site_name')
-                        if company_meta:
-                            company_name = company_meta.get('content', 'Unknown Company')
-                        else:
-                            company_name = job_link.split('/')[3].replace('-', ' ').title()
-                    else:
-                        company_name = company_name_elem.get_text().strip()
-                    
-                    # Skip certain companies
-                    if company_name.lower() not in ["readygrad", "gradconnection", "careerdc", "premium graduate placements"]:
-                        job_data = {
-                            'title': program_name,
-                            'company': company_name,
-                            'link': current_url,
-                            'job_type': job_type,
-                            'disciplines': disciplines,
-                            'location': job_location,
-                            'international': international,
-                            'position_start_date': position_start_date,
-                            'closing_date': closing_date,
-                            'description': description,
-                            'company_info': company_info,
-                            'source': 'GradConnection'
-                        }
-                        # Add job ID before adding to list
-                        job_data = add_job_id(job_data)
-                        jobs_list.append(job_data)
-                        yield json.dumps({"results": [job_data]})
-                except Exception as e:
-                    print(f"Error processing job: {str(e)}")
-                    traceback.print_exc()
-                
-                # Add a small delay to be respectful
-                time.sleep(0.5)
-        
-        # Check if we've reached the pagination limit or the end of the job listings
-        pagination = soup.select('.pagination a')
-        max_page_found = False
-        for page_link in pagination:
+            # Ensure the URL is absolute
+            if job_link.startswith('/'):
+                current_url = local_url + job_link
+            elif job_link.startswith('http'):
+                current_url = job_link
+            else:
+                current_url = local_url + '/' + job_link
+            link_key = canonical_link(current_url)
+            if link_key not in seen_links:
+                seen_links.add(link_key)
+                card = job.find_parent(class_='box') or job
+                cards[link_key] = (job_link, current_url, card_fingerprint(card.get_text(' ')))
+
+        # Reuse postings whose listing card hasn't changed since they were last scraped
+        changed, known = job_store.frontier_diff('GradConnection', scope, {key: card[2] for key, card in cards.items()})
+        page_jobs = []
+        for link_key, entry in known.items():
+            stored = job_store.get_job(entry['job_id']) if entry['job_id'] else None
+            if stored:
+                # Cross-source merges are redone for every search
+                stored.pop('also_on', None)
+                page_jobs.append(stored)
+            elif entry['job_id']:
+                # Known link but the job itself is gone from the store
+                changed.append(link_key)
+        if page_jobs:
+            yield ProgressEvent(current_progress, f"{len(page_jobs)} jobs on GradConnection page {page_num} are unchanged")
+
+        detail_requests = [fetch_engine.FetchRequest(cards[link_key][1], headers=headers, verify=False, timeout=30, context=link_key, content_class='detail')
+                           for link_key in changed]
+
+        # Fetch the new and changed detail pages concurrently (bounded per host by
+        # the fetch engine) and parse each one as soon as it arrives
+        frontier_updates = []
+        job_index = 0
+        for job_response in fetch_engine.iter_fetch(detail_requests):
+            job_index += 1
+            current_progress = pages.fraction(pages_done + job_index / len(detail_requests)) * 50
+            yield ProgressEvent(current_progress, f"Scraping GradConnection page {page_num}, job {job_index}/{len(detail_requests)}")
+
+            if not job_response.ok:
+                print(f"Failed to retrieve job details after {job_response.attempts} attempts: {job_response.error or job_response.status_code}")
+                continue
+
+            job_link, current_url, fingerprint = cards[job_response.context]
             try:
-                page_number = int(page_link.text.strip())
-                if page_number > max_pages:
-                    max_pages = page_number
-                    max_page_found = True
-            except ValueError:
-                pass
-        
-        # If no higher page number is found, we might be at the last page
-        if not max_page_found and page_num >= max_pages:
-            print(f"Reached the last available page: {page_num}")
-            yield json.dumps({"warning": f"Reached the last available GradConnection page: {page_num}"})
-            break
-            
-        # Increment page number and add a delay
-        page_num += 1
-        time.sleep(1)
+                job_data = parse_grad_connection_job(job_response.content, job_link, job_response.request.url)
+                if job_data:
+                    # Add job ID before adding to list
+                    page_jobs.append(add_job_id(job_data))
+                frontier_updates.append((job_response.context, fingerprint, job_data['id'] if job_data else None, None))
+            except Exception as e:
+                print(f"Error processing job: {str(e)}")
+                traceback.print_exc()
+        job_store.update_frontier('GradConnection', scope, frontier_updates)
+        pages_done += 1
+        current_progress = pages.fraction(pages_done) * 50
+
+        # Send the whole page of results as soon as it is complete
+        if page_jobs:
+            jobs_list.extend(page_jobs)
+            yield ResultBatch(page_jobs, progress=current_progress)
 
-    yield json.dumps({"progress": 50, "status": "Completed GradConnection scraping", "results": jobs_list})
+    print(f"Scraped {pages_done} GradConnection pages ({total_jobs_found} listings)")
+
+    yield SourceComplete(jobs_list, "Completed GradConnection scraping")
     return jobs_list
 
+def seek_job_from_state(listing):
+    """Map a listing from Seek's embedded search state to our job fields"""
+    return {
+        'title': listing['title'],
+        'company': listing['company'] or "Not specified",
+        'link': listing['link'],
+        'location': listing['location'],
+        'date_posted': listing['listing_date_display'] or listing['listing_date'],
+        'listing_date': listing['listing_date'],
+        'salary': listing['salary'],
+        'job_type': listing['job_type'],
+        'source': 'Seek'
+    }
+
+def parse_seek_card(job, local_url):
+    """Extract job data from a Seek result card (the fallback when a page has no embedded state)"""
+    # Try different ways to get the job title
+    title_elem = job.find('a', {'data-automation': 'jobTitle'})
+    if not title_elem:
+        title_elem = job.find('a', class_=lambda x: x and 'title' in x.lower())
+    if not title_elem:
+        title_elem = job.select_one('h3, h2, h1')
+    
+    title = title_elem.get_text().strip() if title_elem else "Untitled Position"
+    
+    # Try different ways to get the job URL
+    url_elem = title_elem if title_elem and title_elem.name == 'a' else job.find('a')
+    if url_elem and url_elem.has_attr('href'):
+        url_extra = url_elem['href']
+        # Make sure we have an absolute URL
+        if url_extra.startswith('/'):
+            url_new = local_url + url_extra
+        elif url_extra.startswith('http'):
+            url_new = url_extra
+        else:
+            url_new = local_url + '/' + url_extra
+    else:
+        # Try to find any link in the job card
+        links = job.find_all('a')
+        if links:
+            url_extra = links[0]['href']
+            url_new = local_url + url_extra if url_extra.startswith('/') else url_extra
+        else:
+            # If we can't find a link, skip this job
+            return None
+    
+    # Try different ways to get the company name
+    company = job.find('a', {'data-automation': 'jobCompany'}) or job.find('a', {'data-type': 'company'})
+    if not company:
+        company = job.select_one('.company-name, .job-company, [data-automation="jobCompany"]')
+    
+    company_name = company.get_text().strip() if company else "Not specified"
+    
+    # Try different ways to get the location
+    location_elem = job.find('span', {'data-automation': 'jobLocation'})
+    if not location_elem:
+        location_elem = job.select_one('.location, .job-location, [data-automation="jobLocation"]')
+    location_text = location_elem.get_text().strip() if location_elem else None
+    
+    # Try different ways to get the date posted
+    date_elem = job.find('span', {'data-automation': 'jobListingDate'})
+    if not date_elem:
+        date_elem = job.select_one('.date, .listing-date, [data-automation="jobListingDate"]')
+    date_text = date_elem.get_text().strip() if date_elem else None
+    
+    # Try different ways to get the job type
+    job_type_elem = job.find('span', {'data-automation': 'jobWorkType'})
+    if not job_type_elem:
+        job_type_elem = job.select_one('.work-type, .job-type, [data-automation="jobWorkType"]')
+    job_type = job_type_elem.get_text().strip() if job_type_elem else None
+    
+    job_data = {
+        'title': title,
+        'company': company_name,
+        'link': url_new,
+        'location': location_text,
+        'date_posted': date_text,
+        'job_type': job_type,
+        'source': 'Seek'
+    }
+    return job_data
+
+def read_seek_page(content):
+    """
+    Find the job listings on a Seek results page.
+
+    Returns (state, listings, soup): listings come from the embedded search state
+    when the page has one (soup is then None), otherwise they are result cards.
+    """
+    # Seek embeds its search results as JSON; only walk the cards when that's missing or unreadable
+    try:
+        state = seek_state.find_state(content)
+        if state is not None:
+            return state, seek_state.listings(state), None
+    except Exception as e:
+        print(f"Could not read Seek's search state, falling back to the result cards: {e}")
+    
+    # Parse only the job cards and pagination
+    soup = html_parser.parse(content, parse_only=html_parser.SEEK_LISTING)
+    
+    # Find all job listings - try different selectors
+    job_listings = soup.find_all('article')
+    
+    # If no jobs found with the primary selector, try alternative selectors
+    if not job_listings:
+        # The alternative selectors need the whole document
+        soup = html_parser.parse(content)
+        job_listings = soup.select('div[data-automation="normalJob"]')
+    if not job_listings:
+        job_listings = soup.select('.job-card')
+    if not job_listings:
+        job_listings = soup.select('a[data-automation="jobTitle"]')
+        # Convert these to a list of parent elements if found
+        if job_listings:
+            job_listings = [link.find_parent('div', class_=lambda x: x and 'job' in x.lower()) for link in job_listings]
+    return None, job_listings, soup
+
 def seek_scrape(job_level, discipline, location="All-Australia"):
     """Scrape job listings from Seek"""
     # Format job level for Seek URL
@@ -358,192 +504,212 @@ def seek_scrape(job_level, discipline, location="All-Australia"):
     ]
     
     local_url = 'https://www.seek.com.au'
-    page_num = 1
-    max_pages = 20  # Increased initial limit (will adjust based on pagination)
+    max_pages = 20  # Upper bound on listing pages, whatever the result count says
     total_jobs_found = 0
-    url_index = 0
-    base_url = url_formats[url_index]
-    last_page_count = -1  # Track the number of jobs on the last page to detect the end
+    pages_done = 0
+    per_page = None
+    seen_links = set()  # Premium listings can repeat across pages
     
-    while page_num <= max_pages:
-        # Try the next URL format if we've already tried this one
-        if page_num == 1 and url_index > 0:
-            base_url = url_formats[url_index]
-        
-        # Construct the URL for the current page
-        if page_num == 1:
-            url = f"{base_url}"
-        else:
-            if '?' in base_url:
-                url = f"{base_url}&page={page_num}"
-            else:
-                url = f"{base_url}?page={page_num}"
+    def page_request(base_url, page):
+        return fetch_engine.FetchRequest(listing_pages.page_url(base_url, page), headers=headers, timeout=15,
+                                         context=page, content_class='listing')
+    
+    # Find a URL format that returns results; its first page tells us how many pages to fetch
+    first = None
+    for url_index, base_url in enumerate(url_formats):
+        yield ProgressEvent(50 + (url_index * 10), f"Connecting to Seek (attempt {url_index + 1})...")
+        response = fetch_engine.fetch(page_request(base_url, 1))
+        if response.error is not None:
+            print(f"Error scraping Seek with URL {base_url}: {str(response.error)}")
+            yield ErrorEvent(f"Error scraping Seek page 1: {str(response.error)}")
+            continue
+        if response.status_code != 200:
+            print(f"Failed to retrieve page with URL {base_url}. Status code: {response.status_code}")
+            continue
+        first_page = read_seek_page(response.content)
+        if first_page[1]:
+            first = response
+            break
+        print(f"No job listings found on page 1 using any selector. URL: {base_url}")
+    
+    if first is None:
+        yield WarningEvent("Failed to retrieve Seek listings with any URL format.")
+        yield SourceComplete(jobs_list, "Completed Seek scraping")
+        return jobs_list
+    
+    pages = listing_pages.ListingPages(lambda page: page_request(base_url, page), max_pages, first=first)
+    for page_num, response in pages:
+        if not response.ok:
+            print(f"Failed to retrieve Seek page {page_num}: {response.error or response.status_code}")
+            yield WarningEvent(f"Failed to retrieve Seek page {page_num}: {response.error or response.status_code}")
+            continue
         
         try:
-            # Send a GET request
-            yield json.dumps({"progress": 50 + (url_index * 10), "status": f"Connecting to Seek (attempt {url_index + 1})..."})
-            response = requests.get(url, headers=headers, timeout=15)
+            state, job_listings, soup = first_page if page_num == 1 else read_seek_page(response.content)
             
-            # If the request failed, try the next URL format
-            if response.status_code != 200:
-                print(f"Failed to retrieve page with URL {url}. Status code: {response.status_code}")
-                url_index += 1
-                if url_index < len(url_formats):
-                    continue
-                else:
-                    yield json.dumps({"warning": f"Failed to retrieve Seek listings with any URL format. Status code: {response.status_code}"})
-                    break
-            
-            # Parse the HTML content
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Find all job listings - try different selectors
-            job_listings = soup.find_all('article')
-            
-            # If no jobs found with the primary selector, try alternative selectors
+            # An empty page means the results ended before it
             if not job_listings:
-                job_listings = soup.select('div[data-automation="normalJob"]')
-            if not job_listings:
-                job_listings = soup.select('.job-card')
-            if not job_listings:
-                job_listings = soup.select('a[data-automation="jobTitle"]')
-                # Convert these to a list of parent elements if found
-                if job_listings:
-                    job_listings = [link.find_parent('div', class_=lambda x: x and 'job' in x.lower()) for link in job_listings]
-            
-            # Check if we've reached the last page (no new jobs or same jobs as previous page)
-            if len(job_listings) == 0 or (last_page_count == len(job_listings) and page_num > 1):
-                print(f"No more job listings found after page {page_num-1}.")
-                yield json.dumps({"warning": f"No more job listings found after Seek page {page_num-1}."})
-                break
-            
-            last_page_count = len(job_listings)
+                print(f"No more job listings found after page {page_num - 1}.")
+                pages.end_at(page_num - 1)
+                continue
             
-            # Break the loop if no jobs found
-            if not job_listings:
-                print(f"No job listings found on page {page_num} using any selector. URL: {url}")
-                url_index += 1
-                if url_index < len(url_formats):
-                    page_num = 1  # Reset page number for new URL format
-                    continue
-                else:
-                    yield json.dumps({"warning": f"No job listings found on Seek page {page_num} using any selector."})
-                    break
+            # The embedded state says exactly how many jobs match; otherwise follow the pagination links
+            per_page = per_page or len(job_listings)
+            if state is not None and seek_state.total_count(state) is not None:
+                pages.extend(listing_pages.pages_for_total(seek_state.total_count(state), per_page))
+            elif soup is not None:
+                pages.extend(listing_pages.highest_page_number(soup.select('a[data-automation="page-link"], .pagination a, a.page-number')))
             
             total_jobs_found += len(job_listings)
-            yield json.dumps({"progress": 50 + (page_num * 5), "status": f"Found {len(job_listings)} jobs on Seek page {page_num}"})
+            yield ProgressEvent(50 + pages.fraction(pages_done) * 50, f"Found {len(job_listings)} jobs on Seek page {page_num}")
             
             # Extract details for each job
             job_index = 0
             for job in job_listings:
                 job_index += 1
-                current_progress = 50 + ((page_num - 1) * len(job_listings) + job_index) / (total_jobs_found * 1.5) * 50  # Seek takes 50% of progress
-                yield json.dumps({"progress": current_progress, "status": f"Scraping Seek page {page_num}, job {job_index}/{len(job_listings)}"})
+                current_progress = 50 + pages.fraction(pages_done + job_index / len(job_listings)) * 50  # Seek takes 50% of progress
+                yield ProgressEvent(current_progress, f"Scraping Seek page {page_num}, job {job_index}/{len(job_listings)}")
                 
                 try:
-                    # Try different ways to get the job title
-                    title_elem = job.find('a', {'data-automation': 'jobTitle'})
-                    if not title_elem:
-                        title_elem = job.find('a', class_=lambda x: x and 'title' in x.lower())
-                    if not title_elem:
-                        title_elem = job.select_one('h3, h2, h1')
-                    
-                    title = title_elem.get_text().strip() if title_elem else "Untitled Position"
-                    
-                    # Try different ways to get the job URL
-                    url_elem = title_elem if title_elem and title_elem.name == 'a' else job.find('a')
-                    if url_elem and url_elem.has_attr('href'):
-                        url_extra = url_elem['href']
-                        # Make sure we have an absolute URL
-                        if url_extra.startswith('/'):
-                            url_new = local_url + url_extra
-                        elif url_extra.startswith('http'):
-                            url_new = url_extra
-                        else:
-                            url_new = local_url + '/' + url_extra
+                    if state is not None:
+                        job_data = seek_job_from_state(job)
                     else:
-                        # Try to find any link in the job card
-                        links = job.find_all('a')
-                        if links:
-                            url_extra = links[0]['href']
-                            url_new = local_url + url_extra if url_extra.startswith('/') else url_extra
-                        else:
-                            # If we can't find a link, skip this job
-                            continue
+                        job_data = parse_seek_card(job, local_url)
                     
-                    # Try different ways to get the company name
-                    company = job.find('a', {'data-automation': 'jobCompany'}) or job.find('a', {'data-type': 'company'})
-                    if not company:
-                        company = job.select_one('.company-name, .job-company, [data-automation="jobCompany"]')
-                    
-                    company_name = company.get_text().strip() if company else "Not specified"
-                    
-                    # Skip certain companies
-                    if company_name.lower() not in ["readygrad", "gradconnection"]:
-                        # Try different ways to get the location
-                        location_elem = job.find('span', {'data-automation': 'jobLocation'})
-                        if not location_elem:
-                            location_elem = job.select_one('.location, .job-location, [data-automation="jobLocation"]')
-                        location_text = location_elem.get_text().strip() if location_elem else None
-                        
-                        # Try different ways to get the date posted
-                        date_elem = job.find('span', {'data-automation': 'jobListingDate'})
-                        if not date_elem:
-                            date_elem = job.select_one('.date, .listing-date, [data-automation="jobListingDate"]')
-                        date_text = date_elem.get_text().strip() if date_elem else None
-                        
-                        # Try different ways to get the job type
-                        job_type_elem = job.find('span', {'data-automation': 'jobWorkType'})
-                        if not job_type_elem:
-                            job_type_elem = job.select_one('.work-type, .job-type, [data-automation="jobWorkType"]')
-                        job_type = job_type_elem.get_text().strip() if job_type_elem else None
-                        
-                        job_data = {
-                            'title': title,
-                            'company': company_name,
-                            'link': url_new,
-                            'location': location_text,
-                            'date_posted': date_text,
-                            'job_type': job_type,
-                            'source': 'Seek'
-                        }
+                    # Skip certain companies and listings already returned by an earlier page
+                    if job_data and job_data['company'].lower() not in ["readygrad", "gradconnection"]:
+                        link_key = canonical_link(job_data['link'])
+                        if link_key in seen_links:
+                            continue
+                        seen_links.add(link_key)
                         # Add job ID before adding to list
                         job_data = add_job_id(job_data)
                         jobs_list.append(job_data)
-                        yield json.dumps({"results": [job_data]})
+                        yield ResultBatch([job_data])
                 except Exception as e:
                     print(f"Error processing Seek job: {str(e)}")
                     traceback.print_exc()
         except Exception as e:
             print(f"Error scraping Seek page {page_num}: {str(e)}")
             traceback.print_exc()
-            yield json.dumps({"error": f"Error scraping Seek page {page_num}: {str(e)}"})
-        
-        # Check for pagination to see if there are more pages
-        pagination = soup.select('a[data-automation="page-link"], .pagination a, a.page-number')
-        max_page_found = False
-        for page_link in pagination:
-            try:
-                page_number = int(''.join(filter(str.isdigit, page_link.text.strip())))
-                if page_number > max_pages:
-                    max_pages = page_number
-                    max_page_found = True
-            except ValueError:
-                pass
-        
-        # If no higher page number is found and we're at the current max, we might be at the last page
-        if not max_page_found and page_num >= max_pages:
-            print(f"Reached the last available page: {page_num}")
-            yield json.dumps({"warning": f"Reached the last available Seek page: {page_num}"})
-            break
-        
-        # Increment page number and add a delay
-        page_num += 1
-        time.sleep(1)
+            yield ErrorEvent(f"Error scraping Seek page {page_num}: {str(e)}")
+        pages_done += 1
+    
+    print(f"Scraped {pages_done} Seek pages ({total_jobs_found} listings)")
     
-    yield json.dumps({"progress": 100, "status": "Completed Seek scraping", "results": jobs_list})
+    yield SourceComplete(jobs_list, "Completed Seek scraping")
     return jobs_list
 
+def prosple_job_from_data(listing, prosple_discipline):
+    """Map a listing from Prosple's structured page data to our job fields"""
+    return {
+        'title': listing['title'],
+        'company': listing['company'] or "Unknown Company",
+        'link': listing['link'],
+        'location': listing['location'],
+        'job_type': listing['job_type'],
+        'closing_date': listing['closing_date'],
+        'date_posted': listing['date_posted'],
+        'salary': listing['salary'],
+        'description': listing['description'],
+        'disciplines': prosple_discipline.replace('-', ' ').title(),
+        'international': None,
+        'source': 'Prosple'
+    }
+
+def prosple_access_wall(soup):
+    """Return 'captcha' or 'login' if a Prosple page is blocking us instead of listing jobs"""
+    captcha_indicators = [
+        soup.select_one('form[action*="captcha"]'),
+        soup.select_one('div[class*="captcha"]'),
+        soup.select_one('img[src*="captcha"]'),
+        soup.select_one('div[class*="recaptcha"]'),
+        soup.find(string=re.compile(r'captcha|robot|verification', re.I))
+    ]
+    if any(captcha_indicators):
+        return 'captcha'
+    
+    login_indicators = [
+        soup.select_one('form[action*="login"]'),
+        soup.select_one('input[name="password"]'),
+        soup.find(string=re.compile(r'please log ?in|sign ?in required', re.I))
+    ]
+    if any(login_indicators):
+        return 'login'
+    return None
+
+def find_prosple_cards(soup):
+    """Find the job cards on a Prosple listing page (the fallback when it has no structured data)"""
+    # Find job listings with multiple selector patterns
+    job_listings = soup.select('.opportunity-list-item, .job-card, .listing-item, article')
+    
+    if not job_listings:
+        job_listings = soup.select('.job-listing, .card, [data-testid="job-card"], .search-result-card')
+    
+    if not job_listings:
+        job_listings = soup.select('a[href*="/job/"], a[href*="/opportunity/"]')
+        # Convert to parent containers for easier processing
+        if job_listings:
+            job_listings = [link.find_parent('div', class_=lambda c: c and ('card' in c or 'job' in c or 'listing' in c)) for link in job_listings if link.find_parent('div')]
+    return job_listings
+
+def parse_prosple_card(job, local_url, prosple_discipline):
+    """Extract job data from a Prosple job card"""
+    # Extract job title
+    title_elem = job.select_one('.job-title, .title, h2, h3, .name')
+    title = title_elem.get_text().strip() if title_elem else "Untitled Position"
+    
+    # Get job URL
+    url_elem = job.select_one('a[href*="/job/"], a[href*="/opportunity/"]') or job.find('a')
+    if not url_elem or not url_elem.has_attr('href'):
+        return None
+        
+    job_url = url_elem['href']
+    if job_url.startswith('/'):
+        job_url = local_url + job_url
+    elif not job_url.startswith('http'):
+        job_url = local_url + '/' + job_url
+    
+    # Get company name
+    company_elem = job.select_one('.company-name, .employer, .organization')
+    company = company_elem.get_text().strip() if company_elem else "Unknown Company"
+    
+    # Get location
+    location_elem = job.select_one('.location, .job-location')
+    job_location = location_elem.get_text().strip() if location_elem else None
+    
+    # Get job type
+    job_type_elem = job.select_one('.job-type, .work-type, .employment-type')
+    job_type = job_type_elem.get_text().strip() if job_type_elem else None
+    
+    # Get closing date
+    closing_date_elem = job.select_one('.closing-date, .deadline')
+    closing_date = None
+    if closing_date_elem:
+        closing_date_text = closing_date_elem.get_text().strip()
+        try:
+            if "closing date" in closing_date_text.lower():
+                date_part = closing_date_text.split(":", 1)[1].strip()
+                closing_date = parse(date_part).strftime("%Y-%m-%d")
+            else:
+                closing_date = parse(closing_date_text).strftime("%Y-%m-%d")
+        except:
+            closing_date = closing_date_text
+    
+    # Add job to results
+    job_data = {
+        'title': title,
+        'company': company,
+        'link': job_url,
+        'location': job_location,
+        'job_type': job_type,
+        'closing_date': closing_date,
+        'disciplines': prosple_discipline.replace('-', ' ').title(),
+        'international': None,
+        'source': 'Prosple'
+    }
+    return job_data
+
 def prosple_scrape(job_level, discipline, location="australia"):
     """Scrape job listings from Prosple with enhanced browser emulation"""
     # Set browser-like headers with more complete parameters
@@ -639,8 +805,8 @@ def prosple_scrape(job_level, discipline, location="australia"):
     last_page_count = -1
     url_index = 0
     
-    # Create a session with request customization
-    session = requests.Session()
+    # Create a session with its own cookies that shares the pooled connections
+    session = http_client.new_session()
     
     # Configure the session with additional parameters
     session.verify = True  # Enable SSL verification
@@ -666,43 +832,35 @@ def prosple_scrape(job_level, discipline, location="australia"):
     
     # Initialize with multiple preparatory requests to establish browser-like behavior
     try:
-        # Add randomized delay and jitter to appear more human-like
-        time.sleep(1 + random.random() * 2)
-        
         # First, visit the main site to get cookies
         initial_headers = headers.copy()
         initial_headers['User-Agent'] = random.choice(user_agents)
         
         # Mimic a user typing the URL directly (no referrer)
         main_url = 'https://au.prosple.com/'
-        session.get(main_url, headers=initial_headers, timeout=20)
-        
-        # Simulate navigation through the site
-        time.sleep(2 + random.random() * 3)  # Human-like delay
+        http_client.get(main_url, session=session, headers=initial_headers, timeout=20)
         
         # Visit the about page as a typical user might do
         about_headers = initial_headers.copy()
         about_headers['Referer'] = main_url
-        session.get('https://au.prosple.com/about', headers=about_headers, timeout=20)
+        http_client.get('https://au.prosple.com/about', session=session, headers=about_headers, timeout=20)
         
         # Visit the employers page
-        time.sleep(1.5 + random.random() * 2)  # Variable delay
         employer_headers = about_headers.copy()
         employer_headers['Referer'] = 'https://au.prosple.com/about'
-        session.get('https://au.prosple.com/employers', headers=employer_headers, timeout=20)
+        http_client.get('https://au.prosple.com/employers', session=session, headers=employer_headers, timeout=20)
         
         # Add other common pages a real user might visit
         for page in ['help', 'contact', 'industries']:
             if random.random() > 0.5:  # Don't always visit every page (more realistic)
-                time.sleep(1 + random.random() * 2)
                 page_headers = headers.copy()
                 page_headers['User-Agent'] = random.choice(user_agents)
                 page_headers['Referer'] = f'https://au.prosple.com/{random.choice(["about", "employers", ""])}'
-                session.get(f'https://au.prosple.com/{page}', headers=page_headers, timeout=20)
+                http_client.get(f'https://au.prosple.com/{page}', session=session, headers=page_headers, timeout=20)
         
     except Exception as e:
         print(f"Error initializing session: {str(e)}")
-        yield json.dumps({"warning": f"Error initializing session: {str(e)}"})
+        yield WarningEvent(f"Error initializing session: {str(e)}")
     
     # Mode for direct employer browsing
     employer_mode = False
@@ -722,20 +880,17 @@ def prosple_scrape(job_level, discipline, location="australia"):
                     # Try to fetch employers first
                     try:
                         for employer_base_url in employer_urls:
-                            yield json.dumps({"progress": 40, "status": f"Browsing employers on Prosple..."})
+                            yield ProgressEvent(40, f"Browsing employers on Prosple...")
                             
                             # Use different browser profiles for each request
                             emp_headers = headers.copy()
                             emp_headers['User-Agent'] = random.choice(user_agents)
                             emp_headers['Referer'] = random.choice(referrers)
                             
-                            # Realistic human delay
-                            time.sleep(2 + random.random() * 3)
-                            
-                            emp_response = session.get(employer_base_url, headers=emp_headers, timeout=20)
+                            emp_response = http_client.get(employer_base_url, session=session, headers=emp_headers, timeout=20)
                             
                             if emp_response.status_code == 200:
-                                emp_soup = BeautifulSoup(emp_response.content, 'html.parser')
+                                emp_soup = html_parser.parse(emp_response.content)
                                 
                                 # Find employer links - try multiple selector patterns
                                 emp_links = emp_soup.select('a[href*="/employer/"], a[href*="/organization/"]')
@@ -761,7 +916,7 @@ def prosple_scrape(job_level, discipline, location="australia"):
                                             employer_list.append(emp_url)
                                 
                                 if employer_list:
-                                    yield json.dumps({"progress": 45, "status": f"Found {len(employer_list)} employers on Prosple"})
+                                    yield ProgressEvent(45, f"Found {len(employer_list)} employers on Prosple")
                                     break
                             
                         if not employer_list:
@@ -778,7 +933,7 @@ def prosple_scrape(job_level, discipline, location="australia"):
             employer_index += 1
             
             try:
-                yield json.dumps({"progress": 45 + employer_index, "status": f"Checking employer {employer_index}/{len(employer_list)} on Prosple..."})
+                yield ProgressEvent(45 + employer_index, f"Checking employer {employer_index}/{len(employer_list)} on Prosple...")
                 
                 # Use a different profile for each employer
                 current_headers = headers.copy()
@@ -790,9 +945,6 @@ def prosple_scrape(job_level, discipline, location="australia"):
                 else:  # Sometimes navigate from within the site
                     current_headers['Referer'] = 'https://au.prosple.com/employers'
                 
-                # Human-like delay with some randomness
-                time.sleep(2 + random.random() * 3)
-                
                 # Occasionally add random query parameters to appear more legitimate
                 query_params = {}
                 if random.random() > 0.7:
@@ -802,12 +954,12 @@ def prosple_scrape(job_level, discipline, location="australia"):
                         '_': str(int(time.time() * 1000))  # Timestamp to prevent caching
                     }
                 
-                emp_response = session.get(employer_url, headers=current_headers, params=query_params, timeout=20)
+                emp_response = http_client.get(employer_url, session=session, headers=current_headers, params=query_params, timeout=20)
                 
                 if emp_response.status_code != 200:
                     continue
                 
-                emp_soup = BeautifulSoup(emp_response.content, 'html.parser')
+                emp_soup = html_parser.parse(emp_response.content)
                 
                 # Try multiple patterns to find job listings from this employer
                 job_links = emp_soup.select('a[href*="/job/"], a[href*="/opportunity/"]')
@@ -885,7 +1037,7 @@ def prosple_scrape(job_level, discipline, location="australia"):
                 
                 # Report progress
                 if jobs_list:
-                    yield json.dumps({"progress": 50, "status": f"Found {total_jobs_found} jobs from Prosple employers"})
+                    yield ProgressEvent(50, f"Found {total_jobs_found} jobs from Prosple employers")
                 
                 # Set a threshold to stop searching employers if we found enough jobs
                 if total_jobs_found > 20:
@@ -908,7 +1060,7 @@ def prosple_scrape(job_level, discipline, location="australia"):
         else:
             url = f"{base_url}?page={page_num}" if '?' in base_url else f"{base_url}&page={page_num}"
         
-        # Implement retry mechanism with exponential backoff
+        # Retry failed requests; the rate limiter slows down after each failure and honours Retry-After
         max_retries = 4
         retry_count = 0
         success = False
@@ -917,7 +1069,7 @@ def prosple_scrape(job_level, discipline, location="australia"):
             try:
                 # Calculate progress
                 progress_start = 33 if current_progress < 33 else current_progress
-                yield json.dumps({"progress": progress_start, "status": f"Connecting to Prosple (attempt {retry_count + 1})..."})
+                yield ProgressEvent(progress_start, f"Connecting to Prosple (attempt {retry_count + 1})...")
                 
                 # Create a unique browser profile for each attempt
                 current_headers = headers.copy()
@@ -943,13 +1095,10 @@ def prosple_scrape(job_level, discipline, location="australia"):
                         '_': str(int(time.time() * 1000))  # Cache busting timestamp
                     })
                 
-                # Variable delay with jitter - more human-like pattern
-                delay_time = 3 + retry_count + (random.random() * 3)
-                time.sleep(delay_time)
-                
                 # Make request with params
-                response = session.get(
+                response = http_client.get(
                     url.split('?')[0] if query_params and '?' in url else url,
+                    session=session,
                     params=query_params if query_params else None,
                     headers=current_headers, 
                     timeout=30
@@ -958,171 +1107,98 @@ def prosple_scrape(job_level, discipline, location="australia"):
                 # Handle different response status codes
                 if response.status_code == 403:
                     retry_count += 1
-                    yield json.dumps({"warning": f"Access denied by Prosple (403), retrying with different parameters (attempt {retry_count}/{max_retries})..."})
-                    
-                    # Exponential backoff
-                    time.sleep((2 ** retry_count) + random.random() * 2)
+                    yield WarningEvent(f"Access denied by Prosple (403), retrying with different parameters (attempt {retry_count}/{max_retries})...")
                     continue
                 elif response.status_code == 429:
-                    # Too many requests - need longer backoff
+                    # Too many requests - the rate limiter has already halved its rate
                     retry_count += 1
-                    yield json.dumps({"warning": f"Rate limited by Prosple (429), backing off and retrying (attempt {retry_count}/{max_retries})..."})
-                    
-                    # Longer delay for rate limiting
-                    time.sleep((3 ** retry_count) + random.random() * 5)
+                    yield WarningEvent(f"Rate limited by Prosple (429), backing off and retrying (attempt {retry_count}/{max_retries})...")
                     continue
                 elif response.status_code == 200:
                     success = True
                 else:
                     # Other status codes
                     retry_count += 1
-                    yield json.dumps({"warning": f"Received status {response.status_code} from Prosple, retrying (attempt {retry_count}/{max_retries})..."})
-                    time.sleep(2 * retry_count)
+                    yield WarningEvent(f"Received status {response.status_code} from Prosple, retrying (attempt {retry_count}/{max_retries})...")
                 
             except requests.exceptions.Timeout:
                 retry_count += 1
-                yield json.dumps({"warning": f"Timeout connecting to Prosple, retrying (attempt {retry_count}/{max_retries})..."})
-                time.sleep(retry_count * 2)
+                yield WarningEvent(f"Timeout connecting to Prosple, retrying (attempt {retry_count}/{max_retries})...")
             except Exception as e:
                 retry_count += 1
                 print(f"Error accessing Prosple (retry {retry_count}): {str(e)}")
-                yield json.dumps({"warning": f"Error accessing Prosple: {str(e)}, retrying (attempt {retry_count}/{max_retries})..."})
-                time.sleep(2 + retry_count)
+                yield WarningEvent(f"Error accessing Prosple: {str(e)}, retrying (attempt {retry_count}/{max_retries})...")
         
         # If all retries failed, try the next URL format or employer mode
         if not success:
             url_index += 1
             if url_index < len(url_formats):
-                yield json.dumps({"warning": f"Trying alternative Prosple URL format {url_index + 1}/{len(url_formats)}..."})
+                yield WarningEvent(f"Trying alternative Prosple URL format {url_index + 1}/{len(url_formats)}...")
                 page_num = 1  # Reset page number for the new URL format
                 continue
             else:
                 # Try employer mode as fallback
-                yield json.dumps({"warning": "Could not access Prosple job listings. Switching to employer browsing mode..."})
+                yield WarningEvent("Could not access Prosple job listings. Switching to employer browsing mode...")
                 employer_mode = True
                 continue
         
         try:
-            # Parse HTML content
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Check for CAPTCHA or login walls
-            captcha_indicators = [
-                soup.select_one('form[action*="captcha"]'),
-                soup.select_one('div[class*="captcha"]'),
-                soup.select_one('img[src*="captcha"]'),
-                soup.select_one('div[class*="recaptcha"]'),
-                soup.find(string=re.compile(r'captcha|robot|verification', re.I))
-            ]
-            
-            login_indicators = [
-                soup.select_one('form[action*="login"]'),
-                soup.select_one('input[name="password"]'),
-                soup.find(string=re.compile(r'please log ?in|sign ?in required', re.I))
-            ]
-            
-            if any(captcha_indicators):
-                yield json.dumps({"warning": "Detected CAPTCHA on Prosple. Switching to employer browsing mode..."})
-                employer_mode = True
-                continue
+            # Prosple embeds its results as structured data; only walk the page when that's missing
+            job_listings = prosple_data.extract_listings(response.content)
+            structured = job_listings is not None
+            soup = None
+            if not structured:
+                # Parse HTML content
+                soup = html_parser.parse(response.content)
                 
-            if any(login_indicators):
-                yield json.dumps({"warning": "Login wall detected on Prosple. Switching to employer browsing mode..."})
-                employer_mode = True
-                continue
-            
-            # Find job listings with multiple selector patterns
-            job_listings = soup.select('.opportunity-list-item, .job-card, .listing-item, article')
-            
-            if not job_listings:
-                job_listings = soup.select('.job-listing, .card, [data-testid="job-card"], .search-result-card')
-            
-            if not job_listings:
-                job_listings = soup.select('a[href*="/job/"], a[href*="/opportunity/"]')
-                # Convert to parent containers for easier processing
-                if job_listings:
-                    job_listings = [link.find_parent('div', class_=lambda c: c and ('card' in c or 'job' in c or 'listing' in c)) for link in job_listings if link.find_parent('div')]
+                # Check for CAPTCHA or login walls
+                wall = prosple_access_wall(soup)
+                if wall == 'captcha':
+                    yield WarningEvent("Detected CAPTCHA on Prosple. Switching to employer browsing mode...")
+                    employer_mode = True
+                    continue
+                    
+                if wall == 'login':
+                    yield WarningEvent("Login wall detected on Prosple. Switching to employer browsing mode...")
+                    employer_mode = True
+                    continue
+                
+                job_listings = find_prosple_cards(soup)
             
             # Check if we've reached the last page
             if len(job_listings) == 0 or (last_page_count == len(job_listings) and page_num > 1):
                 print(f"No more job listings found after Prosple page {page_num-1}.")
-                yield json.dumps({"warning": f"No more job listings found after Prosple page {page_num-1}."})
+                yield WarningEvent(f"No more job listings found after Prosple page {page_num-1}.")
                 url_index += 1
                 if url_index < len(url_formats):
-                    yield json.dumps({"warning": f"Trying alternative Prosple URL format {url_index + 1}/{len(url_formats)}..."})
+                    yield WarningEvent(f"Trying alternative Prosple URL format {url_index + 1}/{len(url_formats)}...")
                     page_num = 1  # Reset page number for the new URL format
                     continue
                 else:
                     # Try employer mode as fallback
-                    yield json.dumps({"warning": "No more job listings. Switching to employer browsing mode..."})
+                    yield WarningEvent("No more job listings. Switching to employer browsing mode...")
                     employer_mode = True
                     continue
             
             last_page_count = len(job_listings)
             total_jobs_found += len(job_listings)
-            yield json.dumps({"progress": progress_start, "status": f"Found {len(job_listings)} jobs on Prosple page {page_num}"})
+            yield ProgressEvent(progress_start, f"Found {len(job_listings)} jobs on Prosple page {page_num}")
             
             # Process each job listing
             job_index = 0
             for job in job_listings:
                 job_index += 1
-                current_progress = 33 + ((page_num - 1) * len(job_listings) + job_index) / (total_jobs_found * 1.5) * 33 
-                yield json.dumps({"progress": current_progress, "status": f"Scraping Prosple page {page_num}, job {job_index}/{len(job_listings)}"})
+                current_progress = 33 + min(((page_num - 1) * len(job_listings) + job_index) / (total_jobs_found * 1.5), 1) * 33
+                yield ProgressEvent(current_progress, f"Scraping Prosple page {page_num}, job {job_index}/{len(job_listings)}")
                 
                 try:
-                    # Extract job title
-                    title_elem = job.select_one('.job-title, .title, h2, h3, .name')
-                    title = title_elem.get_text().strip() if title_elem else "Untitled Position"
-                    
-                    # Get job URL
-                    url_elem = job.select_one('a[href*="/job/"], a[href*="/opportunity/"]') or job.find('a')
-                    if not url_elem or not url_elem.has_attr('href'):
+                    if structured:
+                        job_data = prosple_job_from_data(job, prosple_discipline)
+                    else:
+                        job_data = parse_prosple_card(job, local_url, prosple_discipline)
+                    if job_data is None:
                         continue
-                        
-                    job_url = url_elem['href']
-                    if job_url.startswith('/'):
-                        job_url = local_url + job_url
-                    elif not job_url.startswith('http'):
-                        job_url = local_url + '/' + job_url
-                    
-                    # Get company name
-                    company_elem = job.select_one('.company-name, .employer, .organization')
-                    company = company_elem.get_text().strip() if company_elem else "Unknown Company"
                     
-                    # Get location
-                    location_elem = job.select_one('.location, .job-location')
-                    job_location = location_elem.get_text().strip() if location_elem else None
-                    
-                    # Get job type
-                    job_type_elem = job.select_one('.job-type, .work-type, .employment-type')
-                    job_type = job_type_elem.get_text().strip() if job_type_elem else None
-                    
-                    # Get closing date
-                    closing_date_elem = job.select_one('.closing-date, .deadline')
-                    closing_date = None
-                    if closing_date_elem:
-                        closing_date_text = closing_date_elem.get_text().strip()
-                        try:
-                            if "closing date" in closing_date_text.lower():
-                                date_part = closing_date_text.split(":", 1)[1].strip()
-                                closing_date = parse(date_part).strftime("%Y-%m-%d")
-                            else:
-                                closing_date = parse(closing_date_text).strftime("%Y-%m-%d")
-                        except:
-                            closing_date = closing_date_text
-                    
-                    # Add job to results
-                    job_data = {
-                        'title': title,
-                        'company': company,
-                        'link': job_url,
-                        'location': job_location,
-                        'job_type': job_type,
-                        'closing_date': closing_date,
-                        'disciplines': prosple_discipline.replace('-', ' ').title(),
-                        'international': None,
-                        'source': 'Prosple'
-                    }
                     # Add job ID before adding to list
                     job_data = add_job_id(job_data)
                     jobs_list.append(job_data)
@@ -1132,7 +1208,7 @@ def prosple_scrape(job_level, discipline, location="australia"):
                     traceback.print_exc()
             
             # Check pagination to determine max pages
-            pagination = soup.select('.pagination a, .page-link, [class*="pager"] a')
+            pagination = soup.select('.pagination a, .page-link, [class*="pager"] a') if soup is not None else []
             for page_link in pagination:
                 try:
                     page_number = int(''.join(filter(str.isdigit, page_link.text.strip())))
@@ -1142,34 +1218,281 @@ def prosple_scrape(job_level, discipline, location="australia"):
                 except ValueError:
                     pass
             
-            # Increment page number with human-like delay
+            # Increment page number; the rate limiter spaces out the next request
             page_num += 1
-            time.sleep(3 + random.random() * 4)  # Variable delay between 3-7 seconds
         
         except Exception as e:
             print(f"Error scraping Prosple page {page_num}: {str(e)}")
             traceback.print_exc()
-            yield json.dumps({"error": f"Error scraping Prosple page {page_num}: {str(e)}"})
+            yield ErrorEvent(f"Error scraping Prosple page {page_num}: {str(e)}")
             url_index += 1
             if url_index < len(url_formats):
-                yield json.dumps({"warning": f"Trying alternative Prosple URL format {url_index + 1}/{len(url_formats)}..."})
+                yield WarningEvent(f"Trying alternative Prosple URL format {url_index + 1}/{len(url_formats)}...")
                 page_num = 1  # Reset page number for the new URL format
             else:
                 # Switch to employer mode as fallback
-                yield json.dumps({"warning": "Error in scraping. Switching to employer browsing mode..."})
+                yield WarningEvent("Error in scraping. Switching to employer browsing mode...")
                 employer_mode = True
     
     # Report final results
     if not jobs_list:
-        yield json.dumps({"warning": "Could not retrieve any jobs from Prosple. They may have implemented stronger protections against automated access."})
+        yield WarningEvent("Could not retrieve any jobs from Prosple. They may have implemented stronger protections against automated access.")
     
-    yield json.dumps({"progress": 66, "status": "Completed Prosple scraping", "results": jobs_list})
+    yield SourceComplete(jobs_list, "Completed Prosple scraping")
     return jobs_list
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+def normalize_location(loc):
+    """Normalize location strings to group similar locations together"""
+    if not loc:
+        return None
+        
+    # Convert to lowercase for case-insensitive comparison
+    loc = loc.lower().strip()
+    
+    # Define city mappings (main city name -> variations)
+    city_mappings = {
+        'sydney': ['sydney', 'sydney nsw', 'nsw sydney', 'sydney, nsw', 'sydney australia', 'greater sydney'],
+        'melbourne': ['melbourne', 'melbourne vic', 'vic melbourne', 'melbourne, vic', 'melbourne australia', 'greater melbourne'],
+        'brisbane': ['brisbane', 'brisbane qld', 'qld brisbane', 'brisbane, qld', 'brisbane australia', 'greater brisbane'],
+        'perth': ['perth', 'perth wa', 'wa perth', 'perth, wa', 'perth australia', 'greater perth'],
+        'adelaide': ['adelaide', 'adelaide sa', 'sa adelaide', 'adelaide, sa', 'adelaide australia', 'greater adelaide'],
+        'canberra': ['canberra', 'canberra act', 'act canberra', 'canberra, act', 'canberra australia', 'australian capital territory'],
+        'hobart': ['hobart', 'hobart tas', 'tas hobart', 'hobart, tas', 'hobart australia'],
+        'darwin': ['darwin', 'darwin nt', 'nt darwin', 'darwin, nt', 'darwin australia'],
+        'gold coast': ['gold coast', 'gold coast qld', 'qld gold coast', 'gold coast, qld'],
+        'newcastle': ['newcastle', 'newcastle nsw', 'nsw newcastle', 'newcastle, nsw'],
+        'wollongong': ['wollongong', 'wollongong nsw', 'nsw wollongong', 'wollongong, nsw'],
+    }
+    
+    # State abbreviations mapping
+    state_abbr = {
+        'nsw': 'new south wales',
+        'vic': 'victoria',
+        'qld': 'queensland',
+        'wa': 'western australia',
+        'sa': 'south australia',
+        'tas': 'tasmania',
+        'act': 'australian capital territory',
+        'nt': 'northern territory'
+    }
+    
+    # Try to find a match in city mappings
+    for city, variations in city_mappings.items():
+        for variant in variations:
+            if variant in loc or loc in variant:
+                return city.title()  # Return standardized city name with title case
+    
+    # Check if it's just a state
+    for abbr, full_name in state_abbr.items():
+        if loc == abbr or loc == full_name:
+            return full_name.title()
+            
+    # If location contains multiple locations separated by commas, pipes, or other delimiters
+    if any(delim in loc for delim in [',', '|', ';', '/']):
+        locations = re.split(r'[,|;/]', loc)
+        # Process each location and take the first valid one
+        for subloc in locations:
+            normalized = normalize_location(subloc)
+            if normalized:
+                return normalized
+    
+    # If it contains a state abbreviation, extract the main location
+    for abbr in state_abbr.keys():
+        if f" {abbr}" in loc:
+            main_loc = loc.replace(f" {abbr}", "").strip()
+            return main_loc.title()
+    
+    # If we can't normalize it, return the original with title case
+    return loc.title()
+
+def search_sources(source):
+    """Names of the scrapers a /search `source` value runs"""
+    # If 'prosple' or 'all' is selected, change to 'both' (only GradConnection and Seek)
+    if source in ['prosple', 'all']:
+        source = 'both'
+    
+    sources = []
+    if source in ['both', 'gradconnection']:
+        sources.append('GradConnection')
+    if source in ['both', 'seek']:
+        sources.append('Seek')
+    return sources
+
+def build_scrapers(job_level, discipline, location, source):
+    """
+    Build the scrapers for each selected source along with the progress range
+    each one reports on, so the combined progress bar can be computed
+    """
+    sources = search_sources(source)
+    
+    scrapers = []
+    if 'GradConnection' in sources:
+        scrapers.append(('GradConnection', grad_connection_scrape(job_level, discipline, location), (0, 50)))
+
+    if 'Seek' in sources:
+        # Format location for Seek (replace spaces with hyphens)
+        seek_location = location.replace(' ', '-')
+        if seek_location.lower() == 'australia':
+            seek_location = 'All-Australia'
+        
+        # Map discipline to classification codes for Seek
+        discipline_map = {
+            'computer-science': '1223',  # ICT
+            'data-science-and-analytics': '1223%2C6281',  # ICT and Science&Technology
+            'engineering': '9201',  # Engineering
+            'finance': '1201',  # Accounting
+            'mathematics': '6281',  # Science & Technology
+            'accounting': '1201',  # Accounting
+            'marketing': '1205',  # Marketing & Communications
+            'business': '1202%2C1203',  # Business & Management
+            'information-technology': '1223',  # Information & Communication Technology
+            'health-sciences': '2206%2C2712'  # Healthcare & Medical
+        }
+        
+        seek_discipline = discipline_map.get(discipline, '1223%2C6281')
+        scrapers.append(('Seek', seek_scrape(job_level, seek_discipline, seek_location), (50, 100)))
+    return scrapers
+
+def run_source(name, updates, events, stop):
+    """Drain one scraper in its own thread, forwarding its events to the merged stream"""
+    try:
+        for update in updates:
+            events.put((name, update))
+            if stop.is_set():
+                break
+    except Exception as e:
+        print(f"Error in {name} scraping: {str(e)}")
+        traceback.print_exc()
+        events.put((name, ErrorEvent(str(e))))
+    finally:
+        updates.close()
+        events.put((name, None))
+
+def search_updates(scrapers, key=None, live=True, idle=None):
+    """
+    Run the scrapers in parallel and yield the merged stream of search events.
+
+    Results are normalized, de-duplicated across sources and saved to the job store.
+    With `live` set, each batch is also added to the search's stored result set as it
+    arrives; either way the full set is replaced once the search completes. With
+    `idle` set, None is yielded whenever no event arrives for that many seconds so
+    the caller can flush time-based batches. Events are the scrapers' own objects,
+    updated in place, and the last one is a SearchComplete.
+    """
+    dedup = Deduplicator()
+    events = queue.Queue()
+    stop = threading.Event()
+    
+    # Progress of each source as a fraction of its own work
+    source_progress = {name: 0.0 for name, _, _ in scrapers}
+    progress_ranges = {name: progress_range for name, _, progress_range in scrapers}
+    
+    # IDs of every job a source has sent, so its completion event only adds jobs not already handled
+    received = set()
+    
+    def combined_progress(name, progress):
+        """Convert a source's own progress into the progress of the whole search"""
+        low, high = progress_ranges[name]
+        fraction = (progress - low) / (high - low)
+        source_progress[name] = max(source_progress[name], min(max(fraction, 0.0), 1.0))
+        return sum(source_progress.values()) / len(source_progress) * 100
+    
+    # Run every selected source at the same time
+    for name, updates, _ in scrapers:
+        threading.Thread(target=run_source, args=(name, updates, events, stop), name=f"scrape-{name}", daemon=True).start()
+    
+    try:
+        remaining = len(scrapers)
+        while remaining:
+            try:
+                name, event = events.get(timeout=idle)
+            except queue.Empty:
+                yield None
+                continue
+            if event is None:
+                remaining -= 1
+                source_progress[name] = 1.0
+                continue
+            
+            if isinstance(event, ProgressEvent):
+                event.progress = combined_progress(name, event.progress)
+                yield event
+                continue
+            
+            if isinstance(event, MessageEvent):
+                event.source = event.source or name
+                yield event
+                continue
+            
+            if isinstance(event, SourceComplete):
+                source_progress[name] = 1.0
+                event = ResultBatch([job for job in event.jobs if job['id'] not in received],
+                                    progress=sum(source_progress.values()) / len(source_progress) * 100, status=event.status)
+            elif event.progress is not None:
+                event.progress = combined_progress(name, event.progress)
+            
+            received.update(job['id'] for job in event.jobs)
+            # Normalize locations in results
+            for job in event.jobs:
+                if 'location' in job and job['location']:
+                    job['location'] = normalize_location(job['location'])
+            
+            # Collapse postings another source already returned, keeping the richest record
+            kept = []
+            replaced_ids = []
+            merged_into = []
+            for job in event.jobs:
+                canonical, replaced_id = dedup.add(job)
+                if canonical is not None:
+                    kept.append(canonical)
+                    if replaced_id:
+                        replaced_ids.append(replaced_id)
+                elif dedup.get(job['id']) is not None and dedup.canonical_id(job['id']) != job['id']:
+                    merged_into.append(dedup.get(job['id']))
+            
+            # Save every posting to the job store, but only list the kept ones for this search
+            if event.jobs:
+                job_store.upsert_jobs(event.jobs + merged_into)
+            if key is not None and live:
+                job_store.add_search_results(key, [job['id'] for job in kept])
+                if replaced_ids:
+                    job_store.remove_search_results(key, replaced_ids)
+            event.jobs = kept
+            event.replaces = replaced_ids
+            print(f"Added {len(kept)} jobs from {name}. Total jobs: {len(dedup.jobs())}")
+            yield event
+    finally:
+        # Let the scraper threads wind down if the client goes away
+        stop.set()
+    
+    # Return final results after normalizing locations
+    results = dedup.jobs()
+    print(f"Search complete. Total jobs found: {len(results)}")
+    if key is not None:
+        job_store.replace_search_results(key, [job['id'] for job in results])
+        search_cache.put(key, results)
+    yield SearchComplete(results)
+
+def refresh_search(params):
+    """Re-run a search without a client attached and replace its stored results"""
+    key = search_key(params)
+    print(f"Refreshing search {key}")
+    scrapers = build_scrapers(params['job_level'], params['discipline'], params['location'], params['source'])
+    for _ in search_updates(scrapers, key, live=False):
+        pass
+
+def scheduled_refresh(params):
+    """Refresh a search for the scheduler, unless a stale /search hit is already refreshing it"""
+    search_cache.refresh(search_key(params), lambda: refresh_search(params))
+
+def cache_ttl(params):
+    """Seconds the search cache counts a search's results as fresh"""
+    return search_ttl(search_sources(params.get('source', 'both')))
+
 @app.route('/search', methods=['POST'])
 def search():
     data = request.json
@@ -1186,168 +1509,38 @@ def search():
         'source': source
     }
     
-    # Clear previous jobs
-    global all_jobs
-    all_jobs = []
-    print("Cleared previous jobs list")
-    
-    # If 'prosple' or 'all' is selected, change to 'both' (only GradConnection and Seek)
-    if source in ['prosple', 'all']:
-        source = 'both'
-    
-    def normalize_location(loc):
-        """Normalize location strings to group similar locations together"""
-        if not loc:
-            return None
-            
-        # Convert to lowercase for case-insensitive comparison
-        loc = loc.lower().strip()
-        
-        # Define city mappings (main city name -> variations)
-        city_mappings = {
-            'sydney': ['sydney', 'sydney nsw', 'nsw sydney', 'sydney, nsw', 'sydney australia', 'greater sydney'],
-            'melbourne': ['melbourne', 'melbourne vic', 'vic melbourne', 'melbourne, vic', 'melbourne australia', 'greater melbourne'],
-            'brisbane': ['brisbane', 'brisbane qld', 'qld brisbane', 'brisbane, qld', 'brisbane australia', 'greater brisbane'],
-            'perth': ['perth', 'perth wa', 'wa perth', 'perth, wa', 'perth australia', 'greater perth'],
-            'adelaide': ['adelaide', 'adelaide sa', 'sa adelaide', 'adelaide, sa', 'adelaide australia', 'greater adelaide'],
-            'canberra': ['canberra', 'canberra act', 'act canberra', 'canberra, act', 'canberra australia', 'australian capital territory'],
-            'hobart': ['hobart', 'hobart tas', 'tas hobart', 'hobart, tas', 'hobart australia'],
-            'darwin': ['darwin', 'darwin nt', 'nt darwin', 'darwin, nt', 'darwin australia'],
-            'gold coast': ['gold coast', 'gold coast qld', 'qld gold coast', 'gold coast, qld'],
-            'newcastle': ['newcastle', 'newcastle nsw', 'nsw newcastle', 'newcastle, nsw'],
-            'wollongong': ['wollongong', 'wollongong nsw', 'nsw wollongong', 'wollongong, nsw'],
-        }
-        
-        # State abbreviations mapping
-        state_abbr = {
-            'nsw': 'new south wales',
-            'vic': 'victoria',
-            'qld': 'queensland',
-            'wa': 'western australia',
-            'sa': 'south australia',
-            'tas': 'tasmania',
-            'act': 'australian capital territory',
-            'nt': 'northern territory'
-        }
-        
-        # Try to find a match in city mappings
-        for city, variations in city_mappings.items():
-            for variant in variations:
-                if variant in loc or loc in variant:
-                    return city.title()  # Return standardized city name with title case
-        
-        # Check if it's just a state
-        for abbr, full_name in state_abbr.items():
-            if loc == abbr or loc == full_name:
-                return full_name.title()
-                
-        # If location contains multiple locations separated by commas, pipes, or other delimiters
-        if any(delim in loc for delim in [',', '|', ';', '/']):
-            locations = re.split(r'[,|;/]', loc)
-            # Process each location and take the first valid one
-            for subloc in locations:
-                normalized = normalize_location(subloc)
-                if normalized:
-                    return normalized
-        
-        # If it contains a state abbreviation, extract the main location
-        for abbr in state_abbr.keys():
-            if f" {abbr}" in loc:
-                main_loc = loc.replace(f" {abbr}", "").strip()
-                return main_loc.title()
-        
-        # If we can't normalize it, return the original with title case
-        return loc.title()
+    # Count the request so the refresh scheduler knows which searches are popular
+    key = search_key(session['last_search'])
+    job_store.record_search(key, session['last_search'])
     
-    def generate():
-        results = []
-        
-        # Set progress segment based on selected sources
-        progress_segment = 100
-        if source == 'both':
-            progress_segment = 50  # Each source takes 50% when both are selected
-        elif source == 'all':
-            progress_segment = 50  # Each source takes 50% when all are selected
-        
-        if source in ['both', 'gradconnection', 'all']:
-            try:
-                for update in grad_connection_scrape(job_level, discipline, location):
-                    update_data = json.loads(update)
-                    # Adjust progress calculation based on source
-                    if 'progress' in update_data and source == 'all':
-                        update_data['progress'] = update_data['progress'] / 2  # Scale to first half
-                    elif 'progress' in update_data and source == 'both':
-                        update_data['progress'] = update_data['progress'] / 2  # Scale to half
-                    
-                    if 'results' in update_data:
-                        # Normalize locations in results
-                        for job in update_data['results']:
-                            if 'location' in job and job['location']:
-                                job['location'] = normalize_location(job['location'])
-                        results.extend(update_data['results'])
-                        # Update global jobs list
-                        all_jobs.extend(update_data['results'])
-                        print(f"Added {len(update_data['results'])} jobs from GradConnection. Total jobs: {len(all_jobs)}")
-                    yield json.dumps(update_data) + '\n'
-            except Exception as e:
-                print(f"Error in GradConnection scraping: {str(e)}")
-                traceback.print_exc()
-                yield json.dumps({"error": str(e), "source": "GradConnection"}) + '\n'
-        
-        if source in ['both', 'seek', 'all']:
-            try:
-                # Format location for Seek (replace spaces with hyphens)
-                seek_location = location.replace(' ', '-')
-                if seek_location.lower() == 'australia':
-                    seek_location = 'All-Australia'
-                
-                # Map discipline to classification codes for Seek
-                discipline_map = {
-                    'computer-science': '1223',  # ICT
-                    'data-science-and-analytics': '1223%2C6281',  # ICT and Science&Technology
-                    'engineering': '9201',  # Engineering
-                    'finance': '1201',  # Accounting
-                    'mathematics': '6281',  # Science & Technology
-                    'accounting': '1201',  # Accounting
-                    'marketing': '1205',  # Marketing & Communications
-                    'business': '1202%2C1203',  # Business & Management
-                    'information-technology': '1223',  # Information & Communication Technology
-                    'health-sciences': '2206%2C2712'  # Healthcare & Medical
-                }
-                
-                seek_discipline = discipline_map.get(discipline, '1223%2C6281')
-                
-                for update in seek_scrape(job_level, seek_discipline, seek_location):
-                    update_data = json.loads(update)
-                    # Adjust progress calculation based on source
-                    if 'progress' in update_data:
-                        if source == 'all':
-                            # Scale to second half (50-100%)
-                            update_data['progress'] = (update_data['progress'] / 2) + 50
-                        elif source == 'both':
-                            # Scale to second half (50-100%)
-                            update_data['progress'] = (update_data['progress'] / 2) + 50
-                    
-                    if 'results' in update_data:
-                        # Normalize locations in results
-                        for job in update_data['results']:
-                            if 'location' in job and job['location']:
-                                job['location'] = normalize_location(job['location'])
-                        results.extend(update_data['results'])
-                        # Update global jobs list
-                        all_jobs.extend(update_data['results'])
-                        print(f"Added {len(update_data['results'])} jobs from Seek. Total jobs: {len(all_jobs)}")
-                    yield json.dumps(update_data) + '\n'
-            except Exception as e:
-                print(f"Error in Seek scraping: {str(e)}")
-                traceback.print_exc()
-                yield json.dumps({"error": str(e), "source": "Seek"}) + '\n'
+    # Answer from the search cache when possible; stale results are shown at once and re-scraped behind the scenes
+    params = dict(session['last_search'])
+    state, results, age = search_cache.lookup(key, search_sources(source))
+    if state in (FRESH, STALE):
+        status = "Loaded recent results"
+        if state == STALE:
+            search_cache.revalidate(key, lambda: refresh_search(params))
+            status = "Loaded recent results, refreshing in the background"
+        print(f"Serving {state} search {key} from cache ({len(results)} jobs, {age:.0f}s old)")
         
-        # Return final results after normalizing locations
-        print(f"Search complete. Total jobs found: {len(all_jobs)}")
-        yield json.dumps({"complete": True, "results": results}) + '\n'
+        return stream_response([ResultBatch(results, progress=100, status=status), SearchComplete(results)], cached=True)
     
-    return Response(stream_with_context(generate()), content_type='text/event-stream')
+    # Start a fresh result set for this search
+    job_store.start_search(key)
+    print(f"Started search {key}")
+    scrapers = build_scrapers(job_level, discipline, location, source)
+    return stream_response(search_updates(scrapers, key, idle=search_stream.BATCH_INTERVAL))
+
+def stream_response(events, cached=False):
+    """Encode search events with the stream protocol in the format the client accepts"""
+    media_type, gzip = search_stream.negotiate(request.headers.get('Accept'), request.headers.get('Accept-Encoding'))
+    encoder = search_stream.FrameEncoder(cached, page_size=app.config['RESULTS_PAGE_SIZE'])
+    body = search_stream.serialize(search_stream.encode_frames(events, encoder), media_type)
+    headers = {'X-Stream-Version': str(search_stream.PROTOCOL_VERSION), 'Cache-Control': 'no-cache', 'Vary': 'Accept, Accept-Encoding'}
+    if gzip:
+        body = search_stream.gzip_stream(body)
+        headers['Content-Encoding'] = 'gzip'
+    return Response(stream_with_context(body), content_type=media_type, headers=headers)
 
 @app.route('/search-results')
 def search_results():
@@ -1360,22 +1553,104 @@ def search_results():
     if 'current_job_id' in session:
         del session['current_job_id']
     
+    # Render one page at a time; the cursor links to the next one
+    sort, after = 'position', None
+    if request.args.get('cursor'):
+        try:
+            sort, after = decode_cursor(request.args['cursor'])
+        except ValueError:
+            return redirect('/search-results')
+    jobs, total, next_after = job_store.search_page(search_key(last_search), sort=sort, after=after,
+                                                    limit=app.config['RESULTS_PAGE_SIZE'])
     return render_template('search_results.html', 
-                         jobs=all_jobs,
+                         jobs=jobs,
+                         total=total,
+                         next_cursor=encode_cursor(sort, next_after) if next_after is not None else None,
                          search_params=last_search)
 
+@app.route('/api/jobs')
+def query_jobs():
+    """
+    Filter, sort and page through the results of the session's last search.
+
+    Query parameters:
+        job_type, company, city, source: exact matches (values from the facets)
+        international: any of 1/true/yes/on to only list jobs open to international students
+        closing_from, closing_to: inclusive closing date bounds (YYYY-MM-DD)
+        q: full-text query over the title, company, disciplines and description
+            (words, "exact phrases" and prefix* terms; see job_store.text_query)
+        sort: one of job_store.SORT_ORDERS (default 'position', the order jobs were found in;
+            'relevance' ranks by how well jobs match q)
+        cursor: next_cursor from the previous page; send the same filters with it
+        limit: results per page
+
+    Returns {"jobs", "total", "next_cursor"}, plus "facets" (the values each exact-match
+    filter can take) on the first page.
+    """
+    last_search = session.get('last_search')
+    if not last_search:
+        return jsonify({'error': 'No search to query'}), 400
+    
+    filters = {name: request.args.get(name, '').strip() for name in EQUALITY_FILTERS + ('closing_from', 'closing_to')}
+    filters['international'] = request.args.get('international', '').lower() in ('1', 'true', 'yes', 'on')
+    filters['text'] = request.args.get('q', '').strip()
+    
+    sort = request.args.get('sort', 'position')
+    if sort not in SORT_ORDERS:
+        return jsonify({'error': f"Unknown sort '{sort}'"}), 400
+    after = None
+    if request.args.get('cursor'):
+        try:
+            sort, after = decode_cursor(request.args['cursor'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    try:
+        limit = int(request.args.get('limit', app.config['RESULTS_PAGE_SIZE']))
+    except ValueError:
+        return jsonify({'error': 'limit must be a number'}), 400
+    limit = min(max(limit, 1), app.config['MAX_RESULTS_PAGE_SIZE'])
+    
+    key = search_key(last_search)
+    jobs, total, next_after = job_store.search_page(key, filters, sort, after, limit)
+    response = {
+        'jobs': jobs,
+        'total': total,
+        'next_cursor': encode_cursor(sort, next_after) if next_after is not None else None,
+    }
+    if after is None:
+        response['facets'] = job_store.search_facets(key)
+    return jsonify(response)
+
+@app.route('/api/search')
+def search_all_jobs():
+    """
+    Full-text search over every stored job, not just the last search's results.
+
+    Query parameters: q (see job_store.text_query) and limit. Returns {"jobs"},
+    most relevant first, each with its bm25 "score" (lower is better).
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'No query given'}), 400
+    try:
+        limit = int(request.args.get('limit', app.config['RESULTS_PAGE_SIZE']))
+    except ValueError:
+        return jsonify({'error': 'limit must be a number'}), 400
+    limit = min(max(limit, 1), app.config['MAX_RESULTS_PAGE_SIZE'])
+    
+    jobs = [dict(job, score=round(score, 3)) for job, score in job_store.search_text(query, limit)]
+    return jsonify({'jobs': jobs})
+
 @app.route('/job/<job_id>')
 def job_details(job_id):
     try:
         print(f"Looking for job with ID: {job_id}")
-        print(f"Total jobs in storage: {len(all_jobs)}")
         
-        # Find the job in the stored jobs
-        job = next((job for job in all_jobs if job.get('id') == job_id), None)
+        # Find the job in the job store
+        job = job_store.get_job(job_id)
         
         if not job:
             print(f"Job not found with ID: {job_id}")
-            print("Available job IDs:", [job.get('id') for job in all_jobs])
             return render_template('error.html', message="Job not found"), 404
         
         # Store the current job ID in session for back button functionality
@@ -1431,55 +1706,16 @@ def error_page():
     message = request.args.get('message', 'An error occurred')
     return render_template('error.html', message=message)
 
-def adjust_resume_with_ollama(resume_text, job_data):
-    """
-    Send request to Ollama to adjust resume based on job requirements
-    """
-    # Prepare the prompt for the model
-    prompt = f"""
-You are an expert resume consultant. Your task is to analyze the provided resume and suggest specific adjustments 
-to better match the job requirements for the following position:
-
-Company: {job_data['company']}
-Position: {job_data['title']}
-Job Type: {job_data['job_type']}
-
-Job Requirements and Details:
-{job_data.get('requirements', 'Not specified')}
-
-Current Resume:
-{resume_text}
-
-Please provide:
-1. A list of specific modifications to make to the resume
-2. Explanation of why each change would make the resume more effective for this position
-3. Any keywords or phrases from the job description that should be incorporated
-4. Skills or experiences to emphasize
-5. Suggested new bullet points for relevant experiences
-
-Format your response in clear sections with specific, actionable suggestions.
-"""
-
-    try:
-        # Send request to local Ollama API
-        response = requests.post('http://localhost:11434/api/generate',
-                              json={
-                                  "model": "llama2",  # or another model you have in Ollama
-                                  "prompt": prompt,
-                                  "stream": False
-                              })
-        
-        if response.status_code == 200:
-            result = response.json()
-            return result.get('response', "Error: No response from model")
-        else:
-            return f"Error: Failed to get response from Ollama (Status code: {response.status_code})"
-            
-    except Exception as e:
-        return f"Error connecting to Ollama: {str(e)}"
-
 @app.route('/analyze-resume', methods=['POST'])
 def analyze_resume_route():
+    """
+    Suggest how to adjust an uploaded resume for a job, using the Ollama model.
+
+    Form fields: resume (the file) and job_id. Returns {"suggestions", "job_title",
+    "company"} once the model finishes, or with ?stream=1 streams the suggestions as
+    they are generated (see suggestion_frames). Runs ahead of batch analyses in the
+    model's queue; 503 if the queue is full.
+    """
     if 'resume' not in request.files:
         return jsonify({'error': 'No resume file uploaded'}), 400
     
@@ -1496,84 +1732,180 @@ def analyze_resume_route():
         return jsonify({'error': 'No job ID provided'}), 400
     
     # Find the job
-    job = next((job for job in all_jobs if job.get('id') == job_id), None)
+    job = job_store.get_job(job_id)
     if not job:
         return jsonify({'error': 'Job not found'}), 404
     
     try:
-        # Save the uploaded file temporarily
-        filename = secure_filename(file.filename)
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
+        resume_text = read_uploaded_resume(file)
+        stream = bool(request.args.get('stream'))
+        cached = resume_advisor.cached(resume_text, job) is not None
         
-        try:
-            # Extract text from resume
-            resume_text = extract_text_from_resume(file_path)
-            
-            # Get suggestions from Ollama
-            suggestions = adjust_resume_with_ollama(resume_text, job)
-            
-            return jsonify({
-                'suggestions': suggestions,
-                'job_title': job['title'],
-                'company': job['company']
-            })
-            
-        finally:
-            # Clean up the uploaded file
-            if os.path.exists(file_path):
-                os.remove(file_path)
+        # Get suggestions from Ollama
+        events = generation_queue.analyze(resume_text, [job], INTERACTIVE, tokens=stream)
+        if stream:
+            return Response(stream_with_context(suggestion_frames(job, events, cached)),
+                            content_type='application/x-ndjson', headers={'Cache-Control': 'no-cache'})
+        
+        for kind, _, value in events:
+            if kind == 'error':
+                return jsonify({'error': value}), 502
+            suggestions = value
+        
+        return jsonify({
+            'suggestions': suggestions,
+            'job_title': job['title'],
+            'company': job['company']
+        })
                 
+    except ResumeTextError as e:
+        return jsonify({'error': str(e)}), 400
+    except QueueFull as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-def extract_text_from_resume(file_path):
-    """Extract text from a resume file"""
-    try:
-        if file_path.lower().endswith('.pdf'):
-            from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
-            from pdfminer.converter import TextConverter
-            from pdfminer.layout import LAParams
-            from pdfminer.pdfpage import PDFPage
-            from io import StringIO
-
-            # Create a PDF resource manager object
-            rsrcmgr = PDFResourceManager()
-            
-            # Create a string buffer for the extracted text
-            output = StringIO()
-            
-            # Create a text converter object
-            device = TextConverter(rsrcmgr, output, laparams=LAParams())
-            
-            # Open the PDF file
-            with open(file_path, 'rb') as fp:
-                # Create a PDF interpreter object
-                interpreter = PDFPageInterpreter(rsrcmgr, device)
-                
-                # Process each page in the PDF file
-                for page in PDFPage.get_pages(fp):
-                    interpreter.process_page(page)
-                
-                # Get the extracted text
-                text = output.getvalue()
-            
-            # Clean up
-            device.close()
-            output.close()
-            
-            return text
+def suggestion_frames(job, events, cached):
+    """
+    Newline-delimited JSON frames of a streamed analysis: {"type": "start", "job_title",
+    "company", "cached"}, then {"type": "token", "text"} per chunk of suggestions, and
+    finally {"type": "done"} or {"type": "error", "message"}.
+    """
+    yield json.dumps({'type': 'start', 'job_title': job['title'], 'company': job['company'], 'cached': cached}) + '\n'
+    streamed = False
+    for kind, _, value in events:
+        if kind == 'token':
+            streamed = True
+            yield json.dumps({'type': 'token', 'text': value}) + '\n'
+        elif kind == 'done':
+            if not streamed:
+                # Cached suggestions arrive whole
+                yield json.dumps({'type': 'token', 'text': value}) + '\n'
+            yield json.dumps({'type': 'done'}) + '\n'
         else:
-            # For other file types, you might want to add different extraction methods
-            with open(file_path, 'r', encoding='utf-8') as file:
-                return file.read()
+            yield json.dumps({'type': 'error', 'message': value}) + '\n'
+
+@app.route('/analyze-resumes', methods=['POST'])
+def analyze_resumes_route():
+    """
+    Analyse one resume against several jobs, streaming each job's suggestions as the
+    model finishes them.
+
+    Form fields: resume (the file) and job_ids (repeated, or comma separated), most
+    important first. The resume is read once; cached suggestions come back at once
+    and the rest queue for the model in the given order, behind any single analyses.
+    Returns 503 if the queue can't take them all. Streams newline-delimited JSON:
+    {"type": "start", "jobs": [{"job_id", "title", "company"}]}, then per job
+    {"type": "result", "job_id", "suggestions"} or {"type": "error", "job_id",
+    "message"}, and finally {"type": "done"}.
+    """
+    if 'resume' not in request.files:
+        return jsonify({'error': 'No resume file uploaded'}), 400
+    
+    file = request.files['resume']
+    if file.filename == '':
+        return jsonify({'error': 'No selected file'}), 400
+    
+    if not allowed_file(file.filename):
+        return jsonify({'error': 'Invalid file type'}), 400
+    
+    job_ids = []
+    for value in request.form.getlist('job_ids'):
+        for job_id in value.split(','):
+            if job_id.strip() and job_id.strip() not in job_ids:
+                job_ids.append(job_id.strip())
+    if not job_ids:
+        return jsonify({'error': 'No job IDs provided'}), 400
+    if len(job_ids) > app.config['MAX_BATCH_ANALYSES']:
+        return jsonify({'error': f"At most {app.config['MAX_BATCH_ANALYSES']} jobs can be analysed at once"}), 400
+    
+    jobs = [job_store.get_job(job_id) for job_id in job_ids]
+    missing = [job_id for job_id, job in zip(job_ids, jobs) if not job]
+    if missing:
+        return jsonify({'error': f"Jobs not found: {', '.join(missing)}"}), 404
+    
+    try:
+        resume_text = read_uploaded_resume(file)
+        events = generation_queue.analyze(resume_text, jobs, BATCH)
+    except ResumeTextError as e:
+        return jsonify({'error': str(e)}), 400
+    except QueueFull as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
-        raise Exception(f"Failed to extract text from resume: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+    
+    def frames():
+        yield json.dumps({'type': 'start', 'jobs': [{'job_id': job['id'], 'title': job['title'], 'company': job['company']}
+                                                   for job in jobs]}) + '\n'
+        for kind, job_id, value in events:
+            if kind == 'done':
+                yield json.dumps({'type': 'result', 'job_id': job_id, 'suggestions': value}) + '\n'
+            else:
+                yield json.dumps({'type': 'error', 'job_id': job_id, 'message': value}) + '\n'
+        yield json.dumps({'type': 'done'}) + '\n'
+    
+    return Response(stream_with_context(frames()), content_type='application/x-ndjson', headers={'Cache-Control': 'no-cache'})
+
+@app.route('/match-resume', methods=['POST'])
+def match_resume_route():
+    """
+    Rank every stored job against an uploaded resume by TF-IDF similarity.
+
+    Form fields: resume (the file) and limit. Returns {"jobs", "searched"}: the best
+    matching jobs, best first, each with its "match_score" (cosine similarity, 0-1),
+    and how many jobs were compared. No LLM is involved, so this answers in well
+    under a second and can pick which jobs are worth a full analysis.
+    """
+    if 'resume' not in request.files:
+        return jsonify({'error': 'No resume file uploaded'}), 400
+    
+    file = request.files['resume']
+    if file.filename == '':
+        return jsonify({'error': 'No selected file'}), 400
+    
+    if not allowed_file(file.filename):
+        return jsonify({'error': 'Invalid file type'}), 400
+    
+    try:
+        limit = int(request.form.get('limit', app.config['RESUME_MATCHES']))
+    except ValueError:
+        return jsonify({'error': 'limit must be a number'}), 400
+    limit = min(max(limit, 1), app.config['MAX_RESULTS_PAGE_SIZE'])
+    
+    try:
+        resume_text = read_uploaded_resume(file)
+        matches = resume_matcher.match(resume_text, limit)
+    except ResumeTextError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    jobs = []
+    for job_id, score in matches:
+        job = job_store.get_job(job_id)
+        if job:
+            jobs.append(dict(job, match_score=round(score, 4)))
+    return jsonify({'jobs': jobs, 'searched': len(resume_matcher)})
+
+def read_uploaded_resume(file):
+    """Text of an uploaded resume, read from the upload in memory (see resume_text)"""
+    return resume_extractor.extract(file.read(), file.filename)
+
+@app.errorhandler(413)
+def upload_too_large(e):
+    limit = app.config['MAX_CONTENT_LENGTH'] / (1024 * 1024)
+    return jsonify({'error': f'File too large; uploads are limited to {limit:.1f} MB'}), 413
 
 def allowed_file(filename):
     """Check if file type is allowed"""
-    ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'txt'}
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 if __name__ == '__main__':
+    # The debug reloader runs the app in a child process; only start the scheduler there
+    if app.config['REFRESH_SCHEDULER'] == 'thread' and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        RefreshScheduler(job_store, scheduled_refresh, app.config['REFRESH_INTERVAL'], app.config['REFRESH_TOP_N'],
+                         ttl=cache_ttl).start()
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        # Index the stored jobs for resume matching before the first upload needs them
+        threading.Thread(target=resume_matcher.refresh, daemon=True).start()
     app.run(debug=True) 
\ No newline at end of file
@@ -0,0 +1,108 @@
+"""
+Time a batch of resume analyses against the Ollama stub, and how long a single
+analysis started mid-batch waits: once with every analysis sent to the model at
+the same time, as separate requests would, and once through the generation queue.
+
+    python -m benchmarks.batch_analysis_benchmark [--jobs 8] [--parallel 1] [--tokens 50] [--delay 0.01]
+
+The stub (benchmarks.ollama_stub) runs in-process on a free port and generates
+--parallel answers at a time; the job store lives in a scratch directory.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import ollama_stub  # noqa: E402
+from benchmarks.suggestion_benchmark import free_port  # noqa: E402
+from job_store import JobStore  # noqa: E402
+from llm_queue import GenerationQueue, INTERACTIVE, BATCH  # noqa: E402
+from resume_advisor import ResumeAdvisor  # noqa: E402
+
+JOB = {'title': 'Graduate Data Analyst', 'company': 'Example', 'job_type': 'Graduate Job'}
+
+
+def jobs(count):
+    return [dict(JOB, id=f'benchmark-job-{index}') for index in range(count)]
+
+
+def unqueued(advisor, resume, batch, single, single_after):
+    """Every analysis on its own thread, straight to the model; returns (first, last, single) seconds"""
+    finished = []
+    start = time.perf_counter()
+
+    def analyse(job):
+        advisor.suggest(resume, job)
+        finished.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=analyse, args=(job,)) for job in batch]
+    for thread in threads:
+        thread.start()
+    time.sleep(single_after)
+    single_start = time.perf_counter()
+    advisor.suggest(resume, single)
+    single_wait = time.perf_counter() - single_start
+    for thread in threads:
+        thread.join()
+    return min(finished), max(finished), single_wait
+
+
+def queued(generation_queue, resume, batch, single, single_after):
+    """The batch and the single analysis through the queue; returns (first, last, single) seconds"""
+    finished = []
+    start = time.perf_counter()
+
+    def analyse():
+        for _ in generation_queue.analyze(resume, batch, BATCH):
+            finished.append(time.perf_counter() - start)
+
+    thread = threading.Thread(target=analyse)
+    thread.start()
+    time.sleep(single_after)
+    single_start = time.perf_counter()
+    for _ in generation_queue.analyze(resume, [single], INTERACTIVE):
+        pass
+    single_wait = time.perf_counter() - single_start
+    thread.join()
+    return min(finished), max(finished), single_wait
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, default=8, help='jobs in the batch')
+    parser.add_argument('--parallel', type=int, default=1, help='generations the model runs at once')
+    parser.add_argument('--tokens', type=int, default=50, help='tokens per answer')
+    parser.add_argument('--delay', type=float, default=0.01, help='seconds between tokens')
+    args = parser.parse_args()
+
+    port = free_port()
+    server = ollama_stub.serve(port, args.tokens, args.delay, background=True, parallel=args.parallel)
+    work = tempfile.mkdtemp(prefix='jobscrape-batch-')
+    try:
+        advisor = ResumeAdvisor(JobStore(os.path.join(work, 'jobs.sqlite')), url=f'http://127.0.0.1:{port}')
+        generation_queue = GenerationQueue(advisor, concurrency=args.parallel)
+        batch = jobs(args.jobs + 1)
+        single, batch = batch[-1], batch[:-1]
+        # Start the single analysis once the first batch generation is under way
+        single_after = args.tokens * args.delay / 2
+        generation = args.tokens * args.delay
+
+        print(f"{args.jobs} jobs, {args.parallel} at a time, {generation * 1000:.0f}ms per generation")
+        print(f"{'':12}{'first result':>14}{'last result':>14}{'single waits':>14}")
+        # A distinct resume per run so neither is answered from the suggestion cache
+        for name, run in (('unqueued', lambda: unqueued(advisor, 'Resume A', batch, single, single_after)),
+                          ('queued', lambda: queued(generation_queue, 'Resume B', batch, single, single_after))):
+            first, last, single_wait = run()
+            print(f"{name:12}{first * 1000:12.0f}ms{last * 1000:12.0f}ms{single_wait * 1000:12.0f}ms")
+    finally:
+        server.shutdown()
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+A stand-in for the Ollama server, for running resume analysis without a model.
+
+Answers POST /api/generate like Ollama: with "stream" on, one JSON line per token
+followed by a final {"done": true} line, otherwise a single JSON object once every
+token is "generated". Tokens come out every --delay seconds, and like Ollama with
+OLLAMA_NUM_PARALLEL set, at most --parallel generations run at once while the rest wait:
+
+    python -m benchmarks.ollama_stub [--port 11435] [--tokens 200] [--delay 0.02] [--parallel 1]
+    OLLAMA_URL=http://localhost:11435 python app.py
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = ('Emphasise your Python and SQL projects, quantify their impact, and mirror the '
+         'wording of the job requirements in your skills section.').split()
+
+
+def make_handler(tokens, delay, parallel=1):
+    slots = threading.Semaphore(parallel)
+
+    class OllamaStub(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def handle(self):
+            try:
+                super().handle()
+            except ConnectionResetError:
+                # The client dropped a spare keep-alive connection
+                pass
+
+        def do_POST(self):
+            if self.path != '/api/generate':
+                self.send_error(404)
+                return
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            words = [WORDS[index % len(WORDS)] + ' ' for index in range(tokens)]
+            with slots:
+                self._generate(body, words)
+
+        def _generate(self, body, words):
+            if not body.get('stream', True):
+                time.sleep(delay * len(words))
+                payload = json.dumps({'model': body.get('model'), 'response': ''.join(words), 'done': True}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            try:
+                for word in words:
+                    time.sleep(delay)
+                    self._chunk(json.dumps({'model': body.get('model'), 'response': word, 'done': False}) + '\n')
+                self._chunk(json.dumps({'model': body.get('model'), 'response': '', 'done': True}) + '\n')
+                self.wfile.write(b'0\r\n\r\n')
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def _chunk(self, text):
+            data = text.encode()
+            self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+            self.wfile.flush()
+
+    return OllamaStub
+
+
+def serve(port=11435, tokens=200, delay=0.02, background=False, parallel=1):
+    """Run the stub on localhost:`port`; with `background` set, in a daemon thread, returning the server"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(tokens, delay, parallel))
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+    server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=11435)
+    parser.add_argument('--tokens', type=int, default=200, help='tokens per answer')
+    parser.add_argument('--delay', type=float, default=0.02, help='seconds between tokens')
+    parser.add_argument('--parallel', type=int, default=1, help='generations run at once')
+    args = parser.parse_args()
+    print(f"Ollama stub on http://localhost:{args.port}")
+    serve(args.port, args.tokens, args.delay, parallel=args.parallel)
+
+
+if __name__ == '__main__':
+    main()
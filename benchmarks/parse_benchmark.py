@@ -0,0 +1,120 @@
+"""
+Compare HTML parser backends on recorded job board pages.
+
+Recorded pages live in benchmarks/pages/ and are named <source>_<kind>[_anything].html,
+e.g. gradconnection_listing_1.html or seek_detail.html. Record a fresh set with
+
+    python -m benchmarks.parse_benchmark --record
+
+and benchmark them (or any saved HTML files) with
+
+    python -m benchmarks.parse_benchmark [paths...]
+
+Listing pages are also timed with the partial (SoupStrainer) parse the scrapers use.
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers import fetch_engine, html_parser  # noqa: E402
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pages')
+
+# Pages fetched by --record
+RECORD_URLS = {
+    'gradconnection_listing': 'https://au.gradconnection.com/graduate-jobs/computer-science/australia/',
+    'seek_listing': 'https://www.seek.com.au/graduate-jobs-in-information-communication-technology',
+    'prosple_listing': 'https://au.prosple.com/search-jobs?opportunity_types=2&locations=9692',
+}
+
+STRAINERS = {
+    'gradconnection_listing': html_parser.GRADCONNECTION_LISTING,
+    'seek_listing': html_parser.SEEK_LISTING,
+}
+
+
+def page_kind(path):
+    """'gradconnection_listing' for benchmarks/pages/gradconnection_listing_2.html"""
+    parts = os.path.splitext(os.path.basename(path))[0].lower().split('_')
+    return '_'.join(parts[:2])
+
+
+def record(pages_dir):
+    os.makedirs(pages_dir, exist_ok=True)
+    results = fetch_engine.fetch_all([fetch_engine.FetchRequest(url, context=kind) for kind, url in RECORD_URLS.items()])
+    for result in results:
+        if not result.ok:
+            print(f"Skipping {result.context}: {result.error or result.status_code}")
+            continue
+        path = os.path.join(pages_dir, f"{result.context}.html")
+        with open(path, 'wb') as f:
+            f.write(result.content)
+        print(f"Recorded {result.url} -> {path} ({len(result.content) / 1024:.0f} KB)")
+
+        # Keep the first job on GradConnection's listing as a detail page sample
+        if result.context == 'gradconnection_listing':
+            soup = html_parser.parse(result.content, parse_only=html_parser.GRADCONNECTION_LISTING)
+            link = soup.find('a', class_='box-header-title')
+            if link and link.get('href'):
+                detail = fetch_engine.fetch('https://au.gradconnection.com' + link['href'])
+                if detail.ok:
+                    with open(os.path.join(pages_dir, 'gradconnection_detail.html'), 'wb') as f:
+                        f.write(detail.content)
+
+
+def time_parse(content, backend, parse_only, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        html_parser.parse(content, parse_only=parse_only, backend=backend)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='*', help='HTML files to parse (default: benchmarks/pages/*.html)')
+    parser.add_argument('--record', action='store_true', help='fetch a fresh set of pages into benchmarks/pages/')
+    parser.add_argument('--repeat', type=int, default=5, help='parses per page and backend (median is reported)')
+    args = parser.parse_args()
+
+    if args.record:
+        record(PAGES_DIR)
+        return
+
+    paths = args.paths or sorted(glob.glob(os.path.join(PAGES_DIR, '*.html')))
+    if not paths:
+        parser.error('no pages to benchmark; pass HTML files or run with --record first')
+
+    backends = html_parser.available_backends()
+    print(f"{'page':<40} {'KB':>6} " + ' '.join(f"{name:>12}" for name in backends) + f" {'partial':>12}")
+    totals = {name: [] for name in backends + ['partial']}
+    for path in paths:
+        with open(path, 'rb') as f:
+            content = f.read()
+        row = []
+        for backend in backends:
+            ms = time_parse(content, backend, None, args.repeat)
+            totals[backend].append(ms)
+            row.append(f"{ms:>10.1f}ms")
+        strainer = STRAINERS.get(page_kind(path))
+        if strainer is not None:
+            ms = time_parse(content, html_parser.DEFAULT_BACKEND, strainer, args.repeat)
+            totals['partial'].append(ms)
+            row.append(f"{ms:>10.1f}ms")
+        else:
+            row.append(f"{'-':>12}")
+        print(f"{os.path.basename(path)[:40]:<40} {len(content) / 1024:>6.0f} " + ' '.join(row))
+
+    print(f"{'mean ms/page':<47} " + ' '.join(
+        f"{statistics.mean(values):>10.1f}ms" if values else f"{'-':>12}" for values in totals.values()))
+    print(f"partial = {html_parser.DEFAULT_BACKEND} with the listing SoupStrainer")
+
+
+if __name__ == '__main__':
+    main()
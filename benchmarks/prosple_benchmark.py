@@ -0,0 +1,74 @@
+"""
+Compare Prosple's structured-data extraction with the DOM selector path.
+
+Runs on the recorded Prosple pages in benchmarks/pages/ (record them with
+`python -m benchmarks.parse_benchmark --record`) or on any saved Prosple HTML:
+
+    python -m benchmarks.prosple_benchmark [paths...]
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Importing app opens the job store; keep the benchmark from touching the real one
+os.environ.setdefault('JOBSCRAPE_DATA_DIR', tempfile.mkdtemp(prefix='jobscrape-bench-'))
+
+import app  # noqa: E402
+from scrapers import html_parser, prosple_data  # noqa: E402
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pages')
+DISCIPLINE = 'computer-science-and-it'
+
+
+def selector_path(content):
+    """What prosple_scrape does for a page without structured data"""
+    soup = html_parser.parse(content)
+    if app.prosple_access_wall(soup):
+        return []
+    cards = app.find_prosple_cards(soup)
+    jobs = [app.parse_prosple_card(card, prosple_data.PROSPLE_URL, DISCIPLINE) for card in cards if card is not None]
+    return [job for job in jobs if job]
+
+
+def structured_path(content):
+    return prosple_data.extract_listings(content) or []
+
+
+def time_path(path_func, content, repeat):
+    timings = []
+    jobs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        jobs = path_func(content)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), len(jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='*', help='Prosple HTML files (default: benchmarks/pages/prosple_*.html)')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per page and path (median is reported)')
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(glob.glob(os.path.join(PAGES_DIR, 'prosple_*.html')))
+    if not paths:
+        parser.error('no Prosple pages to benchmark; pass HTML files or record them first')
+
+    print(f"{'page':<40} {'KB':>6} {'selectors':>18} {'structured':>18}")
+    for path in paths:
+        with open(path, 'rb') as f:
+            content = f.read()
+        dom_ms, dom_jobs = time_path(selector_path, content, args.repeat)
+        data_ms, data_jobs = time_path(structured_path, content, args.repeat)
+        print(f"{os.path.basename(path)[:40]:<40} {len(content) / 1024:>6.0f} "
+              f"{dom_ms:>8.1f}ms {dom_jobs:>3} jobs {data_ms:>8.1f}ms {data_jobs:>3} jobs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Time ranking a resume against every stored job with the TF-IDF resume matcher.
+
+Indexes synthetic postings (as in text_search_benchmark) in batches, the way
+scrapes arrive, then times top-20 matches for a resume, matches right after a
+small batch of new jobs, and for comparison refitting a TfidfVectorizer over
+every job and scoring with cosine_similarity, as a per-request approach would:
+
+    python -m benchmarks.resume_match_benchmark [--jobs 50000]
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.text_search_benchmark import make_job, VOCABULARY, WEIGHTS  # noqa: E402
+from job_store import JobStore, make_job_id  # noqa: E402
+from resume_matcher import ResumeMatcher, job_text  # noqa: E402
+
+RESUME = """
+Computer science graduate with internships in data engineering and machine learning.
+Built reporting pipelines in python and sql, deployed models to the cloud platform,
+and presented insights to stakeholders. Agile delivery, mentoring, communication.
+"""
+
+
+def median_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, default=50000, help='postings to index')
+    parser.add_argument('--repeat', type=int, default=20, help='runs per measurement (median is reported)')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    jobs = []
+    for index in range(args.jobs):
+        job = make_job(index, rng)
+        job['id'] = make_job_id(job)
+        jobs.append(job)
+    resume = RESUME + ' '.join(rng.choices(VOCABULARY, WEIGHTS, k=300))
+
+    work = tempfile.mkdtemp(prefix='jobscrape-match-')
+    try:
+        # The store stays empty; jobs are handed to the matcher directly
+        matcher = ResumeMatcher(JobStore(os.path.join(work, 'jobs.sqlite')))
+        start = time.perf_counter()
+        for batch in range(0, len(jobs), 1000):
+            matcher.add(jobs[batch:batch + 1000])
+        print(f"Indexed {len(matcher)} jobs in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        matcher.match(resume)
+        print(f"first match (builds the matrix)   {(time.perf_counter() - start) * 1000:8.1f}ms")
+        print(f"top 20 of {len(matcher)} jobs            {median_ms(lambda: matcher.match(resume), args.repeat):8.1f}ms")
+
+        extra = iter(range(args.jobs, args.jobs + 20 * args.repeat * 2))
+
+        def add_and_match():
+            batch = [make_job(next(extra), rng) for _ in range(20)]
+            for job in batch:
+                job['id'] = make_job_id(job)
+            matcher.add(batch)
+            matcher.match(resume)
+        print(f"20 new jobs, then top 20          {median_ms(add_and_match, args.repeat):8.1f}ms")
+
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.metrics.pairwise import cosine_similarity
+
+        def refit():
+            vectorizer = TfidfVectorizer(stop_words='english', sublinear_tf=True)
+            matrix = vectorizer.fit_transform([job_text(job) for job in jobs])
+            cosine_similarity(vectorizer.transform([resume]), matrix)[0].argsort()[-20:]
+        print(f"refit TfidfVectorizer per resume  {median_ms(refit, 1):8.1f}ms")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Compare the Parquet job archive with the Excel files the scrapers used to write.
+
+Runs on the .xlsx files committed in the repository root (or any given ones):
+
+    python -m benchmarks.storage_benchmark [paths...]
+
+For each file it times an Excel save and load through pandas/openpyxl against an
+archive append, a full load and a load of two projected columns.
+"""
+import argparse
+import glob
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+import job_archive  # noqa: E402
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def median_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def search_of(path):
+    """(job_level, discipline) from a '<discipline>_<job_level>_jobs.xlsx' filename"""
+    discipline, job_level = os.path.basename(path)[:-len('_jobs.xlsx')].rsplit('_', 1)
+    return job_level, discipline
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='*', help='Excel files (default: *_jobs.xlsx in the repository root)')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per operation (median is reported)')
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(glob.glob(os.path.join(REPO_DIR, '*_jobs.xlsx')))
+    if not paths:
+        parser.error('no Excel files to benchmark')
+
+    work = tempfile.mkdtemp(prefix='jobscrape-storage-')
+    try:
+        print(f"{'file':<48} {'rows':>5} {'xlsx save':>10} {'xlsx load':>10} "
+              f"{'pq append':>10} {'pq load':>10} {'pq 2 cols':>10} {'xlsx KB':>8} {'pq KB':>6}")
+        for path in paths:
+            job_level, discipline = search_of(path)
+            jobs = pd.read_excel(path).to_dict('records')
+            excel_copy = os.path.join(work, os.path.basename(path))
+
+            xlsx_save = median_ms(lambda: pd.DataFrame(jobs).to_excel(excel_copy, index=False), args.repeat)
+            xlsx_load = median_ms(lambda: pd.read_excel(excel_copy).to_dict('records'), args.repeat)
+
+            # Each append adds a part; time them into a scratch root and measure loads on a single part
+            scratch = os.path.join(work, 'appends')
+            pq_append = median_ms(lambda: job_archive.save_jobs(jobs, job_level, discipline, root=scratch), args.repeat)
+            root = os.path.join(work, 'archive')
+            job_archive.save_jobs(jobs, job_level, discipline, root=root)
+            pq_load = median_ms(lambda: job_archive.load_jobs(job_level, discipline, root=root), args.repeat)
+            pq_project = median_ms(lambda: job_archive.load_jobs(job_level, discipline, columns=['Program Title', 'Company'],
+                                                                 root=root), args.repeat)
+
+            part_bytes = sum(os.path.getsize(part) for part in glob.glob(
+                os.path.join(job_archive.partition_dir(job_level, discipline, root), '*.parquet')))
+            print(f"{os.path.basename(path)[:48]:<48} {len(jobs):>5} {xlsx_save:>8.1f}ms {xlsx_load:>8.1f}ms "
+                  f"{pq_append:>8.1f}ms {pq_load:>8.1f}ms {pq_project:>8.1f}ms "
+                  f"{os.path.getsize(path) / 1024:>8.1f} {part_bytes / 1024:>6.1f}")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Measure the per-event cost of the /search pipeline: scraper events through
+search_updates, the frame encoder and serialization.
+
+Builds a search from the jobs in the .xlsx files committed in the repository root
+(or any given ones), replayed as the scrapers emit them: a progress event per job,
+a result batch per page and a completion event carrying every job. The job store
+and search cache live in a scratch directory.
+
+    python -m benchmarks.stream_benchmark [paths...]
+
+For comparison it also times the JSON round trip each event used to make between
+the scraper and search_updates (json.dumps in the scraper, json.loads on the
+request thread) before scrapers yielded typed events.
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Jobs per listing page, as on GradConnection
+PAGE_SIZE = 20
+
+# Excel column -> job field
+COLUMNS = {
+    'Program Title': 'title',
+    'Company': 'company',
+    'Link': 'link',
+    'Job Type': 'job_type',
+    'Disciplines': 'disciplines',
+    'Location': 'location',
+    'Closing Date': 'closing_date',
+}
+
+
+def load_jobs(paths, source):
+    import pandas as pd
+    from job_store import make_job_id
+
+    jobs = []
+    for path in paths:
+        for row in pd.read_excel(path).to_dict('records'):
+            job = {field: str(row[column]) for column, field in COLUMNS.items() if column in row and row[column] == row[column]}
+            job['source'] = source
+            job['id'] = make_job_id(job)
+            jobs.append(job)
+    return jobs
+
+
+def source_events(jobs):
+    """The events one scraper yields for these jobs, as dicts"""
+    events = []
+    pages = [jobs[start:start + PAGE_SIZE] for start in range(0, len(jobs), PAGE_SIZE)]
+    for page_num, page in enumerate(pages, 1):
+        for index in range(len(page)):
+            events.append({"progress": (page_num - 1 + index / len(page)) / len(pages) * 50,
+                           "status": f"Scraping page {page_num}, job {index + 1}/{len(page)}"})
+        events.append({"progress": page_num / len(pages) * 50, "results": page})
+    events.append({"progress": 50, "status": "Completed scraping", "results": jobs})
+    return events
+
+
+def typed(event):
+    from search_events import ProgressEvent, ResultBatch, SourceComplete
+
+    if 'results' not in event:
+        return ProgressEvent(event['progress'], event['status'])
+    # Copies stand in for the fresh dicts the scraper builds on every run
+    jobs = [dict(job) for job in event['results']]
+    if 'status' in event:
+        return SourceComplete(jobs, event['status'])
+    return ResultBatch(jobs, progress=event['progress'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='*', help='Excel files (default: *_jobs.xlsx in the repository root)')
+    parser.add_argument('--repeat', type=int, default=10, help='runs per measurement (median is reported)')
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(glob.glob(os.path.join(REPO_DIR, '*_jobs.xlsx')))
+    if not paths:
+        parser.error('no Excel files to benchmark')
+
+    work = tempfile.mkdtemp(prefix='jobscrape-stream-')
+    os.environ['JOBSCRAPE_DATA_DIR'] = work
+    try:
+        import app
+        import search_stream
+
+        jobs = load_jobs(paths, 'GradConnection')
+        events = source_events(jobs)
+
+        pipeline = []
+        for _ in range(args.repeat):
+            built = [typed(event) for event in events]
+            scrapers = [('GradConnection', (event for event in built), (0, 50))]
+            start = time.perf_counter()
+            frames = search_stream.encode_frames(app.search_updates(scrapers, 'benchmark'), search_stream.FrameEncoder())
+            size = sum(len(chunk) for chunk in search_stream.serialize(frames))
+            pipeline.append(time.perf_counter() - start)
+
+        round_trip = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            for event in events:
+                json.loads(json.dumps(event))
+            round_trip.append(time.perf_counter() - start)
+
+        per_event = 1e6 / len(events)
+        print(f"{len(events)} events, {len(jobs)} jobs, {size / 1024:.1f} KB streamed")
+        print(f"pipeline            {statistics.median(pipeline) * 1000:8.1f}ms {statistics.median(pipeline) * per_event:8.0f}us/event")
+        print(f"JSON round trip     {statistics.median(round_trip) * 1000:8.1f}ms {statistics.median(round_trip) * per_event:8.0f}us/event")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
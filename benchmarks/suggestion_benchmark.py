@@ -0,0 +1,72 @@
+"""
+Time resume suggestions against the Ollama stub: how long until the first token
+reaches the caller when streaming, how long the whole answer takes, and a repeat
+analysis served from the suggestion cache.
+
+    python -m benchmarks.suggestion_benchmark [--tokens 200] [--delay 0.02]
+
+The stub (benchmarks.ollama_stub) runs in-process on a free port; the job store
+lives in a scratch directory.
+"""
+import argparse
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import ollama_stub  # noqa: E402
+from job_store import JobStore  # noqa: E402
+from resume_advisor import ResumeAdvisor  # noqa: E402
+
+RESUME = 'Computer science graduate. Built reporting pipelines in Python and SQL.'
+JOB = {'id': 'benchmark-job', 'title': 'Graduate Data Analyst', 'company': 'Example', 'job_type': 'Graduate Job'}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tokens', type=int, default=200, help='tokens per answer')
+    parser.add_argument('--delay', type=float, default=0.02, help='seconds between tokens')
+    args = parser.parse_args()
+
+    port = free_port()
+    server = ollama_stub.serve(port, args.tokens, args.delay, background=True)
+    work = tempfile.mkdtemp(prefix='jobscrape-suggest-')
+    try:
+        advisor = ResumeAdvisor(JobStore(os.path.join(work, 'jobs.sqlite')), url=f'http://127.0.0.1:{port}')
+
+        start = time.perf_counter()
+        first = None
+        chunks = 0
+        for _ in advisor.stream(RESUME, JOB):
+            chunks += 1
+            if first is None:
+                first = time.perf_counter() - start
+        total = time.perf_counter() - start
+        print(f"streamed: first token after {first * 1000:.0f}ms, {chunks} tokens in {total * 1000:.0f}ms")
+
+        start = time.perf_counter()
+        advisor.suggest(RESUME, JOB)
+        print(f"repeat (memory cache)      {(time.perf_counter() - start) * 1000:8.2f}ms")
+
+        # A fresh advisor over the same store, as after a restart
+        restarted = ResumeAdvisor(advisor.store, url=f'http://127.0.0.1:{port}')
+        start = time.perf_counter()
+        restarted.suggest(RESUME, JOB)
+        print(f"repeat (job store)         {(time.perf_counter() - start) * 1000:8.2f}ms")
+    finally:
+        server.shutdown()
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
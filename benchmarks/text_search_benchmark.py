@@ -0,0 +1,98 @@
+"""
+Time full-text queries against a job store of synthetic postings.
+
+Generates postings with titles, companies, disciplines and ~250-word descriptions
+drawn from a job-ad vocabulary (padded with filler words and Zipf-distributed, so a
+few words are in nearly every posting and most are rare), stores them in a scratch
+job store and times ranked, phrase and prefix queries over the whole store and
+within one search's results:
+
+    python -m benchmarks.text_search_benchmark [--jobs 50000]
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from job_store import JobStore  # noqa: E402
+
+ROLES = ['Software Engineer', 'Data Analyst', 'Data Scientist', 'Graduate Accountant', 'Civil Engineer',
+         'Marketing Associate', 'Business Analyst', 'Machine Learning Engineer', 'Cyber Security Analyst',
+         'Mechanical Engineer', 'Financial Analyst', 'Product Manager', 'UX Designer', 'Actuarial Analyst']
+LEVELS = ['Graduate', 'Intern', 'Junior', 'Associate', 'Summer Vacationer']
+DISCIPLINES = ['Computer Science', 'Engineering', 'Finance', 'Accounting', 'Mathematics', 'Marketing',
+               'Business', 'Data Science and Analytics', 'Information Technology', 'Health Sciences']
+WORDS = ('team program rotation develop skills learning mentor support clients projects deliver build design '
+         'analyse systems customers growth culture flexible hybrid office career opportunity graduate '
+         'experience training stakeholders solutions data cloud platform python java sql reporting modelling '
+         'risk audit compliance strategy innovation digital products services engineering infrastructure '
+         'network security research insights communication collaboration leadership agile delivery').split()
+
+
+# Filler words after the job-ad vocabulary, and the Zipf weight of each word by rank
+VOCABULARY = WORDS + [f"term{index}" for index in range(5000)]
+WEIGHTS = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]
+
+
+def make_job(index, rng):
+    role = rng.choice(ROLES)
+    return {
+        'source': rng.choice(['GradConnection', 'Seek']),
+        'title': f"{rng.choice(LEVELS)} {role}",
+        'company': f"Company {rng.randrange(2000)}",
+        'link': f"https://example.com/jobs/{index}",
+        'location': rng.choice(['Sydney', 'Melbourne', 'Brisbane', 'Perth', 'Adelaide']),
+        'disciplines': ', '.join(rng.sample(DISCIPLINES, 2)),
+        'description': f"As a {role.lower()} you will " + ' '.join(rng.choices(VOCABULARY, WEIGHTS, k=250)),
+    }
+
+
+def median_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, default=50000, help='postings to generate')
+    parser.add_argument('--repeat', type=int, default=20, help='runs per query (median is reported)')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    work = tempfile.mkdtemp(prefix='jobscrape-text-')
+    try:
+        store = JobStore(os.path.join(work, 'jobs.sqlite'))
+        start = time.perf_counter()
+        ids = []
+        for batch in range(0, args.jobs, 1000):
+            ids += store.upsert_jobs([make_job(index, rng) for index in range(batch, min(batch + 1000, args.jobs))])
+        print(f"Stored and indexed {len(ids)} jobs in {time.perf_counter() - start:.1f}s")
+
+        # One search's results: a tenth of the store
+        store.replace_search_results('benchmark', ids[::10])
+
+        queries = ['team', 'python sql', 'engineer', '"machine learning"', 'actuar*', '"data scientist" python',
+                   'cyber secur*', 'term1234']
+        print(f"{'query':<28} {'matches':>8} {'top 50':>8} {'search page':>12} {'by position':>12}")
+        for query in queries:
+            matches = len(store.search_text(query, limit=args.jobs))
+            whole = median_ms(lambda: store.search_text(query, limit=50), args.repeat)
+            scoped = median_ms(lambda: store.search_page('benchmark', {'text': query}, 'relevance', limit=50), args.repeat)
+            unranked = median_ms(lambda: store.search_page('benchmark', {'text': query}, limit=50), args.repeat)
+            print(f"{query:<28} {matches:>8} {whole:>6.1f}ms {scoped:>10.1f}ms {unranked:>10.1f}ms")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+import glob
+import logging
+import os
+import time
+import uuid
+from datetime import date, datetime
+
+from job_store import DATA_DIR
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # The archive is optional; the web app keeps everything in the job store
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = os.path.join(DATA_DIR, 'jobs')
+
+# Column recording when a row was appended; the newest row for a link wins on load
+SCRAPED_AT = '_scraped_at'
+
+# Column identifying the same posting across appends
+KEY_COLUMN = 'link'
+
+# Key column of rows imported from the Excel files older scrapers wrote
+LEGACY_KEY_COLUMN = 'Link'
+
+# A partition is rewritten as a single file once it has more parts than this
+COMPACT_AFTER = 8
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("The job archive needs pyarrow (pip install pyarrow)")
+
+
+def partition_dir(job_level, discipline, root=None):
+    """Directory holding one search's part files, hive-style so dataset filters can prune it"""
+    return os.path.join(root or ARCHIVE_DIR, f"job_level={job_level}", f"discipline={discipline}")
+
+
+def _cell(value):
+    """Store every field as text: scraped values mix dates, numbers and 'Not specified'"""
+    if value is None or (not isinstance(value, str) and value != value):  # NaN/NaT from pandas
+        return None
+    if isinstance(value, (datetime, date)) or hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def save_jobs(jobs, job_level, discipline, root=None):
+    """
+    Append jobs to a search's partition as a new Parquet part file.
+
+    Nothing already written is rewritten, except that a partition with more than
+    COMPACT_AFTER parts is compacted afterwards. Returns the path of the new part,
+    or None if there was nothing to save.
+    """
+    _require_pyarrow()
+    if not jobs:
+        logger.info("No jobs to save to the archive")
+        return None
+
+    columns = []
+    for job in jobs:
+        columns.extend(name for name in job if name not in columns)
+    scraped_at = time.time()
+    table = pa.table(
+        {name: pa.array([_cell(job.get(name)) for job in jobs], type=pa.string()) for name in columns},
+    ).append_column(SCRAPED_AT, pa.array([scraped_at] * len(jobs), type=pa.float64()))
+
+    directory = partition_dir(job_level, discipline, root)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"part-{int(scraped_at * 1000)}-{uuid.uuid4().hex[:8]}.parquet")
+    pq.write_table(table, path, compression='zstd')
+    logger.info(f"Saved {len(jobs)} jobs to {path}")
+
+    if len(_parts(directory)) > COMPACT_AFTER:
+        compact(job_level, discipline, root)
+    return path
+
+
+def _parts(directory):
+    return sorted(glob.glob(os.path.join(directory, 'part-*.parquet')))
+
+
+# Columns taken from the partition directories rather than stored in the files
+PARTITION_SCHEMA = pa.schema([('job_level', pa.string()), ('discipline', pa.string())]) if pa is not None else None
+
+
+def _dataset(root, job_level=None, discipline=None):
+    """
+    The part files of the matching partitions with the union of their columns.
+
+    Partitions are pruned by directory, so other searches' files are never opened.
+    """
+    pattern = os.path.join(root, f"job_level={job_level or '*'}", f"discipline={discipline or '*'}", 'part-*.parquet')
+    paths = sorted(glob.glob(pattern))
+    if not paths:
+        return None
+    schema = pa.unify_schemas([pq.read_schema(path) for path in paths] + [PARTITION_SCHEMA])
+    partitioning = ds.partitioning(PARTITION_SCHEMA, flavor='hive')
+    return ds.dataset(paths, schema=schema, format='parquet', partitioning=partitioning, partition_base_dir=root)
+
+
+def _links(table):
+    """Each row's link, from KEY_COLUMN or, for imported rows, LEGACY_KEY_COLUMN"""
+    keys = [table.column(name).to_pylist() for name in (KEY_COLUMN, LEGACY_KEY_COLUMN) if name in table.column_names]
+    if not keys:
+        return None
+    if len(keys) == 1:
+        return keys[0]
+    return [link if link is not None else legacy for link, legacy in zip(*keys)]
+
+
+def _latest_rows(table):
+    """Keep the newest row for each link (rows without a link are all kept)"""
+    links = _links(table)
+    if links is None:
+        return table
+    scraped = table.column(SCRAPED_AT).to_pylist()
+    newest = {}
+    keep = []
+    for index, (link, when) in enumerate(zip(links, scraped)):
+        if link is None:
+            keep.append(index)
+        elif link not in newest or when >= scraped[newest[link]]:
+            newest[link] = index
+    keep.extend(newest.values())
+    return table.take(sorted(keep))
+
+
+def load_jobs(job_level=None, discipline=None, columns=None, root=None):
+    """
+    Load archived jobs as dicts, newest version of each posting only.
+
+    Args:
+        job_level: Only this job level's partitions (all when None)
+        discipline: Only this discipline's partitions (all when None)
+        columns: Fields to read; other columns are never decoded (all when None).
+            The job_level and discipline partition columns are only included if named here.
+    """
+    _require_pyarrow()
+    dataset = _dataset(root or ARCHIVE_DIR, job_level, discipline)
+    if dataset is None:
+        return []
+
+    wanted = None
+    if columns is not None:
+        # The key and timestamp are needed to drop superseded rows
+        wanted = [name for name in columns if name in dataset.schema.names]
+        wanted += [name for name in (KEY_COLUMN, LEGACY_KEY_COLUMN, SCRAPED_AT)
+                   if name in dataset.schema.names and name not in wanted]
+    table = _latest_rows(dataset.to_table(columns=wanted))
+
+    drop = [name for name in table.column_names
+            if name == SCRAPED_AT or (name in PARTITION_SCHEMA.names if columns is None else name not in columns)]
+    return table.drop_columns(drop).to_pylist()
+
+
+def compact(job_level, discipline, root=None):
+    """Rewrite a partition as a single part holding only the newest row per posting"""
+    _require_pyarrow()
+    directory = partition_dir(job_level, discipline, root)
+    parts = _parts(directory)
+    if len(parts) < 2:
+        return
+    schema = pa.unify_schemas([pq.read_schema(path) for path in parts])
+    table = _latest_rows(ds.dataset(parts, schema=schema, format='parquet').to_table())
+    path = os.path.join(directory, f"part-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}.parquet")
+    pq.write_table(table, path, compression='zstd')
+    for part in parts:
+        os.remove(part)
+    logger.info(f"Compacted {len(parts)} parts of {directory} into {table.num_rows} rows")
+
+
+def last_updated(job_level, discipline, root=None):
+    """When a search's partition was last appended to, or None"""
+    parts = _parts(partition_dir(job_level, discipline, root))
+    if not parts:
+        return None
+    return datetime.fromtimestamp(max(os.path.getmtime(path) for path in parts))
+
+
+def export_excel(job_level, discipline, path=None, root=None):
+    """Write a search's archived jobs to an .xlsx file for sharing; returns its path"""
+    import pandas as pd
+
+    jobs = load_jobs(job_level, discipline, root=root)
+    path = path or f"{discipline}_{job_level}_jobs.xlsx"
+    pd.DataFrame(jobs).to_excel(path, index=False)
+    logger.info(f"Exported {len(jobs)} jobs to {path}")
+    return path
+
+
+def import_excel(path, job_level, discipline, root=None):
+    """Append the jobs from an Excel file written by older versions of the scrapers"""
+    import pandas as pd
+
+    jobs = pd.read_excel(path).to_dict('records')
+    return save_jobs(jobs, job_level, discipline, root)
@@ -0,0 +1,180 @@
+import re
+import zlib
+
+import numpy as np
+
+# MinHash signature length and LSH banding (bands * rows must equal NUM_PERM).
+# 16 bands of 4 rows puts the LSH candidate threshold at roughly 0.5 similarity.
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# Estimated Jaccard similarity above which two candidates are treated as the same job
+DEFAULT_THRESHOLD = 0.6
+
+SHINGLE_SIZE = 4
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(20240601)
+_PERM_A = _rng.randint(1, _PRIME, size=NUM_PERM).astype(np.int64)
+_PERM_B = _rng.randint(0, _PRIME, size=NUM_PERM).astype(np.int64)
+
+# Words that differ between sources without changing which employer it is
+COMPANY_NOISE = {'pty', 'ltd', 'limited', 'inc', 'group', 'australia', 'australian', 'the', 'co', 'corporation'}
+
+# Fields that make a record more useful when two sources carry the same job
+RICH_FIELDS = ('description', 'company_info', 'disciplines', 'closing_date', 'position_start_date',
+               'international', 'job_type', 'location', 'salary')
+
+
+def _normalize(text, noise=()):
+    words = re.findall(r'[a-z0-9]+', (text or '').lower())
+    return ' '.join(word for word in words if word not in noise)
+
+
+def fingerprint_text(job):
+    """The text a job is fingerprinted on: normalized title plus company"""
+    return f"{_normalize(job.get('title'))} | {_normalize(job.get('company'), COMPANY_NOISE)}"
+
+
+def signature(text):
+    """MinHash signature of a string's character shingles"""
+    if len(text) <= SHINGLE_SIZE:
+        shingles = {text}
+    else:
+        shingles = {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+    hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) & _PRIME for s in shingles), dtype=np.int64, count=len(shingles))
+    return ((np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _PRIME).min(axis=1)
+
+
+def richness(job):
+    """Score how much useful information a record carries"""
+    score = sum(1 for field in RICH_FIELDS if job.get(field) and job.get(field) != 'Not specified')
+    if job.get('description'):
+        score += 5
+    return score
+
+
+class Deduplicator:
+    """
+    Collapse near-duplicate jobs across sources with MinHash + LSH.
+
+    Each job's title+company is shingled into a MinHash signature and bucketed by
+    LSH bands, so only jobs sharing a bucket are ever compared and adding a job
+    costs roughly constant time. Jobs from the same source are never merged (they
+    already have distinct links). When two sources carry the same posting the
+    richest record is kept and the others are listed in its 'also_on' field.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._jobs = {}
+        self._signatures = {}
+        self._band_keys_by_id = {}
+        self._sources = {}
+        self._buckets = {}
+        self._aliases = {}
+
+    def add(self, job):
+        """
+        Add a job and return (canonical_job, replaced_id).
+
+        canonical_job is None when the job was folded into an existing, richer record.
+        replaced_id is the ID of a previously kept record that the new job superseded.
+        """
+        if job.get('id') in self._jobs or job.get('id') in self._aliases:
+            # Already seen this exact posting
+            return None, None
+
+        if not job.get('title'):
+            self._insert(job, None, None)
+            return job, None
+
+        sig = signature(fingerprint_text(job))
+        keys = self._band_keys(sig)
+        match_id = self._find_match(job, sig, keys)
+        if match_id is None:
+            self._insert(job, sig, keys)
+            return job, None
+
+        existing = self._jobs[match_id]
+        if richness(job) > richness(existing):
+            # The new record carries more information, so it becomes the one we keep
+            self._remove(match_id)
+            job['also_on'] = _merge_also_on(job.get('also_on'), existing)
+            self._insert(job, sig, keys, sources=self._sources_of(existing) | {job.get('source')})
+            self._aliases[match_id] = job['id']
+            return job, match_id
+
+        existing['also_on'] = _merge_also_on(existing.get('also_on'), job)
+        self._sources[match_id].add(job.get('source'))
+        self._aliases[job['id']] = match_id
+        return None, None
+
+    def canonical_id(self, job_id):
+        """ID of the record a job was merged into (the job's own ID if it was kept)"""
+        while job_id in self._aliases:
+            job_id = self._aliases[job_id]
+        return job_id
+
+    def get(self, job_id):
+        return self._jobs.get(self.canonical_id(job_id))
+
+    def jobs(self):
+        return list(self._jobs.values())
+
+    def _find_match(self, job, sig, keys):
+        candidates = set()
+        for band, key in enumerate(keys):
+            candidates.update(self._buckets.get((band, key), ()))
+        best_id, best_score = None, self.threshold
+        for candidate_id in candidates:
+            if job.get('source') in self._sources[candidate_id]:
+                continue
+            score = float(np.mean(self._signatures[candidate_id] == sig))
+            if score >= best_score:
+                best_id, best_score = candidate_id, score
+        return best_id
+
+    @staticmethod
+    def _band_keys(sig):
+        return [sig[band * ROWS:(band + 1) * ROWS].tobytes() for band in range(BANDS)]
+
+    def _sources_of(self, job):
+        return {job.get('source')} | {entry['source'] for entry in job.get('also_on') or []}
+
+    def _insert(self, job, sig, keys, sources=None):
+        self._jobs[job['id']] = job
+        self._sources[job['id']] = sources or self._sources_of(job)
+        if sig is None:
+            return
+        self._signatures[job['id']] = sig
+        self._band_keys_by_id[job['id']] = keys
+        for band, key in enumerate(keys):
+            self._buckets.setdefault((band, key), set()).add(job['id'])
+
+    def _remove(self, job_id):
+        self._jobs.pop(job_id)
+        self._sources.pop(job_id)
+        self._signatures.pop(job_id, None)
+        keys = self._band_keys_by_id.pop(job_id, None)
+        if keys is not None:
+            for band, key in enumerate(keys):
+                self._buckets.get((band, key), set()).discard(job_id)
+
+
+def _merge_also_on(also_on, other):
+    """Add another record (and whatever it was merged with) to an also_on list"""
+    entries = list(also_on or [])
+    for entry in [{'source': other.get('source'), 'link': other.get('link'), 'id': other.get('id')}] + list(other.get('also_on') or []):
+        if not any(existing['id'] == entry['id'] for existing in entries):
+            entries.append(entry)
+    return entries
+
+
+def deduplicate(jobs, threshold=DEFAULT_THRESHOLD):
+    """Collapse near-duplicates in a list of jobs, keeping the richest record of each"""
+    dedup = Deduplicator(threshold)
+    for job in jobs:
+        dedup.add(job)
+    return dedup.jobs()
@@ -0,0 +1,727 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.environ.get('JOBSCRAPE_DATA_DIR', 'data')
+
+# Job fields copied into their own indexed columns; everything else lives in the JSON blob
+INDEXED_FIELDS = ('source', 'title', 'company', 'location', 'closing_date', 'job_type', 'link')
+
+# Bumped when the schema changes in a way that needs the jobs tables rebuilt
+SCHEMA_VERSION = 6
+
+# Tables and indexes, created if missing whenever a store is opened; statements are
+# run one at a time inside the migration's transaction, so none may contain a ';'
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS jobs (
+        -- Declared key for the text index: VACUUM may renumber an implicit rowid
+        doc_id INTEGER PRIMARY KEY,
+        id TEXT NOT NULL UNIQUE,
+        source TEXT,
+        title TEXT,
+        company TEXT,
+        location TEXT,
+        closing_date TEXT,
+        job_type TEXT,
+        link TEXT,
+        city TEXT,
+        international INTEGER NOT NULL DEFAULT 0,
+        data TEXT NOT NULL,
+        first_seen REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_jobs_source ON jobs (source);
+    CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs (company);
+    CREATE INDEX IF NOT EXISTS idx_jobs_location ON jobs (location);
+    CREATE INDEX IF NOT EXISTS idx_jobs_closing_date ON jobs (closing_date);
+    CREATE INDEX IF NOT EXISTS idx_jobs_job_type ON jobs (job_type);
+    CREATE INDEX IF NOT EXISTS idx_jobs_city ON jobs (city);
+    CREATE INDEX IF NOT EXISTS idx_jobs_updated_at ON jobs (updated_at);
+
+    -- Inverted index over the jobs' text, with each job's doc_id as its rowid
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_text USING fts5 (
+        title, company, disciplines, description, company_info,
+        tokenize = 'porter unicode61 remove_diacritics 2', prefix = '2 3'
+    );
+    -- The index's terms (stems), for expanding prefix queries
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_text_terms USING fts5vocab (jobs_text, 'row');
+
+    CREATE TABLE IF NOT EXISTS searches (
+        search_key TEXT PRIMARY KEY,
+        params TEXT NOT NULL,
+        updated_at REAL NOT NULL,
+        request_count INTEGER NOT NULL DEFAULT 0,
+        refreshed_at REAL
+    );
+    CREATE TABLE IF NOT EXISTS search_results (
+        search_key TEXT NOT NULL,
+        job_id TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        PRIMARY KEY (search_key, job_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_search_results_position ON search_results (search_key, position);
+
+    CREATE TABLE IF NOT EXISTS frontier (
+        source TEXT NOT NULL,
+        scope TEXT NOT NULL,
+        link TEXT NOT NULL,
+        fingerprint TEXT,
+        job_id TEXT,
+        data TEXT,
+        last_fetched REAL NOT NULL,
+        PRIMARY KEY (source, scope, link)
+    );
+
+    -- Completed LLM resume suggestions, keyed by resume_advisor.suggestion_key
+    CREATE TABLE IF NOT EXISTS suggestions (
+        cache_key TEXT PRIMARY KEY,
+        text TEXT NOT NULL,
+        created_at REAL NOT NULL
+    );
+'''
+
+# Jobs kept in the in-memory ID index
+ID_INDEX_SIZE = 10000
+
+# Detail pages are fetched again after this long even if their listing card is unchanged
+FRONTIER_MAX_AGE = 3 * 24 * 60 * 60
+
+# Job fields in the full-text index, with their weight in the bm25 relevance score
+TEXT_FIELDS = (('title', 10.0), ('company', 5.0), ('disciplines', 3.0), ('description', 1.0), ('company_info', 0.5))
+
+# "Quoted phrases" and single words (optionally ending in * for a prefix) in a text query
+QUERY_TOKEN = re.compile(r'"([^"]*)"?|(\S+)')
+
+# Indexed terms a prefix query is expanded to at most; shorter prefixes only use FTS5's own prefix match
+PREFIX_EXPANSION_LIMIT = 100
+
+# Orderings offered by search_page: name -> [(SQL expression, descending)]. Each ends with the
+# result's position, which is unique within a search, so every row has a distinct sort key
+SORT_ORDERS = {
+    'position': [('search_results.position', False)],
+    'closing-soon': [('jobs.closing_date IS NULL', False), ("COALESCE(jobs.closing_date, '')", False),
+                     ('search_results.position', False)],
+    'closing-later': [('jobs.closing_date IS NULL', False), ("COALESCE(jobs.closing_date, '')", True),
+                      ('search_results.position', False)],
+    'newest': [('jobs.first_seen', True), ('search_results.position', False)],
+    # bm25 scores are negative, lower is more relevant; without a text filter this is the position order
+    'relevance': [('matches.score', False), ('search_results.position', False)],
+}
+
+# Filters search_page accepts that compare a column for equality
+EQUALITY_FILTERS = ('source', 'company', 'city', 'job_type')
+
+# Query parameters that only record how a listing was reached, not which job it is
+TRACKING_PARAMS = {'ref', 'origin', 'source', 'type', 'utm_medium', 'utm_source', 'utm_campaign', '_'}
+
+
+def canonical_link(link):
+    """Normalize a job URL so the same posting always produces the same string"""
+    parts = urlsplit(link.strip())
+    query = sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if key not in TRACKING_PARAMS and not key.startswith('utm_'))
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit(((parts.scheme or 'https').lower(), parts.netloc.lower(), path, urlencode(query), ''))
+
+
+def make_job_id(job):
+    """
+    Derive a stable ID from the job's source and canonical link.
+
+    The same posting gets the same ID across searches, restarts and worker
+    processes. Jobs without a link fall back to their title and company.
+    """
+    source = (job.get('source') or '').strip().lower()
+    if job.get('link'):
+        basis = canonical_link(job['link'])
+    else:
+        basis = f"{job.get('title') or ''}|{job.get('company') or ''}".strip().lower()
+    return hashlib.sha256(f"{source}|{basis}".encode('utf-8')).hexdigest()[:16]
+
+
+def frontier_scope(job_level, discipline, location):
+    """Key grouping the links a scraper has seen for one listing query"""
+    return '|'.join(str(value or '').strip().lower() for value in (job_level, discipline, location))
+
+
+def card_fingerprint(text):
+    """Hash of a listing card's visible text, used to notice when a posting was edited"""
+    normalized = ' '.join((text or '').split()).lower()
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+def search_key(params):
+    """Normalize /search parameters into the key used to group its results"""
+    return '|'.join(str(params.get(name) or '').strip().lower()
+                    for name in ('job_level', 'discipline', 'location', 'source'))
+
+
+def job_city(location):
+    """City part of a location ('Sydney, NSW' -> 'Sydney'), as offered in the city filter"""
+    if not location:
+        return None
+    return str(location).split(',')[0].strip() or None
+
+
+def accepts_international(job):
+    """Whether a job says it is open to international students"""
+    return str(job.get('international') or '').strip().lower().startswith('yes')
+
+
+def text_query(text, expand_prefix=None):
+    """
+    Turn a search box query into an FTS5 MATCH expression, or None if it has no terms.
+
+    Every word must appear, in any form the stemmer maps to the same stem; "quoted
+    phrases" must appear as written; a trailing * matches words starting with it, e.g.
+    '"data science" intern*'. Other FTS5 syntax is matched literally.
+
+    FTS5 stems a prefix before matching it against the (stemmed) index, so "analy*"
+    becomes "anali*" and misses "analyst". `expand_prefix`, if given, maps a prefix
+    to indexed terms it should also match (see JobStore._prefix_terms).
+    """
+    terms = []
+    for phrase, word in QUERY_TOKEN.findall(text or ''):
+        if phrase.strip():
+            terms.append('"' + phrase + '"')
+        elif word:
+            prefix = word.endswith('*')
+            word = word.rstrip('*').replace('"', '')
+            if not re.search(r'\w', word):
+                continue
+            alternatives = expand_prefix(word.lower()) if prefix and expand_prefix else []
+            if alternatives:
+                terms.append('(' + ' OR '.join(['"' + word + '"*'] + ['"' + term + '"' for term in alternatives]) + ')')
+            else:
+                terms.append('"' + word + '"' + ('*' if prefix else ''))
+    return ' AND '.join(terms) or None
+
+
+def _text_values(job):
+    """The job's text for each TEXT_FIELDS column"""
+    values = []
+    for field, _ in TEXT_FIELDS:
+        value = job.get(field)
+        if isinstance(value, (list, tuple)):
+            value = ', '.join(str(item) for item in value)
+        values.append(str(value) if value is not None else '')
+    return values
+
+
+def encode_cursor(sort, after):
+    """Opaque pagination cursor for the page following the row with sort key `after`"""
+    return base64.urlsafe_b64encode(json.dumps([sort, after]).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(sort, after) from a cursor made by encode_cursor; raises ValueError if it is malformed"""
+    try:
+        sort, after = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if sort not in SORT_ORDERS or not isinstance(after, list) or len(after) != len(SORT_ORDERS[sort]):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return sort, after
+
+
+class JobStore:
+    """
+    Local SQLite store for scraped jobs.
+
+    Every scraper's results are upserted here keyed by their content-addressed ID
+    (see make_job_id), with the commonly filtered fields indexed. Each /search also
+    records which jobs it returned so /search-results can be rebuilt from the store
+    after a restart or in another worker process. Recently used jobs are kept in an
+    in-memory hash index so repeated lookups by ID skip SQLite. The store also keeps
+    each scraper's frontier of seen links, so detail pages are only fetched again
+    when a posting is new or its listing card changed.
+    """
+
+    def __init__(self, path=None):
+        if path is None:
+            os.makedirs(DATA_DIR, exist_ok=True)
+            path = os.path.join(DATA_DIR, 'jobs.sqlite')
+        self.path = path
+        self._local = threading.local()
+        self._index = OrderedDict()
+        self._index_lock = threading.Lock()
+        self._create_schema()
+
+    def _connect(self):
+        # SQLite connections can't be shared across threads, so keep one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        """
+        Create the tables, migrating an older store first. The migration steps, the
+        schema and the user_version bump commit as one transaction, so a crash part
+        way leaves the old version in place to be migrated again on the next open.
+        """
+        conn = self._connect()
+        # Manage the transaction by hand: executescript and the implicit transactions would commit part way
+        isolation_level, conn.isolation_level = conn.isolation_level, None
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            self._migrate(conn, conn.execute('PRAGMA user_version').fetchone()[0])
+            conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            conn.execute('COMMIT')
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.isolation_level = isolation_level
+
+    def _migrate(self, conn, version):
+        if version < 2:
+            # Older stores used random job IDs; the data is rebuilt by the next scrape
+            for table in ('jobs', 'jobs_text', 'search_results', 'searches'):
+                conn.execute(f'DROP TABLE IF EXISTS {table}')
+        else:
+            if version < 3:
+                # Version 3 tracks how often each search is requested and when it was last refreshed
+                conn.execute('ALTER TABLE searches ADD COLUMN request_count INTEGER NOT NULL DEFAULT 0')
+                conn.execute('ALTER TABLE searches ADD COLUMN refreshed_at REAL')
+            if version < 4:
+                # Version 4 indexes the city and international flag for the results filters
+                conn.execute('ALTER TABLE jobs ADD COLUMN city TEXT')
+                conn.execute('ALTER TABLE jobs ADD COLUMN international INTEGER NOT NULL DEFAULT 0')
+                rows = conn.execute('SELECT id, data FROM jobs').fetchall()
+                conn.executemany('UPDATE jobs SET city = ?, international = ? WHERE id = ?',
+                                 [(job_city(job.get('location')), int(accepts_international(job)), row['id'])
+                                  for row, job in ((row, json.loads(row['data'])) for row in rows)])
+            if version < 6:
+                # Version 6 declares doc_id as the jobs' integer key; the table is rebuilt below. Its
+                # indexes go first so the schema can create them again under the same names.
+                for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'jobs' "
+                                            "AND sql IS NOT NULL").fetchall():
+                    conn.execute(f'DROP INDEX {name}')
+                conn.execute('ALTER TABLE jobs RENAME TO jobs_old')
+        for statement in SCHEMA.split(';'):
+            if statement.strip():
+                conn.execute(statement)
+        if 2 <= version < 6:
+            columns = 'id, source, title, company, location, closing_date, job_type, link, city, international, data, first_seen, updated_at'
+            conn.execute(f'INSERT INTO jobs (doc_id, {columns}) SELECT rowid, {columns} FROM jobs_old')
+            conn.execute('DROP TABLE jobs_old')
+            # Version 5 added the full-text index and version 6 re-keyed it; fill it from the jobs already stored
+            self._index_text(conn)
+
+    def rebuild_text_index(self):
+        """Re-index every stored job's text, e.g. after the index was added or damaged"""
+        conn = self._connect()
+        with conn:
+            self._index_text(conn)
+
+    def _index_text(self, conn):
+        conn.execute('DELETE FROM jobs_text')
+        rows = conn.execute('SELECT doc_id, data FROM jobs').fetchall()
+        conn.executemany('INSERT INTO jobs_text (rowid, title, company, disciplines, description, company_info) '
+                         'VALUES (?, ?, ?, ?, ?, ?)',
+                         [[row['doc_id']] + _text_values(json.loads(row['data'])) for row in rows])
+        logger.info(f"Indexed the text of {len(rows)} jobs")
+
+    def _prefix_terms(self, prefix):
+        """
+        Indexed terms a prefix query should match: those starting with the prefix or,
+        if none do, the longest one the prefix starts with ("accounti*" -> "account",
+        since the stemmer cut "accounting" shorter than the prefix).
+        """
+        conn = self._connect()
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        terms = [row[0] for row in conn.execute('SELECT term FROM jobs_text_terms WHERE term >= ? AND term < ? LIMIT ?',
+                                                (prefix, upper, PREFIX_EXPANSION_LIMIT + 1))]
+        if len(terms) > PREFIX_EXPANSION_LIMIT:
+            return []
+        if not terms and len(prefix) > 3:
+            stems = [prefix[:length] for length in range(len(prefix) - 1, 2, -1)]
+            terms = [row[0] for row in conn.execute(
+                f"SELECT term FROM jobs_text_terms WHERE term IN ({', '.join('?' * len(stems))}) "
+                f"ORDER BY length(term) DESC LIMIT 1", stems)]
+        return terms
+
+    def _text_match(self, text):
+        """text_query with prefixes expanded against this store's index"""
+        return text_query(text, self._prefix_terms)
+
+    def upsert_jobs(self, jobs):
+        """
+        Insert or update jobs keyed by their content-addressed ID.
+
+        Jobs without an 'id' are given one with make_job_id. Returns the IDs in order.
+        """
+        conn = self._connect()
+        now = time.time()
+        ids = []
+        with conn:
+            for job in jobs:
+                if not job.get('id'):
+                    job['id'] = make_job_id(job)
+                values = [_column_value(job.get(field)) for field in INDEXED_FIELDS]
+                values += [job_city(job.get('location')), int(accepts_international(job))]
+                row = conn.execute('''
+                    INSERT INTO jobs (id, source, title, company, location, closing_date, job_type, link, city, international,
+                                      data, first_seen, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (id) DO UPDATE SET
+                        title = excluded.title,
+                        company = excluded.company,
+                        location = excluded.location,
+                        closing_date = excluded.closing_date,
+                        job_type = excluded.job_type,
+                        city = excluded.city,
+                        international = excluded.international,
+                        data = excluded.data,
+                        updated_at = excluded.updated_at
+                    RETURNING doc_id
+                ''', [job['id']] + values + [json.dumps(job, default=str), now, now]).fetchone()
+                # Keep the text index in step with the row, replacing the job's previous text
+                conn.execute('INSERT OR REPLACE INTO jobs_text (rowid, title, company, disciplines, description, company_info) '
+                             'VALUES (?, ?, ?, ?, ?, ?)', [row[0]] + _text_values(job))
+                ids.append(job['id'])
+        for job in jobs:
+            self._remember(dict(job))
+        return ids
+
+    def get_job(self, job_id):
+        """Look up a job by ID, from the in-memory index when possible"""
+        with self._index_lock:
+            job = self._index.get(job_id)
+            if job is not None:
+                self._index.move_to_end(job_id)
+                return dict(job)
+        row = self._connect().execute('SELECT id, data FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = _row_to_job(row)
+        self._remember(dict(job))
+        return job
+
+    def _remember(self, job):
+        with self._index_lock:
+            self._index[job['id']] = job
+            self._index.move_to_end(job['id'])
+            while len(self._index) > ID_INDEX_SIZE:
+                self._index.popitem(last=False)
+
+    def record_search(self, key, params):
+        """Count a request for a search; the most requested ones are kept warm by the refresh scheduler"""
+        conn = self._connect()
+        with conn:
+            conn.execute('''
+                INSERT INTO searches (search_key, params, updated_at, request_count) VALUES (?, ?, ?, 1)
+                ON CONFLICT (search_key) DO UPDATE SET
+                    params = excluded.params,
+                    updated_at = excluded.updated_at,
+                    request_count = request_count + 1
+            ''', (key, json.dumps(params), time.time()))
+
+    def start_search(self, key):
+        """Forget the results of a previous run of the same search"""
+        conn = self._connect()
+        with conn:
+            conn.execute('DELETE FROM search_results WHERE search_key = ?', (key,))
+            conn.execute('UPDATE searches SET refreshed_at = NULL WHERE search_key = ?', (key,))
+
+    def replace_search_results(self, key, job_ids):
+        """Swap in the complete result set of a finished search and mark it fresh"""
+        conn = self._connect()
+        with conn:
+            conn.execute('DELETE FROM search_results WHERE search_key = ?', (key,))
+            conn.executemany('INSERT OR IGNORE INTO search_results (search_key, job_id, position) VALUES (?, ?, ?)',
+                             [(key, job_id, position) for position, job_id in enumerate(job_ids)])
+            conn.execute('UPDATE searches SET refreshed_at = ? WHERE search_key = ?', (time.time(), key))
+
+    def search_age(self, key):
+        """Seconds since a search's results were last completed, or None if they never were"""
+        row = self._connect().execute('SELECT refreshed_at FROM searches WHERE search_key = ?', (key,)).fetchone()
+        if row is None or row['refreshed_at'] is None:
+            return None
+        return time.time() - row['refreshed_at']
+
+    def popular_searches(self, limit, since=None):
+        """
+        The most requested searches as (params, refreshed_at) pairs.
+
+        `since` limits the ranking to searches requested after that timestamp, so
+        combinations nobody asks for any more drop out.
+        """
+        rows = self._connect().execute('''
+            SELECT params, refreshed_at FROM searches
+            WHERE updated_at >= ?
+            ORDER BY request_count DESC, updated_at DESC
+            LIMIT ?
+        ''', (since or 0, limit)).fetchall()
+        return [(json.loads(row['params']), row['refreshed_at']) for row in rows]
+
+    def add_search_results(self, key, job_ids):
+        """Record jobs returned by a search, keeping the order they arrived in"""
+        conn = self._connect()
+        with conn:
+            start = conn.execute('SELECT COALESCE(MAX(position), -1) + 1 FROM search_results WHERE search_key = ?',
+                                 (key,)).fetchone()[0]
+            conn.executemany('INSERT OR IGNORE INTO search_results (search_key, job_id, position) VALUES (?, ?, ?)',
+                             [(key, job_id, start + i) for i, job_id in enumerate(job_ids)])
+
+    def remove_search_results(self, key, job_ids):
+        """Drop jobs from a search's results (e.g. when a richer duplicate replaced them)"""
+        conn = self._connect()
+        with conn:
+            conn.executemany('DELETE FROM search_results WHERE search_key = ? AND job_id = ?',
+                             [(key, job_id) for job_id in job_ids])
+
+    def jobs_for_search(self, key):
+        rows = self._connect().execute('''
+            SELECT jobs.id, jobs.data FROM search_results
+            JOIN jobs ON jobs.id = search_results.job_id
+            WHERE search_results.search_key = ?
+            ORDER BY search_results.position
+        ''', (key,)).fetchall()
+        return [_row_to_job(row) for row in rows]
+
+    def jobs_updated_since(self, since):
+        """(job, updated_at) for every job stored or updated after `since`, oldest change first"""
+        rows = self._connect().execute(
+            'SELECT id, data, updated_at FROM jobs WHERE updated_at > ? ORDER BY updated_at', (since,)).fetchall()
+        return [(_row_to_job(row), row['updated_at']) for row in rows]
+
+    def _search_filters(self, key, filters, ranked=False):
+        """
+        FROM clause, WHERE clause and parameters selecting a search's results that pass `filters`.
+
+        With `ranked` set, a text filter joins the full-text matches as `matches` (rowid,
+        score, joined on doc_id) so they can be sorted by relevance. Otherwise it only checks membership,
+        which never reads the matching jobs' rows and is much cheaper for common words.
+        """
+        tables = 'search_results JOIN jobs ON jobs.id = search_results.job_id'
+        clauses = ['search_results.search_key = ?']
+        params = [key]
+        match = self._text_match(filters.get('text'))
+        if match and ranked:
+            # Run the full-text query once and look its matches up in the search. Left to itself
+            # the planner may instead re-run the query for every result of the search.
+            weights = ', '.join(str(weight) for _, weight in TEXT_FIELDS)
+            tables = (f'(SELECT rowid, bm25(jobs_text, {weights}) AS score FROM jobs_text WHERE jobs_text MATCH ?) AS matches'
+                      f' CROSS JOIN jobs ON jobs.doc_id = matches.rowid'
+                      f' CROSS JOIN search_results ON search_results.job_id = jobs.id')
+            params.insert(0, match)
+        elif match:
+            clauses.append('jobs.doc_id IN (SELECT rowid FROM jobs_text WHERE jobs_text MATCH ?)')
+            params.append(match)
+        for column in EQUALITY_FILTERS:
+            if filters.get(column):
+                clauses.append(f'jobs.{column} = ?')
+                params.append(filters[column])
+        if filters.get('international'):
+            clauses.append('jobs.international = 1')
+        if filters.get('closing_from'):
+            clauses.append('jobs.closing_date >= ?')
+            params.append(filters['closing_from'])
+        if filters.get('closing_to'):
+            clauses.append('jobs.closing_date <= ?')
+            params.append(filters['closing_to'])
+        return tables, ' AND '.join(clauses), params
+
+    def search_page(self, key, filters=None, sort='position', after=None, limit=50):
+        """
+        One page of a search's results, filtered, sorted and paginated in SQLite.
+
+        Args:
+            key: The search's key
+            filters: Dict with any of source, company, city, job_type (exact matches),
+                international (truthy to require it), closing_from / closing_to
+                (inclusive YYYY-MM-DD bounds) and text (a text_query over TEXT_FIELDS)
+            sort: One of SORT_ORDERS
+            after: Sort key of the last row of the previous page, or None for the first page
+            limit: Rows per page
+
+        Returns (jobs, total, next_after): total counts every row passing the filters and
+        next_after is the sort key to pass for the following page, or None on the last page.
+        """
+        filters = filters or {}
+        order = SORT_ORDERS[sort]
+        ranked = sort == 'relevance' and text_query(filters.get('text')) is not None
+        if sort == 'relevance' and not ranked:
+            # Nothing to rank by; order by position, keeping the cursor's shape
+            order = [('search_results.position', False)] + order[1:]
+        conn = self._connect()
+        tables, where, params = self._search_filters(key, filters)
+        total = conn.execute(f'SELECT COUNT(*) FROM {tables} WHERE {where}', params).fetchone()[0]
+
+        if ranked:
+            tables, where, params = self._search_filters(key, filters, ranked=True)
+
+        if after is not None:
+            clause, values = _keyset_after(order, after)
+            where += f' AND {clause}'
+            params = params + values
+        sort_keys = ', '.join(f'{expression} AS sort_{index}' for index, (expression, _) in enumerate(order))
+        order_by = ', '.join(f"{expression}{' DESC' if descending else ''}" for expression, descending in order)
+        rows = conn.execute(f'''
+            SELECT jobs.id, jobs.data, {sort_keys} FROM {tables}
+            WHERE {where}
+            ORDER BY {order_by}
+            LIMIT ?
+        ''', params + [limit + 1]).fetchall()
+
+        next_after = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_after = [rows[-1][f'sort_{index}'] for index in range(len(order))]
+        return [_row_to_job(row) for row in rows], total, next_after
+
+    def search_text(self, query, limit=50):
+        """
+        Every stored job matching a text query (see text_query), most relevant first.
+
+        Returns (job, score) pairs; lower bm25 scores are better matches.
+        """
+        match = self._text_match(query)
+        if not match:
+            return []
+        weights = ', '.join(str(weight) for _, weight in TEXT_FIELDS)
+        rows = self._connect().execute(f'''
+            SELECT jobs.id, jobs.data, matches.score FROM (
+                SELECT rowid, bm25(jobs_text, {weights}) AS score FROM jobs_text
+                WHERE jobs_text MATCH ? ORDER BY score LIMIT ?
+            ) AS matches
+            JOIN jobs ON jobs.doc_id = matches.rowid
+            ORDER BY matches.score
+        ''', (match, limit)).fetchall()
+        return [(_row_to_job(row), row['score']) for row in rows]
+
+    def search_facets(self, key):
+        """Distinct sources, companies, cities and job types among a search's results, for the filter menus"""
+        columns = ', '.join(f'jobs.{column}' for column in EQUALITY_FILTERS)
+        rows = self._connect().execute(f'''
+            SELECT DISTINCT {columns} FROM search_results
+            JOIN jobs ON jobs.id = search_results.job_id
+            WHERE search_results.search_key = ?
+        ''', (key,)).fetchall()
+        return {column: sorted({row[index] for row in rows if row[index]})
+                for index, column in enumerate(EQUALITY_FILTERS)}
+
+    def frontier_diff(self, source, scope, cards, max_age=FRONTIER_MAX_AGE):
+        """
+        Split listing cards into links whose detail page needs fetching and links already scraped.
+
+        `cards` maps canonical job links to their card fingerprint. A link needs fetching if
+        it is new, its card changed, or it was last fetched more than max_age ago. Returns
+        (changed_links, known) where known maps each unchanged link to its frontier entry
+        ({'job_id', 'data'}; both None for postings the scraper skipped).
+        """
+        conn = self._connect()
+        links = list(cards)
+        rows = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(links), 500):
+            chunk = links[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            for row in conn.execute(f'SELECT link, fingerprint, job_id, data, last_fetched FROM frontier '
+                                    f'WHERE source = ? AND scope = ? AND link IN ({placeholders})',
+                                    [source, scope] + chunk):
+                rows[row['link']] = row
+
+        cutoff = time.time() - max_age
+        changed = []
+        known = {}
+        for link, fingerprint in cards.items():
+            row = rows.get(link)
+            if row is None or row['fingerprint'] != fingerprint or row['last_fetched'] < cutoff:
+                changed.append(link)
+            else:
+                known[link] = {'job_id': row['job_id'], 'data': json.loads(row['data']) if row['data'] else None}
+        return changed, known
+
+    def update_frontier(self, source, scope, entries):
+        """
+        Record freshly fetched detail pages.
+
+        `entries` are (link, fingerprint, job_id, data) tuples. `data` is an optional copy of
+        the scraped record for callers that keep their results outside the jobs table.
+        """
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.executemany('''
+                INSERT OR REPLACE INTO frontier (source, scope, link, fingerprint, job_id, data, last_fetched)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', [(source, scope, link, fingerprint, job_id, json.dumps(data, default=str) if data is not None else None, now)
+                  for link, fingerprint, job_id, data in entries])
+
+    def get_suggestion(self, cache_key):
+        row = self._connect().execute('SELECT text FROM suggestions WHERE cache_key = ?', (cache_key,)).fetchone()
+        return row['text'] if row else None
+
+    def put_suggestion(self, cache_key, text):
+        conn = self._connect()
+        with conn:
+            conn.execute('INSERT OR REPLACE INTO suggestions (cache_key, text, created_at) VALUES (?, ?, ?)',
+                         (cache_key, text, time.time()))
+
+    def query(self, source=None, company=None, location=None, job_type=None, closing_from=None, closing_to=None, limit=None):
+        """Filter stored jobs using the indexed columns"""
+        clauses = []
+        params = []
+        for column, value in (('source', source), ('company', company), ('location', location), ('job_type', job_type)):
+            if value:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        if closing_from:
+            clauses.append('closing_date >= ?')
+            params.append(closing_from)
+        if closing_to:
+            clauses.append('closing_date <= ?')
+            params.append(closing_to)
+        sql = 'SELECT id, data FROM jobs'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY updated_at DESC'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return [_row_to_job(row) for row in self._connect().execute(sql, params).fetchall()]
+
+    def count(self):
+        return self._connect().execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+
+
+def _column_value(value):
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return str(value)
+
+
+def _keyset_after(order, after):
+    """SQL condition (and its parameters) selecting rows that sort after the key `after` in `order`"""
+    alternatives = []
+    params = []
+    for index, (expression, descending) in enumerate(order):
+        terms = [f'({earlier}) = ?' for earlier, _ in order[:index]]
+        terms.append(f"({expression}) {'<' if descending else '>'} ?")
+        alternatives.append('(' + ' AND '.join(terms) + ')')
+        params.extend(after[:index + 1])
+    return '(' + ' OR '.join(alternatives) + ')', params
+
+
+def _row_to_job(row):
+    job = json.loads(row['data'])
+    job['id'] = row['id']
+    return job
@@ -0,0 +1,148 @@
+import heapq
+import itertools
+import logging
+import os
+import queue
+import threading
+
+from resume_advisor import SuggestionError
+
+logger = logging.getLogger(__name__)
+
+# Generations run at once; match the model server's parallelism (Ollama's OLLAMA_NUM_PARALLEL),
+# since anything beyond it only queues inside the server where priorities don't apply
+CONCURRENCY = int(os.environ.get('OLLAMA_CONCURRENCY', 1))
+
+# Analyses allowed to wait for the model before new ones are turned away
+QUEUE_SIZE = int(os.environ.get('LLM_QUEUE_SIZE', 64))
+
+# Lower runs first: someone waiting on one analysis goes ahead of batch work
+INTERACTIVE = 0
+BATCH = 10
+
+
+class QueueFull(Exception):
+    """Too many analyses are waiting for the model"""
+
+
+class GenerationTask:
+    """
+    One resume analysis waiting for or running on the model.
+
+    Progress is put on `events` as (kind, job ID, value) tuples: ('token', id, text)
+    for each chunk if `tokens` is set, then ('done', id, suggestions) or ('error', id,
+    message). Several tasks may share one events queue.
+    """
+
+    def __init__(self, resume_text, job, priority, events, tokens=False):
+        self.resume_text = resume_text
+        self.job = job
+        self.priority = priority
+        self.events = events
+        self.tokens = tokens
+        self.cancelled = False
+
+    def cancel(self):
+        """Skip the task if it hasn't started, or stop it at its next token"""
+        self.cancelled = True
+
+
+class GenerationQueue:
+    """
+    Bounded priority queue in front of the model, drained by `concurrency` workers.
+
+    Tasks run in (priority, submission) order, at most `concurrency` at a time, and
+    at most `size` may wait; submit raises QueueFull beyond that rather than letting
+    requests pile up behind a slow model. Cached suggestions never enter the queue.
+    """
+
+    def __init__(self, advisor, concurrency=CONCURRENCY, size=QUEUE_SIZE):
+        self.advisor = advisor
+        self.concurrency = concurrency
+        self.size = size
+        self._heap = []
+        self._order = itertools.count()
+        self._condition = threading.Condition()
+        self._workers = []
+
+    def __len__(self):
+        with self._condition:
+            return len(self._heap)
+
+    def submit(self, tasks):
+        """Queue tasks, all or none; raises QueueFull if they don't fit"""
+        tasks = list(tasks)
+        with self._condition:
+            if len(self._heap) + len(tasks) > self.size:
+                raise QueueFull(f"{len(self._heap)} analyses are already waiting for the model; try again shortly")
+            for task in tasks:
+                heapq.heappush(self._heap, (task.priority, next(self._order), task))
+            while len(self._workers) < self.concurrency:
+                worker = threading.Thread(target=self._work, name=f'llm-{len(self._workers)}', daemon=True)
+                self._workers.append(worker)
+                worker.start()
+            self._condition.notify(len(tasks))
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._heap:
+                    self._condition.wait()
+                _, _, task = heapq.heappop(self._heap)
+            if not task.cancelled:
+                self._run(task)
+
+    def _run(self, task):
+        job_id = task.job['id']
+        parts = []
+        try:
+            stream = self.advisor.stream(task.resume_text, task.job)
+            try:
+                for text in stream:
+                    if task.cancelled:
+                        return
+                    parts.append(text)
+                    if task.tokens:
+                        task.events.put(('token', job_id, text))
+            finally:
+                # Stops reading the generation if the task was cancelled part way
+                stream.close()
+            task.events.put(('done', job_id, ''.join(parts)))
+        except SuggestionError as e:
+            task.events.put(('error', job_id, str(e)))
+        except Exception as e:
+            logger.exception(f"Analysis of job {job_id} failed")
+            task.events.put(('error', job_id, str(e)))
+
+    def analyze(self, resume_text, jobs, priority=BATCH, tokens=False):
+        """
+        Analyse the resume against each job, yielding events (see GenerationTask) as
+        they happen: cached suggestions first, then the rest as the model finishes
+        them, in job order within `priority`. Raises QueueFull before yielding if
+        the uncached jobs don't fit in the queue. Closing the generator cancels the
+        jobs not yet finished.
+        """
+        events = queue.Queue()
+        tasks = []
+        ready = []
+        for position, job in enumerate(jobs):
+            cached = self.advisor.cached(resume_text, job)
+            if cached is not None:
+                ready.append(('done', job['id'], cached))
+            else:
+                tasks.append(GenerationTask(resume_text, job, (priority, position), events, tokens))
+        self.submit(tasks)
+        return self._events(ready, tasks, events)
+
+    def _events(self, ready, tasks, events):
+        try:
+            yield from ready
+            remaining = len(tasks)
+            while remaining:
+                event = events.get()
+                if event[0] != 'token':
+                    remaining -= 1
+                yield event
+        finally:
+            for task in tasks:
+                task.cancel()
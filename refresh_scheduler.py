@@ -0,0 +1,98 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Longest a popular search goes without being re-scraped
+DEFAULT_INTERVAL = int(os.environ.get('REFRESH_INTERVAL', 30 * 60))
+
+# Share of a search's cache TTL after which it is re-scraped, leaving the rest for the
+# scrape to finish before /search would find the results stale
+TTL_FRACTION = 0.5
+
+# How many of the most requested searches are kept warm
+DEFAULT_TOP_N = int(os.environ.get('REFRESH_TOP_N', 20))
+
+# Searches nobody has requested for this long stop being refreshed
+POPULAR_WINDOW = 7 * 24 * 60 * 60
+
+
+class RefreshScheduler:
+    """
+    Keep the most requested searches fresh in the job store.
+
+    /search records every request (see JobStore.record_search). On each cycle the
+    scheduler takes the top_n searches requested within POPULAR_WINDOW and re-runs
+    any whose results are older than their interval through `refresh(params)`, so an
+    interactive search for one of them is answered straight from the store.
+    Searches are refreshed one at a time to keep the load on each site steady.
+
+    `ttl(params)`, if given, is how long the search cache counts a search's results
+    as fresh; each search is then refreshed after TTL_FRACTION of it, or `interval`
+    if that comes first, so warmed searches never go stale between cycles.
+    """
+
+    def __init__(self, store, refresh, interval=DEFAULT_INTERVAL, top_n=DEFAULT_TOP_N, ttl=None):
+        self.store = store
+        self.refresh = refresh
+        self.interval = interval
+        self.top_n = top_n
+        self.ttl = ttl
+        self._shortest = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def interval_for(self, params):
+        """Seconds a search's results may age before it is refreshed"""
+        if self.ttl is None:
+            return self.interval
+        return min(self.interval, self.ttl(params) * TTL_FRACTION)
+
+    def due(self):
+        """Popular searches whose stored results are missing or older than their interval"""
+        now = time.time()
+        popular = self.store.popular_searches(self.top_n, since=now - POPULAR_WINDOW)
+        self._shortest = min((self.interval_for(params) for params, _ in popular), default=self.interval)
+        return [params for params, refreshed_at in popular
+                if refreshed_at is None or now - refreshed_at >= self.interval_for(params)]
+
+    def run_once(self):
+        """Refresh every search that is due; returns how many were refreshed"""
+        refreshed = 0
+        for params in self.due():
+            if self._stop.is_set():
+                break
+            start = time.time()
+            try:
+                self.refresh(params)
+                refreshed += 1
+                logger.info(f"Refreshed {params} in {time.time() - start:.1f}s")
+            except Exception as e:
+                logger.error(f"Error refreshing {params}: {e}")
+        return refreshed
+
+    def run_forever(self):
+        # Check for due searches several times per interval so new popular ones are picked up quickly
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(max(min(self._shortest / 4, 300), 1))
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name='refresh-scheduler', daemon=True)
+            self._thread.start()
+            logger.info(f"Refresh scheduler started: top {self.top_n} searches at least every {self.interval}s")
+
+    def stop(self):
+        self._stop.set()
+
+
+if __name__ == '__main__':
+    # Sidecar mode: refresh searches from a separate process sharing the same job store
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    from app import job_store, scheduled_refresh, cache_ttl
+
+    RefreshScheduler(job_store, scheduled_refresh, ttl=cache_ttl).run_forever()
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+from scrapers import http_client
+
+logger = logging.getLogger(__name__)
+
+# Ollama server and model; point OLLAMA_URL at a stub server to run without a model
+OLLAMA_URL = os.environ.get('OLLAMA_URL', 'http://localhost:11434')
+OLLAMA_MODEL = os.environ.get('OLLAMA_MODEL', 'llama2')
+
+# Bump when build_prompt changes, so suggestions written for the old prompt aren't served
+PROMPT_VERSION = 1
+
+# Seconds a whole generation may take, and may go without producing a token
+DEADLINE = float(os.environ.get('OLLAMA_DEADLINE', 300))
+IDLE_TIMEOUT = float(os.environ.get('OLLAMA_IDLE_TIMEOUT', 60))
+CONNECT_TIMEOUT = 5
+
+# Keep-alive connections held open to the Ollama server
+CONNECTIONS = int(os.environ.get('OLLAMA_CONNECTIONS', 4))
+
+# Completed suggestions kept in memory; the job store holds the rest
+CACHE_SIZE = int(os.environ.get('SUGGESTION_CACHE_SIZE', 256))
+
+
+class SuggestionError(Exception):
+    """The model couldn't produce suggestions"""
+
+
+def build_prompt(resume_text, job_data):
+    """The prompt asking the model to adjust a resume for a job"""
+    return f"""
+You are an expert resume consultant. Your task is to analyze the provided resume and suggest specific adjustments
+to better match the job requirements for the following position:
+
+Company: {job_data['company']}
+Position: {job_data['title']}
+Job Type: {job_data.get('job_type')}
+
+Job Requirements and Details:
+{job_data.get('requirements', 'Not specified')}
+
+Current Resume:
+{resume_text}
+
+Please provide:
+1. A list of specific modifications to make to the resume
+2. Explanation of why each change would make the resume more effective for this position
+3. Any keywords or phrases from the job description that should be incorporated
+4. Skills or experiences to emphasize
+5. Suggested new bullet points for relevant experiences
+
+Format your response in clear sections with specific, actionable suggestions.
+"""
+
+
+def suggestion_key(resume_text, job_id, model, prompt_version=PROMPT_VERSION):
+    """Cache key for the suggestions a model gives for a resume and job under a prompt version"""
+    resume_hash = hashlib.sha256(resume_text.encode('utf-8')).hexdigest()
+    return hashlib.sha256(f"{resume_hash}:{job_id}:{model}:{prompt_version}".encode('utf-8')).hexdigest()
+
+
+class ResumeAdvisor:
+    """
+    Streams resume suggestions from Ollama and caches the completed ones.
+
+    Generations go through the shared pooled HTTP session with `stream` on, so
+    tokens are passed on as Ollama produces them. A generation fails once it runs
+    past `deadline` seconds in total or `idle_timeout` without a token: each read
+    from the socket may only wait for whichever comes first. Only completed
+    suggestions are cached: in memory (LRU, `size` entries) over the job store,
+    keyed by suggestion_key, so a repeat analysis is answered without the model.
+    """
+
+    def __init__(self, store, url=OLLAMA_URL, model=OLLAMA_MODEL, deadline=DEADLINE, idle_timeout=IDLE_TIMEOUT,
+                 size=CACHE_SIZE):
+        self.store = store
+        self.url = url.rstrip('/')
+        self.model = model
+        self.deadline = deadline
+        self.idle_timeout = idle_timeout
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        http_client.configure_host(urlsplit(self.url).hostname or '', CONNECTIONS)
+
+    def cached(self, resume_text, job):
+        """Completed suggestions for the resume and job, or None"""
+        key = suggestion_key(resume_text, job['id'], self.model)
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+                return text
+        text = self.store.get_suggestion(key)
+        if text is not None:
+            self._remember(key, text)
+        return text
+
+    def _remember(self, key, text):
+        with self._lock:
+            self._entries[key] = text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def stream(self, resume_text, job):
+        """
+        Yield the suggestions for the resume and job as text chunks: the cached text in
+        one chunk, or the model's tokens as they arrive. Raises SuggestionError.
+        """
+        cached = self.cached(resume_text, job)
+        if cached is not None:
+            yield cached
+            return
+
+        started = time.monotonic()
+        try:
+            response = http_client.post(f"{self.url}/api/generate", rate_limit=False, stream=True,
+                                        json={"model": self.model, "prompt": build_prompt(resume_text, job), "stream": True},
+                                        timeout=(CONNECT_TIMEOUT, min(self.idle_timeout, self.deadline)))
+        except Exception as e:
+            raise SuggestionError(f"Error connecting to Ollama: {e}") from e
+
+        parts = []
+        sock = getattr(getattr(response.raw, 'connection', None), 'sock', None)
+        try:
+            if response.status_code != 200:
+                raise SuggestionError(f"Failed to get response from Ollama (Status code: {response.status_code})")
+            for line in response.iter_lines():
+                remaining = self.deadline - (time.monotonic() - started)
+                if remaining <= 0:
+                    raise SuggestionError(f"Ollama took longer than {self.deadline:g}s")
+                if sock is not None:
+                    # The next read must not outlast the deadline either
+                    sock.settimeout(min(self.idle_timeout, remaining))
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get('error'):
+                    raise SuggestionError(f"Ollama failed: {chunk['error']}")
+                if chunk.get('response'):
+                    parts.append(chunk['response'])
+                    yield chunk['response']
+                if chunk.get('done'):
+                    break
+            else:
+                raise SuggestionError("Ollama stopped before finishing")
+        except SuggestionError:
+            raise
+        except Exception as e:
+            if time.monotonic() - started >= self.deadline:
+                raise SuggestionError(f"Ollama took longer than {self.deadline:g}s") from e
+            raise SuggestionError(f"Error reading from Ollama: {e}") from e
+        finally:
+            # Also runs when the client goes away mid-stream; closing stops reading the generation
+            response.close()
+
+        text = ''.join(parts)
+        key = suggestion_key(resume_text, job['id'], self.model)
+        self._remember(key, text)
+        self.store.put_suggestion(key, text)
+        logger.info(f"Generated suggestions for job {job['id']} in {time.monotonic() - started:.1f}s")
+
+    def suggest(self, resume_text, job):
+        """The complete suggestions for the resume and job; raises SuggestionError"""
+        return ''.join(self.stream(resume_text, job))
@@ -0,0 +1,191 @@
+import logging
+import math
+import threading
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from job_store import TEXT_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Hashed term space; collisions are rare at this size for job-ad vocabularies
+N_FEATURES = 2 ** 20
+
+# Jobs updated this many seconds before the newest one already indexed are read again on
+# refresh, in case a slower writer committed them after that one
+UPDATE_MARGIN = 60
+
+# Replaced rows are dropped from the matrix once they make up this share of it
+COMPACT_RATIO = 0.5
+
+# A block of rows is merged into the one before it once it has grown to this share of its size
+MERGE_RATIO = 0.25
+
+
+def job_text(job):
+    """The text of a job the matcher compares a resume with"""
+    values = []
+    for field, _ in TEXT_FIELDS:
+        value = job.get(field)
+        if isinstance(value, (list, tuple)):
+            value = ' '.join(str(item) for item in value)
+        if value:
+            values.append(str(value))
+    return '\n'.join(values)
+
+
+class ResumeMatcher:
+    """
+    Ranks every stored job against a resume by TF-IDF cosine similarity.
+
+    Jobs are kept as rows of sparse term counts (hashed, so new words need no
+    vocabulary refit) alongside how many jobs contain each term. Refreshing reads
+    only the jobs updated since the last refresh: new jobs are appended as rows and
+    updated ones replace their old row. IDF weights are derived from the counts at
+    query time, so scoring a resume is exact TF-IDF cosine over the current corpus
+    and costs two sparse matrix-vector products.
+
+    Rows live in a few CSR blocks, newest last. New rows form a block of their own
+    that is merged into the previous one once comparable in size, so adding a few
+    jobs never copies the whole matrix.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._vectorizer = HashingVectorizer(n_features=N_FEATURES, stop_words='english', alternate_sign=False, norm=None)
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        # [matrix, squared matrix or None, first row]
+        self._blocks = []
+        self._pending = []
+        self._ids = []
+        self._alive = np.zeros(0, dtype=bool)
+        self._rows = {}
+        self._document_counts = np.zeros(N_FEATURES, dtype=np.int64)
+        # Row norms under the current IDF weights, until jobs are added
+        self._norms = None
+        self._synced_at = 0.0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _vectorize(self, texts):
+        """Sublinear term frequencies (1 + log count) of each text, one CSR row per text"""
+        counts = self._vectorizer.transform(texts).tocsr()
+        counts.data = 1 + np.log(counts.data)
+        return counts
+
+    def add(self, jobs, updated_at=None):
+        """Index `jobs` (dicts with an 'id'), replacing any earlier version of the same jobs"""
+        jobs = list(jobs)
+        stamps = updated_at or [None] * len(jobs)
+        # Only the last version of a job listed twice is kept
+        latest = sorted({job['id']: index for index, job in enumerate(jobs)}.values())
+        jobs = [jobs[index] for index in latest]
+        stamps = [stamps[index] for index in latest]
+        if not jobs:
+            return
+        rows = self._vectorize([job_text(job) for job in jobs])
+        with self._lock:
+            start = len(self._ids)
+            for index, job in enumerate(jobs):
+                old = self._rows.get(job['id'])
+                if old is not None:
+                    self._forget(old[0])
+                self._rows[job['id']] = (start + index, stamps[index])
+            self._ids.extend(job['id'] for job in jobs)
+            self._alive = np.concatenate([self._alive, np.ones(len(jobs), dtype=bool)])
+            self._document_counts += np.bincount(rows.indices, minlength=N_FEATURES)
+            self._pending.append(rows)
+            self._norms = None
+
+    def _forget(self, row):
+        """Drop a row that a newer version of its job replaces"""
+        self._alive[row] = False
+        self._flush()
+        matrix, _, first = next(block for block in reversed(self._blocks) if block[2] <= row)
+        row -= first
+        self._document_counts[matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]]] -= 1
+
+    def _flush(self):
+        """Turn rows added since the last flush into a block, merging blocks as they even out"""
+        if not self._pending:
+            return
+        first = self._blocks[-1][2] + self._blocks[-1][0].shape[0] if self._blocks else 0
+        self._blocks.append([sparse.vstack(self._pending, format='csr'), None, first])
+        self._pending = []
+        while len(self._blocks) > 1 and self._blocks[-1][0].shape[0] >= MERGE_RATIO * self._blocks[-2][0].shape[0]:
+            last = self._blocks.pop()
+            self._blocks[-1][0] = sparse.vstack([self._blocks[-1][0], last[0]], format='csr')
+            self._blocks[-1][1] = None
+
+    def _compact(self):
+        """Rebuild the matrix without replaced rows once they take up too much of it"""
+        dead = len(self._alive) - int(self._alive.sum())
+        if dead <= COMPACT_RATIO * len(self._alive):
+            return
+        keep = np.flatnonzero(self._alive)
+        matrix = sparse.vstack([block[0] for block in self._blocks], format='csr')[keep]
+        self._blocks = [[matrix, None, 0]]
+        self._ids = [self._ids[row] for row in keep]
+        self._alive = np.ones(len(keep), dtype=bool)
+        self._rows = {job_id: (row, self._rows[job_id][1]) for row, job_id in enumerate(self._ids)}
+        self._norms = None
+
+    def refresh(self):
+        """Index jobs stored or updated since the last refresh"""
+        # One refresh at a time, so concurrent requests don't all index the same backlog
+        with self._refresh_lock:
+            changed = self.store.jobs_updated_since(max(self._synced_at - UPDATE_MARGIN, 0))
+            # Jobs re-read because of the margin are skipped unless they changed again
+            changed = [(job, stamp) for job, stamp in changed if self._rows.get(job['id'], (None, None))[1] != stamp]
+            if changed:
+                self.add([job for job, _ in changed], [stamp for _, stamp in changed])
+                self._synced_at = max(self._synced_at, max(stamp for _, stamp in changed))
+                logger.info(f"Indexed {len(changed)} jobs for resume matching ({len(self)} in total)")
+
+    def match(self, text, limit=20):
+        """
+        The `limit` jobs most similar to `text`, best first, as (job ID, cosine similarity)
+        pairs. Jobs sharing no terms with the text are left out.
+        """
+        self.refresh()
+        query = self._vectorize([text])
+        if not query.nnz:
+            return []
+        with self._lock:
+            self._flush()
+            self._compact()
+            jobs = len(self._rows)
+            if not jobs:
+                return []
+            # Smoothed IDF, as sklearn's TfidfTransformer computes it
+            idf = np.log((1 + jobs) / (1 + self._document_counts)) + 1
+            squared_idf = idf * idf
+            if self._norms is None:
+                for block in self._blocks:
+                    if block[1] is None:
+                        block[1] = block[0].multiply(block[0]).tocsr()
+                self._norms = np.sqrt(np.concatenate([squares @ squared_idf for _, squares, _ in self._blocks]))
+            norms = self._norms
+
+            # Words no job contains can't match anything; like a fitted vectorizer, ignore them
+            known = self._document_counts[query.indices] > 0
+            terms, frequencies = query.indices[known], query.data[known]
+            if not len(terms):
+                return []
+            weights = np.zeros(N_FEATURES)
+            weights[terms] = frequencies * squared_idf[terms]
+            query_norm = math.sqrt(float(np.dot(frequencies, weights[terms])))
+            scores = np.concatenate([matrix @ weights for matrix, _, _ in self._blocks])
+            scores[~self._alive] = 0
+            np.divide(scores, norms * query_norm, out=scores, where=norms > 0)
+
+            count = min(limit, int(np.count_nonzero(scores > 0)))
+            if count <= 0:
+                return []
+            top = np.argpartition(-scores, count - 1)[:count]
+            top = top[np.argsort(-scores[top], kind='stable')]
+            return [(self._ids[row], float(scores[row])) for row in top]
@@ -0,0 +1,277 @@
+import concurrent.futures
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Pages of a PDF read at most; resumes are a few pages, anything past this is noise
+MAX_PAGES = int(os.environ.get('RESUME_MAX_PAGES', 10))
+
+# Seconds a worker spends extracting one file before returning what it has
+EXTRACT_TIMEOUT = float(os.environ.get('RESUME_EXTRACT_TIMEOUT', 10))
+
+# Extra seconds a request waits past EXTRACT_TIMEOUT before giving up on a stuck worker
+KILL_GRACE = 5
+
+# Seconds between checks on whether a queued extraction has been taken by a worker
+POLL_INTERVAL = 0.25
+
+# Extracted texts kept in memory, by content hash
+CACHE_SIZE = int(os.environ.get('RESUME_CACHE_SIZE', 128))
+
+# Worker processes; parsing is CPU bound, so threads would serialize on the GIL
+WORKERS = int(os.environ.get('RESUME_WORKERS', 2))
+
+# Leading bytes of each format, which decide how a file is read whatever its extension says
+PDF_MAGIC = b'%PDF'
+ZIP_MAGIC = b'PK\x03\x04'
+OLE_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+RTF_MAGIC = b'{\\rtf'
+
+# Runs of readable characters in a legacy binary .doc, in its 8-bit and UTF-16 encodings
+DOC_TEXT_8BIT = re.compile(rb'[\x20-\x7e\x91-\x97\r\n\t]{4,}')
+DOC_TEXT_UTF16 = re.compile(rb'(?:[\x20-\x7e\r\n\t]\x00){4,}')
+
+# RTF groups that hold formatting rather than text, control words and escaped characters
+RTF_SKIPPED_GROUP = re.compile(r'\{\\(?:\*|fonttbl|colortbl|stylesheet|info|pict|listtable|listoverridetable)[^{}]*(?:\{[^{}]*\}[^{}]*)*\}')
+RTF_CONTROL = re.compile(r"\\'([0-9a-fA-F]{2})|\\u(-?\d+)\??|\\(par|line|tab)\b ?|\\[a-zA-Z]+-?\d* ?|\\[{}\\]|[{}]")
+
+
+class ResumeTextError(Exception):
+    """A resume couldn't be read"""
+
+
+def file_format(data, filename=''):
+    """'pdf', 'docx', 'doc', 'rtf' or 'txt', from the file's content, falling back to its extension"""
+    if data.startswith(PDF_MAGIC):
+        return 'pdf'
+    if data.startswith(ZIP_MAGIC):
+        return 'docx'
+    if data.startswith(OLE_MAGIC):
+        return 'doc'
+    if data.startswith(RTF_MAGIC):
+        return 'rtf'
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    return extension if extension in ('pdf', 'docx', 'doc') else 'txt'
+
+
+def _pdf_text(data, max_pages, deadline):
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+    from pdfminer.pdfpage import PDFPage
+
+    resources = PDFResourceManager()
+    output = io.StringIO()
+    device = TextConverter(resources, output, laparams=LAParams())
+    interpreter = PDFPageInterpreter(resources, device)
+    try:
+        for number, page in enumerate(PDFPage.get_pages(io.BytesIO(data), maxpages=max_pages), 1):
+            interpreter.process_page(page)
+            if time.monotonic() > deadline:
+                logger.warning(f"Stopped reading a PDF resume after {number} pages: out of time")
+                break
+        return output.getvalue()
+    finally:
+        device.close()
+
+
+def _docx_text(data):
+    import docx
+
+    document = docx.Document(io.BytesIO(data))
+    lines = [paragraph.text for paragraph in document.paragraphs]
+    # Resumes often lay out skills and experience in tables
+    for table in document.tables:
+        for row in table.rows:
+            cells = []
+            for cell in row.cells:
+                # Merged cells repeat across the row
+                if cell.text not in cells:
+                    cells.append(cell.text)
+            lines.append(' | '.join(cells))
+    return '\n'.join(line for line in lines if line.strip())
+
+
+def _doc_text(data):
+    """
+    Best-effort text of a legacy binary Word document: its runs of readable 8-bit or
+    UTF-16 characters. This also picks up style and font names, so converting the
+    file to .docx or PDF gives cleaner text.
+    """
+    utf16 = [run.decode('utf-16-le') for run in DOC_TEXT_UTF16.findall(data)]
+    narrow = [run.decode('cp1252') for run in DOC_TEXT_8BIT.findall(data)]
+    runs = utf16 if sum(map(len, utf16)) > sum(map(len, narrow)) else narrow
+    return '\n'.join(run.strip() for run in runs if re.search(r'[A-Za-z]{2}', run))
+
+
+def _rtf_text(data):
+    def replace(match):
+        hex_char, code_point, breaking = match.groups()
+        if hex_char:
+            return bytes([int(hex_char, 16)]).decode('cp1252', errors='replace')
+        if code_point:
+            return chr(int(code_point) % 65536)
+        if breaking:
+            return '\t' if breaking == 'tab' else '\n'
+        if match.group(0) in ('\\{', '\\}', '\\\\'):
+            return match.group(0)[1]
+        return ''
+
+    text = data.decode('latin-1')
+    previous = None
+    while previous != text:
+        previous, text = text, RTF_SKIPPED_GROUP.sub('', text)
+    return RTF_CONTROL.sub(replace, text)
+
+
+def _plain_text(data):
+    for encoding in ('utf-8-sig', 'utf-16'):
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return data.decode('cp1252', errors='replace')
+
+
+def extract_text(data, filename='', max_pages=MAX_PAGES, timeout=EXTRACT_TIMEOUT):
+    """
+    Text of a resume file's bytes. PDFs are read up to `max_pages` pages and stop at
+    the first page boundary after `timeout` seconds, keeping the text so far.
+    """
+    kind = file_format(data, filename)
+    try:
+        if kind == 'pdf':
+            text = _pdf_text(data, max_pages, time.monotonic() + timeout)
+        elif kind == 'docx':
+            text = _docx_text(data)
+        elif kind == 'doc':
+            text = _doc_text(data)
+        elif kind == 'rtf':
+            text = _rtf_text(data)
+        else:
+            text = _plain_text(data)
+    except Exception as e:
+        raise ResumeTextError(f"Failed to extract text from resume: {e}") from e
+    text = re.sub(r'[ \t]+\n', '\n', text).strip()
+    if not text:
+        hint = '; if it is a scanned PDF, upload a version with selectable text' if kind == 'pdf' else ''
+        raise ResumeTextError(f"No text found in the resume{hint}")
+    return text
+
+
+class ResumeTextExtractor:
+    """
+    Extracts resume text in a pool of worker processes, caching results by content.
+
+    Texts are kept by SHA-256 of the file, least recently used evicted past `size`,
+    so analysing the same resume against many jobs parses it once; concurrent
+    requests for the same file share one extraction. A worker that overruns the
+    timeout by KILL_GRACE (a single pathological page) is killed and the pool
+    replaced, so it can't hold a worker indefinitely. The clock only starts once a
+    worker takes the file, so time spent queued behind other uploads doesn't count.
+    """
+
+    def __init__(self, workers=WORKERS, size=CACHE_SIZE, max_pages=MAX_PAGES, timeout=EXTRACT_TIMEOUT):
+        self.workers = workers
+        self.size = size
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _recycle(self, executor):
+        """Replace a pool whose worker is stuck, killing its processes"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        processes = list((getattr(executor, '_processes', None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        # Shutting down lets running tasks finish; a stuck worker has to be stopped outright
+        for process in processes:
+            process.terminate()
+
+    def _result(self, future):
+        """
+        Wait for an extraction, raising TimeoutError once it has run for longer than
+        the timeout plus KILL_GRACE. The pool marks a file running when it hands it to
+        the workers' call queue, which holds one more file than there are workers, so
+        the allowance covers one extraction still ahead of it.
+        """
+        allowance = 2 * self.timeout + KILL_GRACE
+        deadline = None
+        while True:
+            try:
+                return future.result(timeout=POLL_INTERVAL)
+            except concurrent.futures.TimeoutError:
+                if not future.running():
+                    # Still queued behind other uploads
+                    continue
+                now = time.monotonic()
+                if deadline is None:
+                    deadline = now + allowance
+                elif now >= deadline:
+                    raise
+
+    def extract(self, data, filename='', retry=True):
+        """Text of a resume file's bytes (see extract_text); raises ResumeTextError"""
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                self._entries.move_to_end(digest)
+            else:
+                executor = self._pool()
+                entry = (executor.submit(extract_text, data, filename, self.max_pages, self.timeout), executor)
+                self._entries[digest] = entry
+                while len(self._entries) > self.size:
+                    self._entries.popitem(last=False)
+
+        future, executor = entry
+        try:
+            return self._result(future)
+        except ResumeTextError:
+            self._forget(digest, entry)
+            raise
+        except concurrent.futures.CancelledError as e:
+            # Another upload's overrun replaced the pool before this file was started
+            self._forget(digest, entry)
+            if retry:
+                return self.extract(data, filename, retry=False)
+            raise ResumeTextError("The resume reader was restarted; please try again") from e
+        except concurrent.futures.TimeoutError as e:
+            self._forget(digest, entry)
+            logger.warning(f"Resume extraction overran {self.timeout}s; restarting the workers")
+            self._recycle(executor)
+            raise ResumeTextError("Reading the resume took too long; try a smaller file") from e
+        except concurrent.futures.BrokenExecutor as e:
+            # Also what a file sitting in the call queue gets when another upload's worker is killed
+            self._forget(digest, entry)
+            self._recycle(executor)
+            if retry:
+                return self.extract(data, filename, retry=False)
+            raise ResumeTextError("The resume reader stopped unexpectedly; please try again") from e
+
+    def _forget(self, digest, entry):
+        """Drop a failed extraction so the next upload of the file tries again"""
+        with self._lock:
+            if self._entries.get(digest) is entry:
+                del self._entries[digest]
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
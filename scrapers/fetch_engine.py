@@ -0,0 +1,325 @@
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+from scrapers import http_client, rate_limiter
+from scrapers.response_cache import ResponseCache
+
+try:
+    import aiohttp
+except ImportError:  # Fall back to the pooled requests client running in threads
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+# Requests allowed in flight against a single host unless configured otherwise
+DEFAULT_PER_HOST_LIMIT = 8
+
+# Requests allowed in flight across all hosts
+DEFAULT_TOTAL_LIMIT = 256
+
+DEFAULT_TIMEOUT = 30
+DEFAULT_MAX_RETRIES = 3
+
+# Status codes worth retrying; anything else is returned to the caller as-is
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FetchRequest:
+    """
+    A single page fetch; `context` is passed through untouched for the caller.
+
+    `content_class` ('listing', 'detail', ...) opts the request into the response
+    cache and picks its TTL; requests without one always go to the network.
+    """
+
+    def __init__(self, url, method='GET', headers=None, params=None, timeout=None, verify=True, context=None, content_class=None):
+        self.url = url
+        self.method = method
+        self.headers = headers
+        self.params = params
+        self.timeout = timeout
+        self.verify = verify
+        self.context = context
+        self.content_class = content_class
+
+    @property
+    def host(self):
+        return urlsplit(self.url).hostname or ''
+
+
+class FetchResult:
+    """Outcome of a FetchRequest after retries"""
+
+    def __init__(self, request, status_code=None, headers=None, content=b'', url=None, elapsed=0.0, attempts=0, error=None, from_cache=False):
+        self.request = request
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = content
+        self.url = url or request.url
+        self.elapsed = elapsed
+        self.attempts = attempts
+        self.error = error
+        self.from_cache = from_cache
+
+    @property
+    def ok(self):
+        return self.error is None and self.status_code == 200
+
+    @property
+    def context(self):
+        return self.request.context
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+
+class FetchEngine:
+    """
+    Asyncio fetch engine shared by every scraper.
+
+    Concurrency is bounded per host (so each site sees a polite number of parallel
+    requests) and in total (so one process can keep hundreds of fetches in flight
+    without an OS thread per request). Every network attempt is also paced by the
+    host's adaptive rate limiter, which slows down when the host throttles or
+    fails, so transient failures are retried without a fixed backoff. GET requests
+    with a content class go through the on-disk response cache when one is configured;
+    its SQLite reads and writes run on a worker thread so they never stall the loop.
+    """
+
+    def __init__(self, per_host_limit=DEFAULT_PER_HOST_LIMIT, total_limit=DEFAULT_TOTAL_LIMIT,
+                 timeout=DEFAULT_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES, cache=None):
+        self.cache = cache
+        self.per_host_limit = per_host_limit
+        self.total_limit = total_limit
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._host_limits = {}
+        self._host_semaphores = {}
+        self._total_semaphore = None
+        self._session = None
+        self._executor = None
+        self._cache_executor = None
+        self._in_flight = {}
+        self._max_in_flight = {}
+
+    def set_host_limit(self, host, limit):
+        """
+        Override how many requests may be in flight against a host.
+
+        Setting the limit it already has does nothing. A new limit only applies to
+        fetches that start afterwards; those in flight finish under the old one.
+        """
+        if self._host_limits.get(host) == limit:
+            return
+        self._host_limits[host] = limit
+        self._host_semaphores.pop(host, None)
+        http_client.configure_host(host, limit)
+
+    def _semaphore_for(self, host):
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._host_limits.get(host, self.per_host_limit))
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    async def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.total_limit, limit_per_host=0, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, headers=http_client.DEFAULT_HEADERS)
+        return self._session
+
+    async def _send_aiohttp(self, request):
+        session = await self._get_session()
+        timeout = aiohttp.ClientTimeout(total=request.timeout or self.timeout)
+        async with session.request(request.method, request.url, headers=http_client.negotiate_encoding(request.headers),
+                                   params=request.params, timeout=timeout,
+                                   ssl=None if request.verify else False) as response:
+            content = await response.read()
+            return response.status, dict(response.headers), content, str(response.url)
+
+    async def _send_threaded(self, request):
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=min(self.total_limit, 32),
+                                                                   thread_name_prefix='fetch')
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(self._executor, lambda: http_client.request(
+            request.method, request.url, headers=request.headers, params=request.params,
+            timeout=request.timeout or self.timeout, verify=request.verify, rate_limit=False))
+        return response.status_code, dict(response.headers), response.content, response.url
+
+    async def _cache_io(self, method, *args):
+        """Run a response cache call off the event loop"""
+        if self._cache_executor is None:
+            # The cache serializes on one SQLite connection, so more threads would only queue on its lock
+            self._cache_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='fetch-cache')
+        return await asyncio.get_running_loop().run_in_executor(self._cache_executor, method, *args)
+
+    async def _send(self, request):
+        if aiohttp is not None:
+            return await self._send_aiohttp(request)
+        return await self._send_threaded(request)
+
+    async def fetch(self, request):
+        """Fetch a single request, serving it from the cache when possible and retrying transient failures"""
+        if isinstance(request, str):
+            request = FetchRequest(request)
+
+        cache_key = None
+        cached = None
+        if self.cache is not None and request.content_class and request.method == 'GET':
+            cache_key = self.cache.make_key(request.method, request.url, request.params, request.headers)
+            cached = await self._cache_io(self.cache.get, cache_key, request.content_class)
+            if cached is not None and cached.fresh:
+                return FetchResult(request, cached.status_code, cached.headers, cached.content, cached.url, from_cache=True)
+
+        result = await self._fetch_network(request, cached)
+
+        if cache_key is not None and result.error is None:
+            if result.status_code == 304 and cached is not None:
+                # Not modified: reuse the stored body and restart its TTL
+                await self._cache_io(self.cache.touch, cache_key)
+                return FetchResult(request, cached.status_code, cached.headers, cached.content, cached.url,
+                                   elapsed=result.elapsed, attempts=result.attempts, from_cache=True)
+            if result.status_code == 200:
+                await self._cache_io(self.cache.put, cache_key, result.url, request.content_class, result.status_code,
+                                     result.headers, result.content)
+        return result
+
+    async def _fetch_network(self, request, cached=None):
+        if self._total_semaphore is None:
+            self._total_semaphore = asyncio.Semaphore(self.total_limit)
+
+        # Revalidate a stale cached copy instead of downloading it again
+        original = request
+        if cached is not None:
+            request = FetchRequest(request.url, request.method, dict(request.headers or {}, **cached.conditional_headers()),
+                                   request.params, request.timeout, request.verify, request.context, request.content_class)
+
+        host = request.host
+        limiter = rate_limiter.limiter_for(host)
+        start = time.time()
+        result = None
+
+        for attempt in range(1, self.max_retries + 1):
+            # Wait for the host's rate limiter; after a failure it has already slowed down or honours Retry-After
+            await limiter.acquire_async()
+            async with self._total_semaphore, self._semaphore_for(host):
+                self._in_flight[host] = self._in_flight.get(host, 0) + 1
+                self._max_in_flight[host] = max(self._max_in_flight.get(host, 0), self._in_flight[host])
+                sent = time.time()
+                try:
+                    status, headers, content, final_url = await self._send(request)
+                    result = FetchResult(request, status, headers, content, final_url, attempts=attempt)
+                except Exception as e:
+                    result = FetchResult(request, attempts=attempt, error=e)
+                finally:
+                    self._in_flight[host] -= 1
+            limiter.record(result.status_code, time.time() - sent, rate_limiter.retry_after(result.headers))
+
+            if result.error is None and result.status_code not in RETRY_STATUSES:
+                break
+            if attempt < self.max_retries:
+                reason = result.error or f"status {result.status_code}"
+                logger.warning(f"Fetch of {request.url} failed ({reason}), retrying (attempt {attempt}/{self.max_retries})")
+
+        result.elapsed = time.time() - start
+        result.request = original
+        return result
+
+    async def fetch_many(self, requests):
+        """Fetch all requests concurrently and return results in request order"""
+        return await asyncio.gather(*(self.fetch(request) for request in requests))
+
+    def stats(self):
+        """Current and peak in-flight requests per host, with each host's rate limiter state"""
+        limits = rate_limiter.stats()
+        return {host: dict(limits.get(host, {}), in_flight=self._in_flight.get(host, 0), max_in_flight=peak)
+                for host, peak in self._max_in_flight.items()}
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self.cache is not None:
+            await self._cache_io(self.cache.flush)
+
+
+_lock = threading.Lock()
+_loop = None
+_engine = None
+
+
+def _get_loop():
+    """Start (once) the background event loop that runs every fetch"""
+    global _loop
+    if _loop is None:
+        with _lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name='fetch-engine', daemon=True)
+                thread.start()
+                _loop = loop
+                atexit.register(_shutdown)
+    return _loop
+
+
+def _shutdown():
+    """Close the engine's connections before the interpreter exits"""
+    if _engine is not None and _loop is not None and _loop.is_running():
+        try:
+            asyncio.run_coroutine_threadsafe(_engine.close(), _loop).result(timeout=5)
+        except Exception as e:
+            logger.warning(f"Error closing fetch engine: {e}")
+
+
+def get_engine():
+    """Return the process-wide FetchEngine"""
+    global _engine
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                cache = None
+                if os.environ.get('HTTP_CACHE_ENABLED', '1') != '0':
+                    cache = ResponseCache()
+                _engine = FetchEngine(cache=cache)
+    return _engine
+
+
+def submit(request):
+    """Schedule a fetch on the engine loop and return a concurrent.futures.Future"""
+    return asyncio.run_coroutine_threadsafe(get_engine().fetch(request), _get_loop())
+
+
+def fetch(url, **kwargs):
+    """Blocking fetch for synchronous code such as the /search generators"""
+    request = url if isinstance(url, FetchRequest) else FetchRequest(url, **kwargs)
+    return submit(request).result()
+
+
+def fetch_all(requests):
+    """Blocking fetch of many requests at once; results are returned in request order"""
+    futures = [submit(request) for request in requests]
+    return [future.result() for future in futures]
+
+
+def iter_fetch(requests):
+    """
+    Fetch many requests concurrently and yield each result as soon as it completes.
+
+    Lets generator-based scrapers stream results while the engine keeps the rest of
+    the batch in flight.
+    """
+    futures = [submit(request) for request in requests]
+    for future in concurrent.futures.as_completed(futures):
+        yield future.result()
+
+
+def set_host_limit(host, limit):
+    get_engine().set_host_limit(host, limit)
@@ -1,15 +1,14 @@
-import requests
-from bs4 import BeautifulSoup
 import time
 import re
-from datetime import datetime
 import logging
 from dateutil.parser import parse
 import urllib3
 import traceback
-import concurrent.futures
 import json
-import os
+
+import job_archive
+from scrapers import fetch_engine, html_parser, listing_pages
+from job_store import JobStore, canonical_link, card_fingerprint, frontier_scope, make_job_id
 
 # Disable InsecureRequestWarning
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -18,7 +17,10 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def scrape_gradconnection(job_level="graduate-jobs", discipline="computer-science", max_pages=3, save_to_excel=True):
+# Requests allowed in flight against GradConnection at once
+DETAIL_WORKERS = 10
+
+def scrape_gradconnection(job_level="graduate-jobs", discipline="computer-science", max_pages=3, save=True, export_excel=False, incremental=True):
     """
     Scrape job listings from GradConnection with optimized performance
     
@@ -26,7 +28,9 @@ def scrape_gradconnection(job_level="graduate-jobs", discipline="computer-scienc
         job_level: The job level to search for (graduate-jobs, internships)
         discipline: The discipline/field to search for
         max_pages: Maximum number of pages to scrape
-        save_to_excel: Whether to save results to Excel
+        save: Whether to append results to the job archive
+        export_excel: Whether to also export the search's archived jobs to Excel
+        incremental: Only fetch detail pages for new or changed listings
         
     Returns:
         List of job dictionaries
@@ -39,19 +43,18 @@ def scrape_gradconnection(job_level="graduate-jobs", discipline="computer-scienc
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
     }
 
-    # Create a session for persistent cookies
-    session = requests.Session()
+    # Allow the detail fetches to run concurrently against GradConnection
+    fetch_engine.set_host_limit('au.gradconnection.com', DETAIL_WORKERS)
     
     # Check if GradConnection is accessible
-    try:
-        test_response = session.get("https://au.gradconnection.com/", headers=headers, verify=False, timeout=10)
-        if test_response.status_code != 200:
-            logger.error(f"Cannot access GradConnection. Status code: {test_response.status_code}")
-            return []
-        logger.info("Successfully connected to GradConnection")
-    except Exception as e:
-        logger.error(f"Error connecting to GradConnection: {e}")
+    test_response = fetch_engine.fetch("https://au.gradconnection.com/", headers=headers, verify=False, timeout=10)
+    if test_response.error is not None:
+        logger.error(f"Error connecting to GradConnection: {test_response.error}")
+        return []
+    if test_response.status_code != 200:
+        logger.error(f"Cannot access GradConnection. Status code: {test_response.status_code}")
         return []
+    logger.info("Successfully connected to GradConnection")
     
     # Define base URLs
     base_url = f'https://au.gradconnection.com/{job_level}/{discipline}/australia/'
@@ -61,84 +64,93 @@ def scrape_gradconnection(job_level="graduate-jobs", discipline="computer-scienc
     skip_companies = ["Readygrad", "GradConnection", "CareerDC", "Premium Graduate Placements"]
     
     # Jobs list
-    all_job_links = []
+    all_job_cards = {}
     jobs_list = []
     
     # First, collect all job links from all pages
-    logger.info(f"Collecting job links from {max_pages} pages...")
+    logger.info(f"Collecting job links from up to {max_pages} pages...")
     
-    # Use a ThreadPoolExecutor to fetch pages concurrently
-    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-        # Create a list to hold the futures
-        future_to_page = {}
-        
-        # Submit a future for each page
-        for page_num in range(1, max_pages + 1):
-            if page_num == 1:
-                url = base_url
+    # Fetch page 1, then every other page its pagination links to at once through the fetch engine
+    pages = listing_pages.ListingPages(
+        lambda page_num: fetch_engine.FetchRequest(listing_pages.page_url(base_url, page_num), headers=headers, verify=False,
+                                                   timeout=15, context=page_num, content_class='listing'),
+        max_pages)
+    
+    # Process the results as they complete
+    for page_num, result in pages:
+        if not result.ok:
+            logger.error(f"Failed to retrieve page {page_num} after retries: {result.error or result.status_code}")
+            continue
+        try:
+            job_cards, page_count = read_listing_page(result.content)
+            if job_cards:
+                pages.extend(page_count)
+                for href, fingerprint in job_cards:
+                    all_job_cards.setdefault(href, fingerprint)
+                logger.info(f"Found {len(job_cards)} job links on page {page_num}")
             else:
-                url = f"{base_url}?page={page_num}"
-            
-            future = executor.submit(fetch_page, session, url, headers, page_num, max_pages)
-            future_to_page[future] = page_num
-        
-        # Process the results as they complete
-        for future in concurrent.futures.as_completed(future_to_page):
-            page_num = future_to_page[future]
-            try:
-                job_links = future.result()
-                if job_links:
-                    all_job_links.extend(job_links)
-                    logger.info(f"Found {len(job_links)} job links on page {page_num}")
-                else:
-                    logger.warning(f"No job links found on page {page_num}")
-            except Exception as e:
-                logger.error(f"Error processing page {page_num}: {e}")
+                # An empty page means the results ended before it
+                logger.warning(f"No job links found on page {page_num}")
+                pages.end_at(page_num - 1)
+        except Exception as e:
+            logger.error(f"Error processing page {page_num}: {e}")
     
-    logger.info(f"Total job links collected: {len(all_job_links)}")
+    logger.info(f"Total job links collected: {len(all_job_cards)}")
     
     # Now process the job links concurrently
-    if all_job_links:
+    if all_job_cards:
         logger.info("Processing job details concurrently...")
         
-        # Use a ThreadPoolExecutor for processing job details
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            # Create a list to hold the futures
-            future_to_job = {}
-            
-            # Submit a future for each job link
-            for i, job_link in enumerate(all_job_links):
-                # Limit to no more than 100 jobs to prevent overload
-                if i >= 100:
-                    logger.info("Reached limit of 100 jobs, stopping.")
-                    break
-                    
-                job_url = local_url + job_link if job_link.startswith('/') else job_link
-                future = executor.submit(
-                    process_job_details, 
-                    session, 
-                    job_url, 
-                    headers, 
-                    skip_companies,
-                    job_level,
-                    i+1,
-                    len(all_job_links[:100])
-                )
-                future_to_job[future] = i
-            
-            # Process the results as they complete
-            for future in concurrent.futures.as_completed(future_to_job):
-                job_idx = future_to_job[future]
-                try:
-                    job_data = future.result()
-                    if job_data:
-                        jobs_list.append(job_data)
-                except Exception as e:
-                    logger.error(f"Error processing job {job_idx + 1}: {e}")
+        # Limit to no more than 100 jobs to prevent overload
+        if len(all_job_cards) > 100:
+            logger.info("Reached limit of 100 jobs, stopping.")
+        cards = {}
+        for job_link, fingerprint in list(all_job_cards.items())[:100]:
+            job_url = local_url + job_link if job_link.startswith('/') else job_link
+            cards[canonical_link(job_url)] = (job_url, fingerprint)
+        
+        # Skip detail pages whose listing card hasn't changed since the last run
+        store = JobStore() if incremental else None
+        scope = frontier_scope(job_level, discipline, 'australia')
+        changed = list(cards)
+        if store is not None:
+            changed, known = store.frontier_diff('GradConnection', scope, {key: card[1] for key, card in cards.items()})
+            for link_key, entry in known.items():
+                if entry['data']:
+                    jobs_list.append(entry['data'])
+                elif entry['job_id']:
+                    # Scraped by the web app, which keeps its records in the job store instead
+                    changed.append(link_key)
+            logger.info(f"{len(cards) - len(changed)} of {len(cards)} jobs unchanged since the last run")
+        
+        detail_requests = []
+        for i, link_key in enumerate(changed):
+            detail_requests.append(fetch_engine.FetchRequest(cards[link_key][0], headers=headers, verify=False, timeout=30, context=(i + 1, link_key), content_class='detail'))
+        
+        # Parse each detail page as soon as it arrives
+        frontier_updates = []
+        for result in fetch_engine.iter_fetch(detail_requests):
+            job_num, link_key = result.context
+            if not result.ok:
+                logger.warning(f"Failed to retrieve job details: {result.error or result.status_code}")
+                continue
+            try:
+                job_data = process_job_details(result.content, result.request.url, skip_companies, job_level, job_num, len(detail_requests))
+                if job_data:
+                    jobs_list.append(job_data)
+                job_id = make_job_id({'source': 'GradConnection', 'link': cards[link_key][0]}) if job_data else None
+                frontier_updates.append((link_key, cards[link_key][1], job_id, job_data))
+            except Exception as e:
+                logger.error(f"Error processing job {job_num}: {e}")
+        
+        if store is not None:
+            store.update_frontier('GradConnection', scope, frontier_updates)
     
-    # Save to Excel if requested
-    if save_to_excel and jobs_list:
-        save_jobs_to_excel(jobs_list, job_level, discipline)
+    # Append to the archive, and export to Excel if requested
+    if save and jobs_list:
+        save_jobs(jobs_list, job_level, discipline)
+        if export_excel:
+            save_jobs_to_excel(job_level, discipline)
     
     # Log performance metrics
     end_time = time.time()
@@ -148,43 +160,26 @@ def scrape_gradconnection(job_level="graduate-jobs", discipline="computer-scienc
     
     return jobs_list
 
-def fetch_page(session, url, headers, page_num, max_pages):
-    """Fetch a single page and extract job links"""
-    logger.info(f"Fetching page {page_num}/{max_pages} - URL: {url}")
-    
-    # Send a GET request with retries
-    max_retries = 3
-    retry_delay = 2
-    response = None
-    
-    for attempt in range(max_retries):
-        try:
-            response = session.get(url, headers=headers, verify=False, timeout=15)
-            if response.status_code == 200:
-                break
-            else:
-                logger.warning(f"Request failed with status code {response.status_code}")
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
-                    retry_delay *= 2
-        except Exception as e:
-            logger.warning(f"Request failed: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(retry_delay)
-                retry_delay *= 2
-    
-    if not response or response.status_code != 200:
-        logger.error(f"Failed to retrieve page {page_num} after retries.")
-        return []
-            
-    # Parse the HTML content
-    soup = BeautifulSoup(response.content, 'html.parser')
+def extract_job_links(content):
+    """Extract job links from a listing page"""
+    return [href for href, _ in extract_job_cards(content)]
+
+def extract_job_cards(content):
+    """Extract (href, card fingerprint) for each distinct job on a listing page"""
+    return read_listing_page(content)[0]
+
+def read_listing_page(content):
+    """Extract the distinct job cards on a listing page and the highest page number it links to"""
+    # Parse only the listing cards and pagination
+    soup = html_parser.parse(content, parse_only=html_parser.GRADCONNECTION_LISTING)
     
     # Find all job listings - try multiple selectors
     job_links = soup.find_all('a', class_='box-header-title')
     
     # If the primary selector doesn't work, try alternatives
     if not job_links:
+        # The alternative selectors need the whole document
+        soup = html_parser.parse(content)
         logger.warning("Primary selector 'a.box-header-title' didn't find jobs, trying alternatives...")
         
         selectors = [
@@ -212,25 +207,26 @@ def fetch_page(session, url, headers, page_num, max_pages):
                         '/jobs/' in link['href']) and
                         'notifyme' not in link['href']]
     
-    # Extract just the href attributes
-    return [link.get('href') for link in job_links if link.get('href') and "notifyme" not in link.get('href')]
+    # Fallback selectors can overlap, so keep only the first card for each href
+    cards = {}
+    for link in job_links:
+        href = link.get('href')
+        if not href or "notifyme" in href or href in cards:
+            continue
+        card = link.find_parent(class_='box') or link
+        cards[href] = card_fingerprint(card.get_text(' '))
+    return list(cards.items()), listing_pages.highest_page_number(soup.select('.pagination a'))
 
-def process_job_details(session, job_url, headers, skip_companies, job_level, job_num, total_jobs):
-    """Process a single job details page and extract job data"""
+def process_job_details(content, job_url, skip_companies, job_level, job_num, total_jobs):
+    """Process a single fetched job details page and extract job data"""
     logger.info(f"Processing job {job_num}/{total_jobs}: {job_url}")
     
     try:
-        # Fetch job details page with increased timeout
-        response = session.get(job_url, headers=headers, verify=False, timeout=30)
-        if response.status_code != 200:
-            logger.warning(f"Failed to retrieve job details: {response.status_code}")
-            return None
-
         # Parse the job details page
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = html_parser.parse(content)
         
         # Debug - save HTML content
-        logger.info(f"HTML Content Length: {len(response.content)}")
+        logger.info(f"HTML Content Length: {len(content)}")
         
         # Extract company name
         company_elem = soup.select_one('h1.employer-name, .employer-branding__title h1, .m-employer-logo h1, .company-name h1')
@@ -398,52 +394,36 @@ def process_job_details(session, job_url, headers, skip_companies, job_level, jo
         logger.error(traceback.format_exc())
         return None
 
-def save_jobs_to_excel(jobs_list, job_level, discipline):
-    """Save jobs to Excel file without database dependency"""
-    import pandas as pd
-    
+def save_jobs(jobs_list, job_level, discipline):
+    """Append jobs to the columnar job archive, partitioned by job level and discipline"""
     if not jobs_list:
-        logger.info("No jobs to save to Excel")
+        logger.info("No jobs to save")
         return
-    
-    # Create a DataFrame from the jobs list
-    df = pd.DataFrame(jobs_list)
-    
-    # Generate a filename based on the job level and discipline
-    filename = f"{discipline}_{job_level}_jobs.xlsx"
-    
-    # Save to Excel
-    df.to_excel(filename, index=False)
-    logger.info(f"Saved {len(jobs_list)} jobs to {filename}")
+    job_archive.save_jobs(jobs_list, job_level, discipline)
 
-def load_jobs_from_excel(job_level="graduate-jobs", discipline="computer-science"):
-    """Load jobs from Excel file"""
-    import pandas as pd
-    
-    filename = f"{discipline}_{job_level}_jobs.xlsx"
-    
+def load_jobs(job_level="graduate-jobs", discipline="computer-science", columns=None):
+    """Load the newest archived version of each job, optionally reading only some columns"""
     try:
-        if os.path.exists(filename):
-            df = pd.read_excel(filename)
-            return df.to_dict('records')
-        else:
-            logger.info(f"No Excel file found: {filename}")
-            return []
+        jobs = job_archive.load_jobs(job_level, discipline, columns=columns)
+        if not jobs:
+            logger.info(f"No archived jobs for {discipline} {job_level}")
+        return jobs
     except Exception as e:
-        logger.error(f"Error loading jobs from Excel: {e}")
+        logger.error(f"Error loading jobs from the archive: {e}")
         return []
 
+def save_jobs_to_excel(job_level, discipline):
+    """Export a search's archived jobs to an Excel file (the archive is the source of truth)"""
+    try:
+        return job_archive.export_excel(job_level, discipline)
+    except Exception as e:
+        logger.error(f"Error exporting jobs to Excel: {e}")
+        return None
+
 def get_last_scrape_date(job_level="graduate-jobs", discipline="computer-science"):
-    """Get the last scrape date from the Excel file modification time"""
-    filename = f"{discipline}_{job_level}_jobs.xlsx"
-    
+    """Get the last scrape date from the newest part in the search's archive partition"""
     try:
-        if os.path.exists(filename):
-            # Get file modification time
-            mod_time = os.path.getmtime(filename)
-            return datetime.fromtimestamp(mod_time)
-        else:
-            return None
+        return job_archive.last_updated(job_level, discipline)
     except Exception as e:
         logger.error(f"Error getting last scrape date: {e}")
         return None 
\ No newline at end of file
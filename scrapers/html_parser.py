@@ -0,0 +1,64 @@
+import logging
+import os
+
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
+
+logger = logging.getLogger(__name__)
+
+# BeautifulSoup tree builders in order of preference; lxml is C-backed and several
+# times faster than the pure-Python html.parser on the large pages we scrape
+BACKENDS = ('lxml', 'html.parser', 'html5lib')
+
+
+def available_backends():
+    """Tree builders that are installed in this environment"""
+    return [name for name in BACKENDS if builder_registry.lookup(name) is not None]
+
+
+def _default_backend():
+    requested = os.environ.get('HTML_PARSER')
+    available = available_backends()
+    if requested:
+        if requested in available:
+            return requested
+        logger.warning(f"HTML parser '{requested}' is not installed, falling back to {available[0]}")
+    return available[0]
+
+
+DEFAULT_BACKEND = _default_backend()
+
+
+def parse(content, parse_only=None, backend=None):
+    """
+    Parse a page with the configured backend.
+
+    `parse_only` is a SoupStrainer; only the elements it matches (and everything
+    inside them) are built into the tree, which skips the head, scripts and page
+    chrome on listing pages.
+    """
+    return BeautifulSoup(content, backend or DEFAULT_BACKEND, parse_only=parse_only)
+
+
+def class_strainer(*class_names):
+    """Keep only elements carrying one of the given CSS classes"""
+    wanted = set(class_names)
+
+    def match(value):
+        if not value:
+            return False
+        classes = value.split() if isinstance(value, str) else value
+        return any(name in wanted for name in classes)
+
+    return SoupStrainer(attrs={'class': match})
+
+
+def attr_strainer(attr, *values):
+    """Keep only elements whose `attr` attribute has one of the given values"""
+    wanted = set(values)
+    return SoupStrainer(attrs={attr: lambda value: value in wanted})
+
+
+# Listing cards plus the pagination links we read the page count from
+GRADCONNECTION_LISTING = class_strainer('box', 'box-header-title', 'pagination')
+SEEK_LISTING = attr_strainer('data-automation', 'normalJob', 'premiumJob', 'page-link')
@@ -0,0 +1,189 @@
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+from scrapers import rate_limiter
+
+logger = logging.getLogger(__name__)
+
+# Connections kept open per host unless a scraper asks for more
+DEFAULT_POOL_MAXSIZE = 16
+
+# Number of distinct host pools the shared adapter keeps alive
+DEFAULT_POOL_CONNECTIONS = 32
+
+# Applied when a caller doesn't pass its own timeout
+DEFAULT_TIMEOUT = 30
+
+# Only advertise the encodings urllib3 can actually decode in this process
+# (br/zstd are only included when brotli/zstandard are installed)
+SUPPORTED_ENCODINGS = [enc.strip() for enc in ACCEPT_ENCODING.split(',') if enc.strip()]
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': ', '.join(SUPPORTED_ENCODINGS),
+    'Connection': 'keep-alive',
+}
+
+_lock = threading.Lock()
+_session = None
+_default_adapter = None
+_host_adapters = {}
+_host_counters = {}
+
+
+def _new_adapter(pool_maxsize):
+    return HTTPAdapter(pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=pool_maxsize, max_retries=0)
+
+
+def _mount_adapters(session):
+    """Attach the shared connection pools to a session"""
+    session.mount('http://', _default_adapter)
+    session.mount('https://', _default_adapter)
+    for host, adapter in _host_adapters.items():
+        session.mount(f'https://{host}/', adapter)
+        session.mount(f'http://{host}/', adapter)
+
+
+def get_session():
+    """Return the process-wide session, creating it on first use"""
+    global _session, _default_adapter
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _default_adapter = _new_adapter(DEFAULT_POOL_MAXSIZE)
+                session = requests.Session()
+                session.headers.update(DEFAULT_HEADERS)
+                _mount_adapters(session)
+                _session = session
+    return _session
+
+
+def new_session():
+    """
+    Create a session with its own cookie jar that reuses the shared connection pools.
+
+    Useful for scrapers that need isolated cookies (e.g. Prosple) but should still
+    benefit from keep-alive connections opened by the rest of the process.
+    """
+    get_session()
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    with _lock:
+        _mount_adapters(session)
+    return session
+
+
+def configure_host(host, max_connections):
+    """
+    Size the connection pool for a host to match the concurrency used against it.
+
+    Args:
+        host: Hostname, e.g. 'au.gradconnection.com'
+        max_connections: Maximum number of keep-alive connections to hold for the host
+    """
+    session = get_session()
+    with _lock:
+        adapter = _host_adapters.get(host)
+        if adapter is not None and adapter._pool_maxsize >= max_connections:
+            return
+        adapter = _new_adapter(max_connections)
+        _host_adapters[host] = adapter
+        session.mount(f'https://{host}/', adapter)
+        session.mount(f'http://{host}/', adapter)
+    logger.info(f"Configured connection pool for {host} with {max_connections} connections")
+
+
+def negotiate_encoding(headers):
+    """Drop encodings from an Accept-Encoding header that can't be decoded here"""
+    if not headers:
+        return headers
+    for key in list(headers):
+        if key.lower() == 'accept-encoding':
+            requested = [enc.strip() for enc in headers[key].split(',') if enc.strip()]
+            supported = [enc for enc in requested if enc.split(';')[0].strip() in SUPPORTED_ENCODINGS]
+            headers = dict(headers)
+            headers[key] = ', '.join(supported) if supported else DEFAULT_HEADERS['Accept-Encoding']
+    return headers
+
+
+def request(method, url, session=None, rate_limit=True, **kwargs):
+    """
+    Send a request through the shared pools and record per-host statistics.
+
+    With `rate_limit` set the request first waits for the host's adaptive rate
+    limiter and feeds its response back into it; pass False for local services.
+    """
+    session = session or get_session()
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    kwargs['headers'] = negotiate_encoding(kwargs.get('headers'))
+
+    host = urlsplit(url).hostname or ''
+    limiter = rate_limiter.limiter_for(host) if rate_limit else None
+    if limiter is not None:
+        limiter.acquire()
+    start = time.time()
+    try:
+        response = session.request(method, url, **kwargs)
+    except Exception:
+        _record(host, None, time.time() - start, 0)
+        if limiter is not None:
+            limiter.record(None, time.time() - start)
+        raise
+    _record(host, response.status_code, time.time() - start, len(response.content) if not kwargs.get('stream') else 0)
+    if limiter is not None:
+        limiter.record(response.status_code, time.time() - start, rate_limiter.retry_after(response.headers))
+    return response
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
+
+
+def _record(host, status_code, elapsed, num_bytes):
+    with _lock:
+        counters = _host_counters.setdefault(host, {'requests': 0, 'errors': 0, 'bytes': 0, 'elapsed': 0.0})
+        counters['requests'] += 1
+        counters['elapsed'] += elapsed
+        counters['bytes'] += num_bytes
+        if status_code is None or status_code >= 400:
+            counters['errors'] += 1
+
+
+def pool_stats():
+    """
+    Report connection reuse per host.
+
+    Returns:
+        Dict keyed by host with request counts, connections opened, idle connections
+        held by the pool and average latency
+    """
+    stats = {}
+    with _lock:
+        adapters = [_default_adapter] + list(_host_adapters.values()) if _default_adapter else []
+        for adapter in adapters:
+            for key in adapter.poolmanager.pools.keys():
+                pool = adapter.poolmanager.pools.get(key)
+                if pool is None:
+                    continue
+                entry = stats.setdefault(pool.host, {'connections_opened': 0, 'pool_requests': 0, 'idle_connections': 0, 'max_connections': 0})
+                entry['connections_opened'] += pool.num_connections
+                entry['pool_requests'] += pool.num_requests
+                entry['idle_connections'] += sum(1 for conn in pool.pool.queue if conn is not None) if pool.pool else 0
+                entry['max_connections'] = max(entry['max_connections'], pool.pool.maxsize if pool.pool else 0)
+        for host, counters in _host_counters.items():
+            entry = stats.setdefault(host, {'connections_opened': 0, 'pool_requests': 0, 'idle_connections': 0, 'max_connections': 0})
+            entry.update(counters)
+            entry['avg_latency'] = counters['elapsed'] / counters['requests'] if counters['requests'] else 0.0
+    return stats
@@ -0,0 +1,100 @@
+import concurrent.futures
+import math
+
+from scrapers import fetch_engine
+
+
+def page_url(base_url, page_num):
+    """URL of a numbered listing page; page 1 is the bare search URL"""
+    if page_num == 1:
+        return base_url
+    return f"{base_url}{'&' if '?' in base_url else '?'}page={page_num}"
+
+
+def highest_page_number(links):
+    """Largest page number among pagination links (1 when there are none)"""
+    highest = 1
+    for link in links:
+        digits = ''.join(filter(str.isdigit, link.get_text(strip=True)))
+        if digits:
+            highest = max(highest, int(digits))
+    return highest
+
+
+def pages_for_total(total, per_page):
+    """Number of pages needed to list `total` results `per_page` at a time"""
+    if not total or not per_page:
+        return 1
+    return math.ceil(total / per_page)
+
+
+class ListingPages:
+    """
+    Fetch a search's listing pages: page 1 first, then every other page at once.
+
+    Scrapers iterate over the pages as they arrive and report what each one says
+    about the size of the result set. Page 1 tells us how many pages there are
+    (from a result count or its pagination links), so the remaining pages are
+    requested together through the fetch engine, which keeps them within the
+    host's concurrency and rate limits. Later pages can only extend the count
+    (e.g. pagination that shows a sliding window of page numbers) or mark where
+    the results really end; pages past the end are dropped. Collecting a search's
+    listings therefore takes one round trip plus one parallel batch.
+    """
+
+    def __init__(self, make_request, max_pages, first=None):
+        """
+        Args:
+            make_request: Called with a page number, returns the FetchRequest for that page
+            max_pages: Never request more pages than this
+            first: FetchResult for page 1 if the caller already fetched it
+        """
+        self.make_request = make_request
+        self.max_pages = max_pages
+        self.last_page = max_pages
+        self._requested = 0
+        self._pending = {}
+        if first is not None:
+            future = concurrent.futures.Future()
+            future.set_result(first)
+            self._requested = 1
+            self._pending[future] = 1
+
+    @property
+    def page_count(self):
+        """Pages requested so far that are still within the results"""
+        return min(self._requested, self.last_page)
+
+    def fraction(self, pages_done):
+        """
+        Share of the pages done, for progress reports. At most 1, since end_at() can
+        shrink page_count below the pages already handled.
+        """
+        return min(pages_done / max(self.page_count, 1), 1)
+
+    def extend(self, page_count):
+        """Request every page up to `page_count` (capped at max_pages) that isn't requested yet"""
+        page_count = min(page_count, self.last_page)
+        while self._requested < page_count:
+            self._requested += 1
+            self._pending[fetch_engine.submit(self.make_request(self._requested))] = self._requested
+
+    def end_at(self, page_num):
+        """Mark `page_num` as the last page; later pages are cancelled or skipped"""
+        self.last_page = min(self.last_page, page_num)
+        for future, pending_page in list(self._pending.items()):
+            if pending_page > self.last_page:
+                future.cancel()
+                del self._pending[future]
+
+    def __iter__(self):
+        """Yield (page_num, FetchResult) in completion order, starting with page 1"""
+        if not self._requested:
+            self.extend(1)
+        while self._pending:
+            done, _ = concurrent.futures.wait(self._pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in sorted(done, key=self._pending.get):
+                # Pages cancelled by end_at() while handling an earlier one are already gone
+                page_num = self._pending.pop(future, None)
+                if page_num is not None and page_num <= self.last_page:
+                    yield page_num, future.result()
@@ -0,0 +1,227 @@
+import json
+import logging
+import re
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+PROSPLE_URL = 'https://au.prosple.com'
+
+# Prosple pages are rendered by Next.js, which serializes the page's data into this script
+NEXT_DATA_MARKER = b'id="__NEXT_DATA__"'
+
+# schema.org blocks; job pages and some listing pages describe each job as a JobPosting
+JSON_LD = re.compile(rb'<script[^>]+type="application/ld\+json"[^>]*>(.*?)</script>', re.S | re.I)
+
+# Keys that identify an opportunity object somewhere inside the Next.js page data
+URL_KEYS = ('detailPageURL', 'detailPageUrl', 'url', 'path')
+EMPLOYER_KEYS = ('parentEmployer', 'employer', 'organization', 'hiringOrganization')
+
+
+def extract_listings(content):
+    """
+    Every job on a Prosple page, read from its structured data in one pass.
+
+    JSON-LD JobPosting blocks are used when present, otherwise the opportunities in
+    the Next.js page data. Neither needs the HTML parsed. Returns None when the page
+    carries no structured job data, so the caller can fall back to walking the DOM.
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    listings = _from_json_ld(content)
+    if not listings:
+        listings = _from_next_data(content)
+    return listings or None
+
+
+def _from_json_ld(content):
+    listings = []
+    for match in JSON_LD.finditer(content):
+        try:
+            data = json.loads(match.group(1))
+        except ValueError:
+            continue
+        for item in _json_ld_items(data):
+            if item.get('@type') == 'JobPosting':
+                listing = _listing_from_posting(item)
+                if listing:
+                    listings.append(listing)
+    return _unique(listings)
+
+
+def _json_ld_items(data):
+    if isinstance(data, list):
+        for item in data:
+            yield from _json_ld_items(item)
+    elif isinstance(data, dict):
+        if '@graph' in data:
+            yield from _json_ld_items(data['@graph'])
+        elif data.get('@type') == 'ItemList':
+            for element in data.get('itemListElement') or []:
+                yield from _json_ld_items(element.get('item', element) if isinstance(element, dict) else element)
+        else:
+            yield data
+
+
+def _listing_from_posting(posting):
+    title = posting.get('title') or posting.get('name')
+    if not title:
+        return None
+    organization = posting.get('hiringOrganization') or {}
+    salary = posting.get('baseSalary') or {}
+    return {
+        'title': title.strip(),
+        'company': _name(organization),
+        'link': _absolute(posting.get('url')),
+        'location': _posting_location(posting.get('jobLocation')),
+        'job_type': _join(posting.get('employmentType')),
+        'closing_date': _date(posting.get('validThrough')),
+        'date_posted': _date(posting.get('datePosted')),
+        'salary': _salary(salary.get('value') if isinstance(salary, dict) else salary,
+                          salary.get('currency') if isinstance(salary, dict) else None),
+        'description': posting.get('description'),
+    }
+
+
+def _from_next_data(content):
+    start = content.find(NEXT_DATA_MARKER)
+    if start == -1:
+        return []
+    start = content.find(b'>', start) + 1
+    end = content.find(b'</script>', start)
+    if start == 0 or end == -1:
+        return []
+    try:
+        data = json.loads(content[start:end])
+    except ValueError as e:
+        logger.warning(f"Could not decode Prosple page data: {e}")
+        return []
+    return _unique(_listing_from_opportunity(item) for item in _opportunities(data))
+
+
+def _opportunities(node):
+    """Walk the page data and yield every object that looks like a job opportunity"""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if isinstance(node.get('title'), str) and any(node.get(key) for key in URL_KEYS) \
+                    and any(node.get(key) for key in EMPLOYER_KEYS):
+                yield node
+                continue
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+
+def _listing_from_opportunity(item):
+    url = next((_url(item.get(key)) for key in URL_KEYS if _url(item.get(key))), None)
+    employer = next(item[key] for key in EMPLOYER_KEYS if item.get(key))
+    types = item.get('opportunityTypes') or item.get('opportunityType')
+    return {
+        'title': item['title'].strip(),
+        'company': _name(employer),
+        'link': _absolute(url),
+        'location': item.get('locationDescription') or _name(item.get('location')) or _join(item.get('locations')),
+        'job_type': _join(types),
+        'closing_date': _date(item.get('applicationsCloseDate') or item.get('closingDate')),
+        'date_posted': _date(item.get('applicationsOpenDate') or item.get('created')),
+        'salary': _salary_range(item),
+        'description': item.get('overview') or item.get('summary'),
+    }
+
+
+def _name(value):
+    if isinstance(value, dict):
+        return value.get('advertiserName') or value.get('name') or value.get('title')
+    if isinstance(value, str):
+        return value
+    return None
+
+
+def _join(value):
+    if isinstance(value, list):
+        names = [_name(item) for item in value]
+        return ', '.join(name for name in names if name) or None
+    return _name(value)
+
+
+def _posting_location(value):
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if not isinstance(value, dict):
+        return None
+    address = value.get('address') or {}
+    if isinstance(address, str):
+        return address
+    parts = [address.get('addressLocality'), address.get('addressRegion')]
+    return ', '.join(part for part in parts if part) or None
+
+
+def _salary(value, currency=None):
+    if isinstance(value, dict):
+        low, high = value.get('minValue'), value.get('maxValue')
+        amount = value.get('value')
+        if low and high:
+            text = f"{low:,} - {high:,}" if isinstance(low, (int, float)) and isinstance(high, (int, float)) else f"{low} - {high}"
+        elif amount or low or high:
+            text = str(amount or low or high)
+        else:
+            return None
+        return f"{currency} {text}" if currency else text
+    if value:
+        return str(value)
+    return None
+
+
+def _salary_range(item):
+    low, high = item.get('minSalary'), item.get('maxSalary')
+    if not low and not high:
+        return None
+    return _salary({'minValue': low, 'maxValue': high, 'value': low or high}, item.get('salaryCurrency'))
+
+
+def _date(value):
+    """Normalize a date or timestamp to YYYY-MM-DD"""
+    if not value:
+        return None
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value / 1000 if value > 1e11 else value, tz=timezone.utc).strftime('%Y-%m-%d')
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).strftime('%Y-%m-%d')
+    except ValueError:
+        return str(value)
+
+
+def _url(value):
+    """A URL given as a string, a schema.org reference ({"@id": ...}) or a list of either"""
+    if isinstance(value, list):
+        return next((url for url in map(_url, value) if url), None)
+    if isinstance(value, dict):
+        return _url(value.get('@id') or value.get('url') or value.get('href'))
+    if isinstance(value, str) and value.strip():
+        return value.strip()
+    return None
+
+
+def _absolute(url):
+    url = _url(url)
+    if not url:
+        return None
+    if url.startswith('/'):
+        return PROSPLE_URL + url
+    if not url.startswith('http'):
+        return PROSPLE_URL + '/' + url
+    return url
+
+
+def _unique(listings):
+    """Drop empty and repeated listings (the same job can appear in several page data slices)"""
+    seen = set()
+    unique = []
+    for listing in listings:
+        if not listing or not listing['link'] or listing['link'] in seen:
+            continue
+        seen.add(listing['link'])
+        unique.append(listing)
+    return unique
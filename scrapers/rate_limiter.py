@@ -0,0 +1,224 @@
+import asyncio
+import email.utils
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Requests per second a host starts at before any feedback
+DEFAULT_RATE = 2.0
+
+# Bounds the adaptive rate stays within unless a host is configured otherwise
+DEFAULT_MIN_RATE = 0.1
+DEFAULT_MAX_RATE = 20.0
+
+# Requests that may be sent back to back after the host has been idle
+DEFAULT_BURST = 4
+
+# Until a host first pushes back the rate grows by this factor per successful response
+# (slow start), so a fast host reaches full speed within a few dozen requests
+SLOW_START_GROWTH = 1.1
+
+# Additive increase: afterwards the rate grows by this many requests per second for every
+# second's worth of successful responses
+INCREASE = 0.5
+
+# Multiplicative decrease when the host pushes back, and the gentler one when it only slows down
+DECREASE = 0.5
+SLOW_DECREASE = 0.8
+
+# Responses slower than this multiple of the host's usual latency count as a slowdown,
+# as long as they also take more than SLOW_LATENCY seconds
+LATENCY_FACTOR = 3.0
+SLOW_LATENCY = 1.0
+
+# One burst of failures in flight at the same time only cuts the rate once
+DECREASE_COOLDOWN = 1.0
+
+# Longest Retry-After we are willing to honour, in seconds
+MAX_RETRY_AFTER = 300
+
+# Status codes that mean the host wants us to back off; bot walls answer 403 when we go too fast
+THROTTLE_STATUSES = {403, 429, 503}
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return min(int(value), MAX_RETRY_AFTER)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return min(max(when.timestamp() - time.time(), 0.0), MAX_RETRY_AFTER)
+
+
+def retry_after(headers):
+    """Retry-After from a response's headers, matching the header name case-insensitively"""
+    for key, value in (headers or {}).items():
+        if key.lower() == 'retry-after':
+            return parse_retry_after(value)
+    return None
+
+
+class HostRateLimiter:
+    """
+    Token bucket pacing the requests sent to one host, with an AIMD-adjusted rate.
+
+    Every response feeds back into the rate. Successes at normal latency raise it,
+    exponentially until the host first pushes back and additively after that;
+    throttling responses (429/503/403) and errors halve it, and responses much
+    slower than usual trim it. A Retry-After header pauses the host entirely until
+    it expires. The bucket is shared by every thread and by the fetch engine's event
+    loop, so all scrapers together stay within what the host tolerates.
+    """
+
+    def __init__(self, host, rate=DEFAULT_RATE, min_rate=DEFAULT_MIN_RATE, max_rate=DEFAULT_MAX_RATE, burst=DEFAULT_BURST):
+        self.host = host
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._slow_start = True
+        self._latency = None
+        self._base_latency = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+        self.waited = 0.0
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _reserve(self):
+        """Take a token if one is available now; otherwise return how long to wait before trying again"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self.requests += 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        """Block the calling thread until the host may be sent another request"""
+        while True:
+            wait = self._reserve()
+            if not wait:
+                return
+            self.waited += wait
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Like acquire(), without blocking the event loop"""
+        while True:
+            wait = self._reserve()
+            if not wait:
+                return
+            self.waited += wait
+            await asyncio.sleep(wait)
+
+    def _decrease(self, now, factor):
+        if now - self._last_decrease < DECREASE_COOLDOWN:
+            return
+        self._last_decrease = now
+        self._slow_start = False
+        self.rate = max(self.min_rate, self.rate * factor)
+        self._tokens = min(self._tokens, 0.0)
+
+    def record(self, status_code, elapsed, retry_after=None):
+        """
+        Feed a response back into the rate.
+
+        Args:
+            status_code: HTTP status, or None if the request failed without a response
+            elapsed: Seconds the request took
+            retry_after: Seconds from the response's Retry-After header, if any
+        """
+        with self._lock:
+            now = time.monotonic()
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+
+            if status_code is None or status_code in THROTTLE_STATUSES or status_code >= 500:
+                self.throttled += 1
+                self._decrease(now, DECREASE)
+                logger.info(f"{self.host} pushed back ({status_code or 'no response'}), rate now {self.rate:.2f}/s")
+                return
+
+            # Track the host's usual latency so a slowdown is noticed before it turns into errors
+            self._latency = elapsed if self._latency is None else 0.8 * self._latency + 0.2 * elapsed
+            if self._base_latency is None or self._latency < self._base_latency:
+                self._base_latency = self._latency
+            else:
+                self._base_latency += (self._latency - self._base_latency) * 0.01
+
+            if self._latency > max(LATENCY_FACTOR * self._base_latency, SLOW_LATENCY):
+                self._decrease(now, SLOW_DECREASE)
+                # Accept part of the new latency as normal so a host that stays slower settles at a lower rate
+                self._base_latency = (self._base_latency + self._latency) / 2
+            elif self._slow_start:
+                self.rate = min(self.max_rate, self.rate * SLOW_START_GROWTH)
+            else:
+                self.rate = min(self.max_rate, self.rate + INCREASE / self.rate)
+
+    def stats(self):
+        return {
+            'rate': round(self.rate, 2),
+            'requests': self.requests,
+            'throttled': self.throttled,
+            'waited': round(self.waited, 2),
+            'latency': round(self._latency, 3) if self._latency is not None else None,
+            'blocked_for': round(max(self._blocked_until - time.monotonic(), 0.0), 1),
+        }
+
+
+_lock = threading.Lock()
+_limiters = {}
+_host_settings = {}
+
+
+def limiter_for(host):
+    """Return the process-wide limiter for a host, creating it on first use"""
+    limiter = _limiters.get(host)
+    if limiter is None:
+        with _lock:
+            limiter = _limiters.get(host)
+            if limiter is None:
+                limiter = HostRateLimiter(host, **_host_settings.get(host, {}))
+                _limiters[host] = limiter
+    return limiter
+
+
+def configure(host, **settings):
+    """
+    Override the starting rate or bounds for a host, e.g. configure('au.prosple.com', max_rate=1.0).
+
+    Accepts the HostRateLimiter keyword arguments; applies to the existing limiter too.
+    """
+    with _lock:
+        _host_settings[host] = dict(_host_settings.get(host, {}), **settings)
+        limiter = _limiters.get(host)
+        if limiter is not None:
+            for name, value in settings.items():
+                setattr(limiter, name, value)
+            limiter.rate = min(max(limiter.rate, limiter.min_rate), limiter.max_rate)
+
+
+def stats():
+    """Current rate and counters per host"""
+    return {host: limiter.stats() for host, limiter in list(_limiters.items())}
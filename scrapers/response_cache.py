@@ -0,0 +1,197 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.environ.get('JOBSCRAPE_CACHE_DIR', 'cache')
+
+# How long a stored response is served without revalidation, per content class.
+# Listing pages change as jobs are posted; detail pages barely change within a day.
+CONTENT_TTLS = {
+    'listing': 10 * 60,
+    'detail': 24 * 60 * 60,
+}
+DEFAULT_TTL = 5 * 60
+
+# Total body size kept on disk before least recently used entries are evicted
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+# Request headers that change the representation a site sends back
+VARY_HEADERS = ('accept', 'accept-language')
+
+# Cache hits whose access times are held in memory before being written in one commit
+ACCESS_FLUSH_SIZE = 256
+
+
+class CachedResponse:
+    """A stored response and its validators"""
+
+    def __init__(self, key, status_code, headers, content, url, etag, last_modified, stored_at, ttl):
+        self.key = key
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+        self.ttl = ttl
+
+    @property
+    def fresh(self):
+        return time.time() - self.stored_at < self.ttl
+
+    def conditional_headers(self):
+        """Headers that let the server answer 304 Not Modified"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Persistent HTTP response cache backed by a single SQLite file.
+
+    Entries are keyed by method, URL, query parameters and the request headers in
+    VARY_HEADERS. Fresh entries are served directly, stale ones are revalidated with
+    ETag/Last-Modified, and the least recently used entries are evicted once the
+    stored bodies exceed max_bytes. Hits only note their access time in memory;
+    the times are written every ACCESS_FLUSH_SIZE hits, and before any write or
+    eviction, so a read never commits.
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES, ttls=None):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, 'http_cache.sqlite')
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = dict(CONTENT_TTLS, **(ttls or {}))
+        self._lock = threading.Lock()
+        self._accessed = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                content_class TEXT,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)')
+        self._conn.commit()
+        self._total_bytes = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def ttl_for(self, content_class):
+        return self.ttls.get(content_class, DEFAULT_TTL)
+
+    @staticmethod
+    def make_key(method, url, params=None, headers=None):
+        lowered = {k.lower(): v for k, v in (headers or {}).items()}
+        parts = [method.upper(), url, urlencode(sorted((params or {}).items()))]
+        parts.extend(f"{name}={lowered.get(name, '')}" for name in VARY_HEADERS)
+        return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+    def get(self, key, content_class=None):
+        """Return the stored response for a key (fresh or stale), or None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT status, headers, body, url, etag, last_modified, stored_at FROM responses WHERE key = ?',
+                (key,)).fetchone()
+            if row is None:
+                return None
+            self._accessed[key] = time.time()
+            if len(self._accessed) >= ACCESS_FLUSH_SIZE:
+                self._flush_accesses()
+                self._conn.commit()
+        status, headers, body, url, etag, last_modified, stored_at = row
+        return CachedResponse(key, status, json.loads(headers), body, url, etag, last_modified, stored_at,
+                              self.ttl_for(content_class))
+
+    def put(self, key, url, content_class, status_code, headers, content):
+        """Store a response, evicting least recently used entries if over budget"""
+        cache_control = _header(headers, 'cache-control').lower()
+        if 'no-store' in cache_control:
+            return
+        now = time.time()
+        size = len(content)
+        with self._lock:
+            self._flush_accesses()
+            previous = self._conn.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, url, content_class, status, headers, body, etag, last_modified, stored_at, last_access, size) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, url, content_class, status_code, json.dumps(headers), sqlite3.Binary(content),
+                 _header(headers, 'etag') or None, _header(headers, 'last-modified') or None, now, now, size))
+            self._total_bytes += size - (previous[0] if previous else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def touch(self, key):
+        """Mark a stale entry fresh again after a 304 Not Modified"""
+        now = time.time()
+        with self._lock:
+            self._flush_accesses()
+            self._conn.execute('UPDATE responses SET stored_at = ?, last_access = ? WHERE key = ?', (now, now, key))
+            self._conn.commit()
+
+    def flush(self):
+        """Write the access times noted since the last flush"""
+        with self._lock:
+            self._flush_accesses()
+            self._conn.commit()
+
+    def _flush_accesses(self):
+        if self._accessed:
+            self._conn.executemany('UPDATE responses SET last_access = ? WHERE key = ?',
+                                   [(accessed, key) for key, accessed in self._accessed.items()])
+            self._accessed = {}
+
+    def _evict(self):
+        # Drop to 90% of the budget so eviction doesn't run on every insert
+        target = self.max_bytes * 0.9
+        evicted = 0
+        for key, size in self._conn.execute('SELECT key, size FROM responses ORDER BY last_access').fetchall():
+            if self._total_bytes <= target:
+                break
+            self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            self._total_bytes -= size
+            evicted += 1
+        logger.info(f"Evicted {evicted} cached responses, {self._total_bytes} bytes remain")
+
+    def stats(self):
+        with self._lock:
+            count = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        return {'entries': count, 'bytes': self._total_bytes, 'max_bytes': self.max_bytes}
+
+    def clear(self):
+        with self._lock:
+            self._accessed = {}
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+            self._total_bytes = 0
+
+
+def _header(headers, name):
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value
+    return ''
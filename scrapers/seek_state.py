@@ -0,0 +1,156 @@
+import json
+import logging
+import re
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+SEEK_URL = 'https://www.seek.com.au'
+
+# Seek server-renders its search results into a script tag as `window.SEEK_REDUX_DATA = {...};`
+STATE_MARKER = b'window.SEEK_REDUX_DATA'
+
+# The blob is a JS object literal and may contain `undefined`, which JSON does not allow
+_UNDEFINED = re.compile(r'(?<=[:,\[])\s*undefined\b')
+
+
+def find_state(content):
+    """
+    Locate and decode the search state Seek embeds in its result pages.
+
+    Uses a plain byte search for the marker and decodes only the blob itself, so the
+    rest of the page is never parsed. Returns None if the page has no usable state.
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    start = content.find(STATE_MARKER)
+    if start == -1:
+        return None
+    start = content.find(b'{', start)
+    if start == -1:
+        return None
+    end = content.find(b'</script>', start)
+    blob = content[start:end if end != -1 else len(content)].decode('utf-8', errors='replace')
+    try:
+        state, _ = json.JSONDecoder().raw_decode(blob)
+    except ValueError:
+        try:
+            state, _ = json.JSONDecoder().raw_decode(_UNDEFINED.sub(' null', blob))
+        except ValueError as e:
+            logger.warning(f"Found Seek state but could not decode it: {e}")
+            return None
+    return state if _results(state) is not None else None
+
+
+def _results(state):
+    """The search results object inside the state (state.results.results)"""
+    outer = state.get('results') if isinstance(state, dict) else None
+    results = outer.get('results') if isinstance(outer, dict) else None
+    if isinstance(results, dict) and isinstance(results.get('jobs'), list):
+        return results
+    return None
+
+
+def total_count(state):
+    """Total number of jobs matching the search, if the state reports it"""
+    results = _results(state) or {}
+    count = results.get('totalCount', (results.get('summary') or {}).get('displayTotalCount'))
+    try:
+        return int(str(count).replace(',', ''))
+    except (TypeError, ValueError):
+        return None
+
+
+def listings(state):
+    """Normalized job listings from the search state; a listing that can't be read is skipped"""
+    jobs = []
+    for raw in (_results(state) or {}).get('jobs', []):
+        try:
+            job = _listing(raw)
+        except (AttributeError, TypeError, ValueError) as e:
+            logger.warning(f"Skipping unreadable Seek listing {raw.get('id') if isinstance(raw, dict) else raw!r}: {e}")
+            continue
+        if job:
+            jobs.append(job)
+    return jobs
+
+
+def extract_listings(content):
+    """Listings from a Seek result page, or None when the page has no embedded state"""
+    state = find_state(content)
+    if state is None:
+        return None
+    return listings(state)
+
+
+def _listing(raw):
+    if not isinstance(raw, dict) or not raw.get('id') or not isinstance(raw.get('title'), str) or not raw['title'].strip():
+        return None
+    return {
+        'seek_id': str(raw['id']),
+        'title': raw['title'].strip(),
+        'company': _company(raw),
+        'link': f"{SEEK_URL}/job/{raw['id']}",
+        'location': _location(raw),
+        'job_type': _first(raw.get('workTypes')) or raw.get('workType'),
+        'salary': (raw.get('salaryLabel') or raw.get('salary') or '').strip() or None,
+        'listing_date': _timestamp(raw.get('listingDate')),
+        'listing_date_display': raw.get('listingDateDisplay'),
+        'teaser': raw.get('teaser'),
+        'classification': _description(raw.get('classifications') or raw.get('classification')),
+    }
+
+
+def _company(raw):
+    advertiser = raw.get('advertiser')
+    name = raw.get('companyName') or (advertiser.get('description') if isinstance(advertiser, dict) else advertiser)
+    return name.strip() or None if isinstance(name, str) else None
+
+
+def _label(value):
+    """A location's display text, whether Seek gives it as {"label": ...} or a plain string"""
+    if isinstance(value, dict):
+        value = value.get('label')
+    return value if isinstance(value, str) and value else None
+
+
+def _location(raw):
+    locations = raw.get('locations')
+    if isinstance(locations, list):
+        label = next((_label(location) for location in locations if _label(location)), None)
+        if label:
+            return label
+    for key in ('jobLocation', 'location'):
+        label = _label(raw.get(key))
+        if label:
+            return label
+    return _label(raw.get('suburb')) or _label(raw.get('area'))
+
+
+def _first(values):
+    if isinstance(values, list) and values:
+        return values[0]
+    return None
+
+
+def _description(value):
+    if isinstance(value, list):
+        value = _first(value)
+    if isinstance(value, dict):
+        value = value.get('classification', value)
+    if isinstance(value, dict):
+        return value.get('description')
+    return value
+
+
+def _timestamp(value):
+    """Normalize Seek's listing date to an ISO 8601 UTC timestamp"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
@@ -0,0 +1,151 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# How long each source's results count as fresh, in seconds. Graduate programs are
+# posted weeks ahead and rarely change within the hour; Seek turns over much faster.
+SOURCE_TTLS = {
+    'GradConnection': int(os.environ.get('SEARCH_TTL_GRADCONNECTION', 60 * 60)),
+    'Seek': int(os.environ.get('SEARCH_TTL_SEEK', 15 * 60)),
+}
+
+# TTL for sources without their own entry
+DEFAULT_TTL = int(os.environ.get('SEARCH_TTL', 30 * 60))
+
+# Past this age cached results are too old to show even while refreshing
+MAX_STALE = int(os.environ.get('SEARCH_MAX_STALE', 24 * 60 * 60))
+
+# Searches kept in memory; most traffic repeats a few dozen combinations
+CACHE_SIZE = int(os.environ.get('SEARCH_CACHE_SIZE', 64))
+
+FRESH = 'fresh'
+STALE = 'stale'
+MISS = 'miss'
+
+
+def search_ttl(sources):
+    """A search is only as fresh as its fastest-changing source"""
+    return min((SOURCE_TTLS.get(source, DEFAULT_TTL) for source in sources), default=DEFAULT_TTL)
+
+
+class SearchCache:
+    """
+    In-memory cache of complete /search result sets with stale-while-revalidate.
+
+    Entries are keyed by search_key and evicted least recently used once there are
+    more than `size`. A lookup is fresh while the entry is younger than the TTL of
+    its sources, stale up to `max_stale`, and a miss after that. The job store is the
+    backing tier: when the memory entry is missing or older than what the store holds
+    (e.g. after a restart, or a refresh run by the sidecar scheduler), the stored
+    result set is loaded instead. Only one refresh runs per key at a time, whether
+    started by a stale lookup (revalidate) or by the refresh scheduler (refresh).
+    """
+
+    def __init__(self, store, size=CACHE_SIZE, max_stale=MAX_STALE):
+        self.store = store
+        self.size = size
+        self.max_stale = max_stale
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+
+    def put(self, key, results, stored_at=None):
+        with self._lock:
+            self._entries[key] = (results, stored_at or time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _load_stored(self, key, entry):
+        """Replace a missing or out-of-date memory entry with the store's result set if that is newer"""
+        stored_age = self.store.search_age(key)
+        if stored_age is None:
+            return entry
+        refreshed_at = time.time() - stored_age
+        if entry is not None and entry[1] >= refreshed_at:
+            return entry
+        results = self.store.jobs_for_search(key)
+        self.put(key, results, refreshed_at)
+        return results, refreshed_at
+
+    def lookup(self, key, sources):
+        """
+        Return (state, results, age) for a search over the given sources.
+
+        `state` is FRESH, STALE or MISS; results and age are None on a miss.
+        """
+        ttl = search_ttl(sources)
+        entry = self._get(key)
+        if entry is None or time.time() - entry[1] >= ttl:
+            entry = self._load_stored(key, entry)
+        if entry is None:
+            return MISS, None, None
+        results, stored_at = entry
+        age = time.time() - stored_at
+        if age < ttl:
+            return FRESH, results, age
+        if age < self.max_stale:
+            return STALE, results, age
+        return MISS, None, None
+
+    def _claim(self, key):
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _release(self, key):
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def refresh(self, key, refresh):
+        """
+        Run `refresh()` in this thread unless one is already running for key.
+
+        Returns True if it ran; exceptions from `refresh` propagate.
+        """
+        if not self._claim(key):
+            return False
+        try:
+            refresh()
+        finally:
+            self._release(key)
+        return True
+
+    def revalidate(self, key, refresh):
+        """
+        Run `refresh()` in a background thread unless one is already running for key.
+
+        Returns True if a refresh was started.
+        """
+        if not self._claim(key):
+            return False
+
+        def run():
+            start = time.time()
+            try:
+                refresh()
+                logger.info(f"Revalidated search {key} in {time.time() - start:.1f}s")
+            except Exception as e:
+                logger.error(f"Error revalidating search {key}: {e}")
+            finally:
+                self._release(key)
+
+        threading.Thread(target=run, name='search-revalidate', daemon=True).start()
+        return True
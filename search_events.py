@@ -0,0 +1,80 @@
+"""
+Typed events passed from the scrapers through search_updates to the stream encoder.
+
+Scrapers yield these objects instead of JSON strings, search_updates rescales and
+de-duplicates them in place, and search_stream.FrameEncoder turns them into wire
+frames, so an event is serialized exactly once, when it is written to the client.
+"""
+
+
+class ProgressEvent:
+    """How far a source has got; `progress` is on the source's own scale until search_updates rescales it"""
+
+    __slots__ = ('progress', 'status')
+
+    def __init__(self, progress, status=''):
+        self.progress = progress
+        self.status = status
+
+
+class MessageEvent:
+    """Something the user should see alongside the results"""
+
+    __slots__ = ('message', 'source')
+
+    # Frame type the message is sent as
+    kind = None
+
+    def __init__(self, message, source=None):
+        self.message = message
+        self.source = source
+
+
+class WarningEvent(MessageEvent):
+    """A source hit a problem but carried on"""
+
+    __slots__ = ()
+    kind = 'warning'
+
+
+class ErrorEvent(MessageEvent):
+    """A source failed at some step"""
+
+    __slots__ = ()
+    kind = 'error'
+
+
+class ResultBatch:
+    """
+    Jobs found since the previous batch.
+
+    search_updates drops duplicates from `jobs` and lists the IDs of jobs sent in an
+    earlier batch that these supersede in `replaces`.
+    """
+
+    __slots__ = ('jobs', 'progress', 'status', 'replaces')
+
+    def __init__(self, jobs, progress=None, status=None, replaces=()):
+        self.jobs = jobs
+        self.progress = progress
+        self.status = status
+        self.replaces = replaces
+
+
+class SourceComplete:
+    """A source finished; `jobs` is everything it found"""
+
+    __slots__ = ('jobs', 'status')
+
+    def __init__(self, jobs, status=''):
+        self.jobs = jobs
+        self.status = status
+
+
+class SearchComplete:
+    """Every source finished; `results` is the de-duplicated result set"""
+
+    __slots__ = ('results',)
+
+    def __init__(self, results):
+        self.results = results
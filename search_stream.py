@@ -0,0 +1,176 @@
+import json
+import time
+import zlib
+
+from search_events import MessageEvent, ResultBatch, SearchComplete
+
+try:
+    import msgpack
+except ImportError:  # In requirements.txt; without it every client gets NDJSON
+    msgpack = None
+
+# Bumped whenever the frames below change shape; sent in the first frame and the X-Stream-Version header
+PROTOCOL_VERSION = 3
+
+NDJSON = 'application/x-ndjson'
+MSGPACK = 'application/x-msgpack'
+
+# A results frame is sent once this many jobs are waiting...
+BATCH_SIZE = 25
+
+# ...or once the oldest waiting job has waited this long, in seconds
+BATCH_INTERVAL = 0.5
+
+# Progress frames are sent at most this often, in seconds
+PROGRESS_INTERVAL = 0.25
+
+
+def negotiate(accept, accept_encoding):
+    """
+    Pick the stream's media type and whether to gzip it from the request headers.
+
+    msgpack is used only when the client lists it in Accept and the package is
+    installed; everything else gets NDJSON.
+    """
+    accept = (accept or '').lower()
+    media_type = MSGPACK if msgpack is not None and ('x-msgpack' in accept or 'application/msgpack' in accept) else NDJSON
+    encodings = [part.split(';')[0].strip() for part in (accept_encoding or '').lower().split(',')]
+    return media_type, 'gzip' in encodings
+
+
+class FrameEncoder:
+    """
+    Turn the search events from search_updates into protocol frames.
+
+    Frames (each a dict with a 'type'):
+        hello     {"version"} - always first
+        progress  {"progress", "status"} - at most every PROGRESS_INTERVAL
+        results   {"jobs", "replaces", "found"} - jobs batched by BATCH_SIZE /
+                  BATCH_INTERVAL, never more than BATCH_SIZE to a frame; "replaces"
+                  lists IDs of jobs sent earlier that the client should drop, and
+                  "found" is how many jobs the search has found so far
+        warning   {"message", "source"}
+        error     {"message", "source"}
+        complete  {"total", "sources", "elapsed", "cached"} - a summary only
+
+    With `page_size` set, only the first page_size jobs are sent in full; later
+    jobs only raise "found", and the client pages through the complete result set
+    with /api/jobs once the search is done. A job replaced by a duplicate before
+    its batch was sent is simply dropped from the batch, so the client never sees it.
+    """
+
+    def __init__(self, cached=False, clock=time.monotonic, page_size=None):
+        self.cached = cached
+        self.clock = clock
+        self.page_size = page_size
+        self.started = clock()
+        self._jobs = []
+        self._replaces = []
+        self._sent_ids = set()
+        self._found = set()
+        self._found_sent = 0
+        self._batch_started = None
+        self._progress = None
+        self._progress_sent = None
+
+    def start(self):
+        return [{"type": "hello", "version": PROTOCOL_VERSION}]
+
+    def feed(self, event):
+        """Frames to send after a search event; None is an idle tick that only flushes what is due"""
+        if event is None:
+            return self._due()
+        if isinstance(event, SearchComplete):
+            return self._finish(event.results)
+        if isinstance(event, MessageEvent):
+            return [{"type": event.kind, "message": event.message, "source": event.source}] + self._due()
+
+        if isinstance(event, ResultBatch):
+            if event.replaces:
+                self._replace(event.replaces)
+            if event.jobs:
+                self._found.update(job.get('id') for job in event.jobs)
+                if self._batch_started is None:
+                    self._batch_started = self.clock()
+                self._jobs.extend(event.jobs[:self._room()])
+        if event.progress is not None:
+            self._progress = {"type": "progress", "progress": round(event.progress, 1), "status": event.status or ''}
+        return self._due()
+
+    def _room(self):
+        """How many more jobs fit on the page the client is shown"""
+        if self.page_size is None:
+            return None
+        return max(self.page_size - len(self._sent_ids) - len(self._jobs), 0)
+
+    def _replace(self, job_ids):
+        dropped = set(job_ids)
+        self._jobs = [job for job in self._jobs if job.get('id') not in dropped]
+        self._replaces.extend(job_id for job_id in job_ids if job_id in self._sent_ids)
+        self._sent_ids.difference_update(dropped)
+        self._found.difference_update(dropped)
+
+    def _flush_results(self):
+        if not self._jobs and not self._replaces and len(self._found) == self._found_sent:
+            return []
+        frames = [{"type": "results", "jobs": self._jobs[start:start + BATCH_SIZE], "found": len(self._found)}
+                  for start in range(0, max(len(self._jobs), 1), BATCH_SIZE)]
+        self._found_sent = len(self._found)
+        if self._replaces:
+            frames[0]["replaces"] = self._replaces
+        self._sent_ids.update(job.get('id') for job in self._jobs)
+        self._jobs = []
+        self._replaces = []
+        self._batch_started = None
+        return frames
+
+    def _due(self):
+        now = self.clock()
+        frames = []
+        if len(self._jobs) >= BATCH_SIZE or (self._batch_started is not None and now - self._batch_started >= BATCH_INTERVAL):
+            frames.extend(self._flush_results())
+        if self._progress is not None and (self._progress_sent is None or now - self._progress_sent >= PROGRESS_INTERVAL):
+            frames.append(self._progress)
+            self._progress = None
+            self._progress_sent = now
+        return frames
+
+    def _finish(self, results):
+        frames = self._flush_results()
+        if self._progress is not None:
+            frames.append(self._progress)
+            self._progress = None
+        sources = {}
+        for job in results:
+            source = job.get('source') or 'Unknown'
+            sources[source] = sources.get(source, 0) + 1
+        frames.append({"type": "complete", "total": len(results), "sources": sources,
+                       "elapsed": round(self.clock() - self.started, 2), "cached": self.cached})
+        return frames
+
+
+def encode_frames(events, encoder):
+    """Generator of protocol frames for a stream of search events"""
+    yield from encoder.start()
+    for event in events:
+        yield from encoder.feed(event)
+
+
+def serialize(frames, media_type=NDJSON):
+    """Encode frames as NDJSON lines or back-to-back msgpack maps"""
+    if media_type == MSGPACK:
+        for frame in frames:
+            yield msgpack.packb(frame, use_bin_type=True)
+    else:
+        for frame in frames:
+            yield (json.dumps(frame, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def gzip_stream(chunks):
+    """Gzip a stream of byte chunks, flushing after each so frames still arrive as they are produced"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
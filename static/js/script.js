@@ -10,29 +10,182 @@ document.addEventListener('DOMContentLoaded', function() {
     const advancedFilters = document.getElementById('advanced-filters');
     const applyFiltersBtn = document.getElementById('apply-filters');
     const resetFiltersBtn = document.getElementById('reset-filters');
+    const resumeMatchForm = document.getElementById('resume-match-form');
     
-    // Store all job results
+    // Version of the /search stream protocol this parser understands
+    const STREAM_PROTOCOL_VERSION = 3;
+    
+    // Job cards shown while a search is streaming (the server sends no more than its RESULTS_PAGE_SIZE);
+    // the full set is paged from /api/jobs once it completes
+    const RESULTS_PAGE_SIZE = 50;
+    
+    // Wait this long after the last keystroke before querying the server
+    const TEXT_FILTER_DELAY = 250;
+    
+    // First page of jobs streamed by the current search, the links already shown, and how many it has found
     let allJobs = [];
+    let seenLinks = new Set();
+    let foundCount = 0;
     let warnings = [];
     
+    // Cursor for the next page of /api/jobs results, if there is one
+    let nextCursor = null;
+    let textFilterTimer = null;
+    
+    // Filters are applied on the server once the search has finished streaming
+    let searching = false;
+    
     searchForm.addEventListener('submit', function(e) {
         e.preventDefault();
         performSearch();
     });
     
     resultFilter.addEventListener('input', function() {
-        const query = this.value.toLowerCase();
-        filterResultsByText(query);
+        // Rank by relevance while there is text to match, unless another order was picked
+        const sortSelect = document.getElementById('sort-jobs');
+        if (sortSelect && this.value.trim() && sortSelect.value === 'position') {
+            sortSelect.value = 'relevance';
+        } else if (sortSelect && !this.value.trim() && sortSelect.value === 'relevance') {
+            sortSelect.value = 'position';
+        }
+        clearTimeout(textFilterTimer);
+        textFilterTimer = setTimeout(() => loadResults(), TEXT_FILTER_DELAY);
     });
     
     applyFiltersBtn.addEventListener('click', function() {
-        applyAdvancedFilters();
+        loadResults();
     });
     
     resetFiltersBtn.addEventListener('click', function() {
         resetAdvancedFilters();
     });
     
+    resumeMatchForm.addEventListener('submit', function(e) {
+        e.preventDefault();
+        matchResume();
+    });
+    
+    async function matchResume() {
+        // Rank every stored job against the resume and show the best matches in place of the results
+        const resumeFile = document.getElementById('resume-match-file').files[0];
+        if (!resumeFile) {
+            return;
+        }
+        const formData = new FormData();
+        formData.append('resume', resumeFile);
+        
+        loader.classList.remove('d-none');
+        try {
+            const response = await fetch('/match-resume', {
+                method: 'POST',
+                body: formData
+            });
+            const data = await response.json();
+            if (!response.ok) {
+                throw new Error(data.error || 'Failed to match resume');
+            }
+            
+            resultsContainer.innerHTML = '';
+            advancedFilters.classList.add('d-none');
+            const header = document.createElement('div');
+            header.className = 'col-12 mb-3';
+            header.innerHTML = `<p class="text-muted mb-0"></p>`;
+            header.querySelector('p').textContent = data.jobs.length
+                ? `Your ${data.jobs.length} best matches out of ${data.searched} stored jobs`
+                : `None of the ${data.searched} stored jobs match your resume yet. Run a search first.`;
+            resultsContainer.appendChild(header);
+            
+            if (data.jobs.length) {
+                const analyzeBtn = document.createElement('button');
+                analyzeBtn.type = 'button';
+                analyzeBtn.className = 'btn btn-outline-primary btn-sm mt-2';
+                analyzeBtn.textContent = 'Get AI Suggestions for These Jobs';
+                analyzeBtn.addEventListener('click', () => analyzeMatches(resumeFile, data.jobs, analyzeBtn));
+                header.appendChild(analyzeBtn);
+            }
+            
+            data.jobs.forEach(job => {
+                const card = createJobCard(job);
+                const badge = document.createElement('span');
+                badge.className = 'badge bg-success ms-2';
+                badge.textContent = `${Math.round(job.match_score * 100)}% match`;
+                card.querySelector('.card-header').appendChild(badge);
+                resultsContainer.appendChild(card);
+            });
+        } catch (error) {
+            console.error('Error:', error);
+            alert(error.message || 'Failed to match resume. Please try again.');
+        } finally {
+            loader.classList.add('d-none');
+        }
+    }
+    
+    async function analyzeMatches(resumeFile, jobs, button) {
+        // Ask for suggestions on every matched job at once; each card fills in as the model finishes it
+        const formData = new FormData();
+        formData.append('resume', resumeFile);
+        jobs.forEach(job => formData.append('job_ids', job.id));
+        
+        button.disabled = true;
+        let finished = 0;
+        button.textContent = `Analysing 0 of ${jobs.length}...`;
+        
+        const showSuggestions = (jobId, text, isError) => {
+            const card = resultsContainer.querySelector(`.job-result-item[data-id="${CSS.escape(jobId)}"] .card-body`);
+            if (!card) {
+                return;
+            }
+            const box = document.createElement('div');
+            box.className = isError ? 'alert alert-warning mt-3 mb-0 small' : 'border-top mt-3 pt-2 small';
+            box.style.whiteSpace = 'pre-wrap';
+            box.textContent = text;
+            card.appendChild(box);
+            finished += 1;
+            button.textContent = `Analysing ${finished} of ${jobs.length}...`;
+        };
+        
+        try {
+            const response = await fetch('/analyze-resumes', {
+                method: 'POST',
+                body: formData
+            });
+            if (!response.ok) {
+                const data = await response.json();
+                throw new Error(data.error || 'Failed to analyse resume');
+            }
+            
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) {
+                    break;
+                }
+                buffer += decoder.decode(value, { stream: true });
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+                for (const line of lines) {
+                    if (!line.trim()) {
+                        continue;
+                    }
+                    const frame = JSON.parse(line);
+                    if (frame.type === 'result') {
+                        showSuggestions(frame.job_id, frame.suggestions, false);
+                    } else if (frame.type === 'error') {
+                        showSuggestions(frame.job_id, frame.message, true);
+                    }
+                }
+            }
+            button.textContent = 'AI Suggestions Ready';
+        } catch (error) {
+            console.error('Error:', error);
+            alert(error.message || 'Failed to analyse resume. Please try again.');
+            button.disabled = false;
+            button.textContent = 'Get AI Suggestions for These Jobs';
+        }
+    }
+    
     async function performSearch() {
         // Get form values
         const jobLevel = document.getElementById('job-level').value;
@@ -50,6 +203,10 @@ document.addEventListener('DOMContentLoaded', function() {
         updateProgress(0, 'Starting search...');
         warnings = [];
         allJobs = [];
+        seenLinks = new Set();
+        foundCount = 0;
+        nextCursor = null;
+        searching = true;
         
         try {
             // Send search request to backend
@@ -57,6 +214,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
+                    'Accept': 'application/x-ndjson',
                 },
                 body: JSON.stringify({
                     job_level: jobLevel,
@@ -70,6 +228,11 @@ document.addEventListener('DOMContentLoaded', function() {
                 throw new Error(`Server responded with status: ${response.status}`);
             }
             
+            const streamVersion = Number(response.headers.get('X-Stream-Version'));
+            if (streamVersion !== STREAM_PROTOCOL_VERSION) {
+                console.warn(`Unexpected search stream version ${streamVersion}, expected ${STREAM_PROTOCOL_VERSION}`);
+            }
+            
             const reader = response.body.getReader();
             const decoder = new TextDecoder();
             let buffer = '';
@@ -110,9 +273,10 @@ document.addEventListener('DOMContentLoaded', function() {
             
             // Hide loader once processing is complete
             loader.classList.add('d-none');
+            searching = false;
             
             // Show completion message or warnings if no jobs found
-            if (allJobs.length === 0) {
+            if (foundCount === 0) {
                 let errorMessage = 'No jobs found matching your criteria.';
                 if (warnings.length > 0) {
                     errorMessage += ' There were some issues during the search:<br>';
@@ -122,6 +286,7 @@ document.addEventListener('DOMContentLoaded', function() {
             }
             
         } catch (error) {
+            searching = false;
             console.error('Error performing search:', error);
             loader.classList.add('d-none');
             progressContainer.classList.add('d-none');
@@ -129,48 +294,57 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
     
-    function processStreamData(data) {
-        // Log all data for debugging
-        console.log('Stream data:', data);
-        
-        // Update progress if progress info is available
-        if (data.progress !== undefined) {
-            updateProgress(data.progress, data.status || 'Processing...');
-        }
-        
-        // Process warnings
-        if (data.warning) {
-            console.warn('Warning:', data.warning);
-            warnings.push(data.warning);
-            // Show warning in the progress status
-            progressStatus.innerHTML = `<span class="text-warning">${data.warning}</span>`;
-        }
-        
-        // Process errors
-        if (data.error) {
-            console.error('Error:', data.error);
-            warnings.push(`Error: ${data.error}`);
-            // Show error in the progress status
-            progressStatus.innerHTML = `<span class="text-danger">${data.error}</span>`;
-        }
-        
-        // Process results if they are available
-        if (data.results && data.results.length > 0) {
-            displayResults(data.results);
-        }
-        
-        // Handle completion
-        if (data.complete) {
-            updateProgress(100, 'Search completed!');
-            progressContainer.classList.add('d-none');
+    function processStreamData(frame) {
+        // Log all frames for debugging
+        console.log('Stream frame:', frame);
+        
+        switch (frame.type) {
+            case 'progress':
+                updateProgress(frame.progress, frame.status || 'Processing...');
+                break;
             
-            if (allJobs.length > 0) {
-                // Show advanced filters
-                advancedFilters.classList.remove('d-none');
+            case 'warning':
+                console.warn('Warning:', frame.message);
+                warnings.push(frame.message);
+                // Show warning in the progress status
+                progressStatus.innerHTML = `<span class="text-warning">${frame.message}</span>`;
+                break;
+            
+            case 'error':
+                console.error('Error:', frame.message);
+                warnings.push(`Error: ${frame.message}`);
+                // Show error in the progress status
+                progressStatus.innerHTML = `<span class="text-danger">${frame.message}</span>`;
+                break;
+            
+            case 'results':
+                // Drop jobs that a richer duplicate from another source has replaced
+                if (frame.replaces && frame.replaces.length > 0) {
+                    removeJobs(frame.replaces);
+                }
+                foundCount = frame.found;
+                if (frame.jobs && frame.jobs.length > 0) {
+                    displayResults(frame.jobs);
+                } else if (foundCount > 0) {
+                    setResultsCount(`Found ${foundCount} jobs matching your criteria`);
+                }
+                break;
+            
+            case 'complete':
+                // Only the first page arrived in results frames; the rest is paged from /api/jobs
+                updateProgress(100, `Search completed! ${frame.total} jobs found`);
+                progressContainer.classList.add('d-none');
+                searching = false;
+                foundCount = frame.total;
                 
-                // Populate filter dropdowns
-                populateFilterOptions();
-            }
+                if (foundCount > 0) {
+                    // Show advanced filters
+                    advancedFilters.classList.remove('d-none');
+                    
+                    // Switch to the server-side query, which also fills the filter dropdowns
+                    loadResults();
+                }
+                break;
         }
     }
     
@@ -184,13 +358,11 @@ document.addEventListener('DOMContentLoaded', function() {
     }
     
     function displayResults(jobs) {
-        // Add new jobs to the allJobs array, avoiding duplicates
-        jobs.forEach(job => {
-            // Check if this job is already in the list (by URL)
-            const isDuplicate = allJobs.some(existingJob => existingJob.link === job.link);
-            if (!isDuplicate) {
-                allJobs.push(job);
-            }
+        // Add new jobs to the first page, avoiding duplicates
+        const newJobs = jobs.filter(job => !seenLinks.has(job.link));
+        newJobs.forEach(job => {
+            seenLinks.add(job.link);
+            allJobs.push(job);
         });
         
         // Clear the results container if this is the first set of results
@@ -208,59 +380,145 @@ document.addEventListener('DOMContentLoaded', function() {
             return;
         }
         
-        // Only show the results count and toggle button once
-        if (!resultsContainer.querySelector('.results-count')) {
-            const resultsCount = document.createElement('div');
-            resultsCount.className = 'col-12 mb-3 results-count';
-            resultsCount.innerHTML = `
-                <div class="d-flex justify-content-between align-items-center">
-                    <p class="text-muted mb-0">Found ${allJobs.length} jobs matching your criteria</p>
-                    <button id="toggle-filters-btn" class="btn btn-sm btn-outline-primary">
-                        <i class="fas fa-sliders-h me-1"></i> Advanced Filters
-                    </button>
-                </div>
-            `;
-            resultsContainer.appendChild(resultsCount);
+        addResultsHeader();
+        setResultsCount(`Found ${Math.max(foundCount, allJobs.length)} jobs matching your criteria`);
+        
+        // Show the first page of jobs as they arrive; the rest are paged in once the search completes
+        const shown = resultsContainer.querySelectorAll('.job-result-item').length;
+        newJobs.slice(0, Math.max(RESULTS_PAGE_SIZE - shown, 0)).forEach(job => {
+            resultsContainer.appendChild(createJobCard(job));
+        });
+        
+        // Hide loader as we display results
+        loader.classList.add('d-none');
+    }
+    
+    function addResultsHeader() {
+        // Only show the results count, sorting controls and toggle button once
+        if (resultsContainer.querySelector('.results-count')) {
+            return;
+        }
+        const resultsCount = document.createElement('div');
+        resultsCount.className = 'col-12 mb-3 results-count';
+        resultsCount.innerHTML = `
+            <div class="d-flex justify-content-between align-items-center">
+                <p class="text-muted mb-0"></p>
+                <button id="toggle-filters-btn" class="btn btn-sm btn-outline-primary">
+                    <i class="fas fa-sliders-h me-1"></i> Advanced Filters
+                </button>
+            </div>
+        `;
+        resultsContainer.appendChild(resultsCount);
+        
+        // Add sorting controls
+        addSortingControls();
+        
+        // Add toggle filters button functionality
+        document.getElementById('toggle-filters-btn').addEventListener('click', function() {
+            if (advancedFilters.classList.contains('d-none')) {
+                advancedFilters.classList.remove('d-none');
+                this.innerHTML = '<i class="fas fa-times me-1"></i> Hide Filters';
+            } else {
+                advancedFilters.classList.add('d-none');
+                this.innerHTML = '<i class="fas fa-sliders-h me-1"></i> Advanced Filters';
+            }
+        });
+    }
+    
+    function setResultsCount(text) {
+        const countElem = resultsContainer.querySelector('.results-count p');
+        if (countElem) {
+            countElem.textContent = text;
+        }
+    }
+    
+    function resultsQuery() {
+        // Build the /api/jobs query string from the filter controls
+        const params = new URLSearchParams();
+        const fields = {
+            job_type: document.getElementById('filter-job-type').value,
+            company: document.getElementById('filter-company').value,
+            city: document.getElementById('filter-city').value,
+            source: document.getElementById('filter-source').value,
+            closing_from: document.getElementById('filter-closing-from').value,
+            closing_to: document.getElementById('filter-closing-to').value,
+            q: resultFilter.value.trim(),
+        };
+        Object.entries(fields).forEach(([name, value]) => {
+            if (value) params.set(name, value);
+        });
+        if (document.getElementById('filter-international').checked) {
+            params.set('international', '1');
+        }
+        const sortSelect = document.getElementById('sort-jobs');
+        params.set('sort', sortSelect ? sortSelect.value : 'position');
+        params.set('limit', RESULTS_PAGE_SIZE);
+        return params;
+    }
+    
+    async function loadResults(more = false) {
+        // Fetch a page of filtered, sorted results from the server; `more` appends the next page
+        if (searching || foundCount === 0) {
+            return;
+        }
+        const params = resultsQuery();
+        if (more && nextCursor) {
+            params.set('cursor', nextCursor);
+        }
+        
+        try {
+            const response = await fetch(`/api/jobs?${params}`);
+            const data = await response.json();
+            if (!response.ok) {
+                throw new Error(data.error || `Server responded with status: ${response.status}`);
+            }
+            
+            addResultsHeader();
+            if (!more) {
+                resultsContainer.querySelectorAll('.job-result-item').forEach(item => item.remove());
+            }
+            const loadMore = resultsContainer.querySelector('.load-more');
+            if (loadMore) {
+                loadMore.remove();
+            }
             
-            // Add sorting controls
-            addSortingControls();
+            data.jobs.forEach(job => resultsContainer.appendChild(createJobCard(job)));
+            const shown = resultsContainer.querySelectorAll('.job-result-item').length;
+            setResultsCount(`Showing ${shown} of ${data.total} jobs`);
             
-            // Add toggle filters button functionality
-            document.getElementById('toggle-filters-btn').addEventListener('click', function() {
-                if (advancedFilters.classList.contains('d-none')) {
-                    advancedFilters.classList.remove('d-none');
-                    this.innerHTML = '<i class="fas fa-times me-1"></i> Hide Filters';
-                } else {
-                    advancedFilters.classList.add('d-none');
-                    this.innerHTML = '<i class="fas fa-sliders-h me-1"></i> Advanced Filters';
-                }
-            });
-        } else {
-            // Update the count if it already exists
-            const countElem = resultsContainer.querySelector('.results-count p');
-            if (countElem) {
-                countElem.textContent = `Found ${allJobs.length} jobs matching your criteria`;
+            if (data.facets) {
+                populateFilterOptions(data.facets);
+            }
+            
+            nextCursor = data.next_cursor;
+            if (nextCursor) {
+                addLoadMoreButton();
             }
+        } catch (error) {
+            console.error('Error loading results:', error);
+            displayError('An error occurred while loading results: ' + error.message);
         }
-        
-        // Create job cards only for new jobs
-        jobs.forEach(job => {
-            // Check if this job card already exists in the container
-            const existingCard = resultsContainer.querySelector(`[data-url="${job.link}"]`);
-            if (!existingCard) {
-                const jobCard = createJobCard(job);
-                resultsContainer.appendChild(jobCard);
+    }
+    
+    function addLoadMoreButton() {
+        const wrapper = document.createElement('div');
+        wrapper.className = 'col-12 text-center my-3 load-more';
+        wrapper.innerHTML = '<button class="btn btn-outline-primary">Load more</button>';
+        wrapper.querySelector('button').addEventListener('click', function() {
+            this.disabled = true;
+            loadResults(true);
+        });
+        resultsContainer.appendChild(wrapper);
+    }
+    
+    function removeJobs(jobIds) {
+        allJobs = allJobs.filter(job => !jobIds.includes(job.id));
+        jobIds.forEach(jobId => {
+            const card = resultsContainer.querySelector(`[data-id="${jobId}"]`);
+            if (card) {
+                card.remove();
             }
         });
-        
-        // Show advanced filters
-        advancedFilters.classList.remove('d-none');
-        
-        // Populate filter dropdowns
-        populateFilterOptions();
-        
-        // Hide loader as we display results
-        loader.classList.add('d-none');
     }
     
     function createJobCard(job) {
@@ -276,7 +534,8 @@ document.addEventListener('DOMContentLoaded', function() {
         col.setAttribute('data-closing-date', job.closing_date || '');
         col.setAttribute('data-international', job.international?.toLowerCase() || 'no');
         col.setAttribute('data-url', job.link || '');
-        col.setAttribute('data-date-posted', job.date_posted || '');
+        col.setAttribute('data-id', job.id || '');
+        col.setAttribute('data-date-posted', job.listing_date || job.date_posted || '');
         
         // Determine the source class for styling
         let sourceClass = '';
@@ -295,6 +554,7 @@ document.addEventListener('DOMContentLoaded', function() {
                     <h5 class="card-title">${job.title || 'Untitled Position'}</h5>
                     <h6 class="company-name">${job.company || 'Unknown Company'}</h6>
                     <span class="source-tag ${sourceClass}">${job.source}</span>
+                    ${(job.also_on || []).map(other => `<a class="source-tag ${other.source.toLowerCase()}" href="${other.link || '#'}" target="_blank" title="Also listed on ${other.source}">${other.source}</a>`).join('')}
                 </div>
                 <div class="card-body">
                     <div class="job-details-container">
@@ -330,6 +590,16 @@ document.addEventListener('DOMContentLoaded', function() {
             `;
         }
         
+        // Add salary if available
+        if (job.salary) {
+            html += `
+                <div class="job-detail">
+                    <i class="fas fa-dollar-sign"></i>
+                    <span>${job.salary}</span>
+                </div>
+            `;
+        }
+        
         // Add closing date if available
         if (job.closing_date) {
             html += `
@@ -383,157 +653,26 @@ document.addEventListener('DOMContentLoaded', function() {
         return col;
     }
     
-    function populateFilterOptions() {
-        // Clear existing options
-        const jobTypeFilter = document.getElementById('filter-job-type');
-        const companyFilter = document.getElementById('filter-company');
-        const cityFilter = document.getElementById('filter-city');
-        const sourceFilter = document.getElementById('filter-source');
-        
-        // Reset to only keep the first "All" option
-        jobTypeFilter.innerHTML = '<option value="">All Types</option>';
-        companyFilter.innerHTML = '<option value="">All Companies</option>';
-        cityFilter.innerHTML = '<option value="">All Cities</option>';
-        sourceFilter.innerHTML = '<option value="">All Sources</option><option value="GradConnection">GradConnection</option><option value="Seek">Seek</option>';
-        
-        // Extract unique values for each filter
-        const jobTypes = new Set();
-        const companies = new Set();
-        const cities = new Set();
-        
-        allJobs.forEach(job => {
-            if (job.job_type) jobTypes.add(job.job_type);
-            if (job.company) companies.add(job.company);
-            
-            // Extract cities from location
-            if (job.location) {
-                const locationParts = job.location.split(',');
-                if (locationParts.length > 0) {
-                    const city = locationParts[0].trim();
-                    if (city) cities.add(city);
-                }
-            }
-        });
-        
-        // Sort alphabetically
-        const sortedJobTypes = [...jobTypes].sort();
-        const sortedCompanies = [...companies].sort();
-        const sortedCities = [...cities].sort();
-        
-        // Add options to the filters
-        sortedJobTypes.forEach(jobType => {
-            const option = document.createElement('option');
-            option.value = jobType;
-            option.textContent = jobType;
-            jobTypeFilter.appendChild(option);
-        });
-        
-        sortedCompanies.forEach(company => {
-            const option = document.createElement('option');
-            option.value = company;
-            option.textContent = company;
-            companyFilter.appendChild(option);
-        });
-        
-        sortedCities.forEach(city => {
-            const option = document.createElement('option');
-            option.value = city;
-            option.textContent = city;
-            cityFilter.appendChild(option);
-        });
-    }
-    
-    function filterResultsByText(query) {
-        const items = document.querySelectorAll('.job-result-item');
-        
-        items.forEach(item => {
-            const title = item.getAttribute('data-title') || '';
-            const company = item.getAttribute('data-company') || '';
-            const location = item.getAttribute('data-location') || '';
-            
-            if (title.includes(query) || company.includes(query) || location.includes(query)) {
-                item.style.display = 'block';
-            } else {
-                item.style.display = 'none';
-            }
-        });
-        
-        // Update visible count
-        updateVisibleCount();
-    }
-    
-    function applyAdvancedFilters() {
-        const jobType = document.getElementById('filter-job-type').value;
-        const company = document.getElementById('filter-company').value;
-        const city = document.getElementById('filter-city').value;
-        const source = document.getElementById('filter-source').value;
-        const international = document.getElementById('filter-international').checked;
-        const closingFrom = document.getElementById('filter-closing-from').value;
-        const closingTo = document.getElementById('filter-closing-to').value;
-        
-        const items = document.querySelectorAll('.job-result-item');
-        
-        items.forEach(item => {
-            let visible = true;
-            
-            // Filter by job type
-            if (jobType && !itemMatches(item, 'data-job-type', jobType, true)) {
-                visible = false;
-            }
-            
-            // Filter by company
-            if (company && !itemMatches(item, 'data-company', company, false)) {
-                visible = false;
-            }
-            
-            // Filter by city
-            if (city && !itemContains(item, 'data-location', city)) {
-                visible = false;
-            }
-            
-            // Filter by source
-            if (source && !itemMatches(item, 'data-source', source, true)) {
-                visible = false;
-            }
-            
-            // Filter by international
-            if (international && !itemMatches(item, 'data-international', 'yes', false)) {
-                visible = false;
-            }
-            
-            // Filter by closing date range
-            const closingDate = item.getAttribute('data-closing-date');
-            if (closingDate) {
-                if (closingFrom && closingDate < closingFrom) {
-                    visible = false;
-                }
-                if (closingTo && closingDate > closingTo) {
-                    visible = false;
-                }
-            }
-            
-            // Apply visibility
-            item.style.display = visible ? 'block' : 'none';
+    function populateFilterOptions(facets) {
+        // Fill the dropdowns with the values the server found, keeping the current selections
+        const filters = [
+            [document.getElementById('filter-job-type'), 'All Types', facets.job_type],
+            [document.getElementById('filter-company'), 'All Companies', facets.company],
+            [document.getElementById('filter-city'), 'All Cities', facets.city],
+            [document.getElementById('filter-source'), 'All Sources', facets.source],
+        ];
+        
+        filters.forEach(([select, allLabel, values]) => {
+            const selected = select.value;
+            select.innerHTML = `<option value="">${allLabel}</option>`;
+            (values || []).forEach(value => {
+                const option = document.createElement('option');
+                option.value = value;
+                option.textContent = value;
+                select.appendChild(option);
+            });
+            select.value = (values || []).includes(selected) ? selected : '';
         });
-        
-        // Update visible count
-        updateVisibleCount();
-    }
-    
-    // Helper function to check if item attribute matches value exactly
-    function itemMatches(item, attribute, value, exactMatch) {
-        const attrValue = item.getAttribute(attribute) || '';
-        if (exactMatch) {
-            return attrValue.toLowerCase() === value.toLowerCase();
-        } else {
-            return attrValue.toLowerCase().includes(value.toLowerCase());
-        }
-    }
-    
-    // Helper function to check if item attribute contains value
-    function itemContains(item, attribute, value) {
-        const attrValue = item.getAttribute(attribute) || '';
-        return attrValue.toLowerCase().includes(value.toLowerCase());
     }
     
     function resetAdvancedFilters() {
@@ -545,24 +684,9 @@ document.addEventListener('DOMContentLoaded', function() {
         document.getElementById('filter-international').checked = false;
         document.getElementById('filter-closing-from').value = '';
         document.getElementById('filter-closing-to').value = '';
+        resultFilter.value = '';
         
-        // Show all job items
-        const items = document.querySelectorAll('.job-result-item');
-        items.forEach(item => {
-            item.style.display = 'block';
-        });
-        
-        // Update visible count
-        updateVisibleCount();
-    }
-    
-    // Update the count of visible jobs after filtering
-    function updateVisibleCount() {
-        const countElem = resultsContainer.querySelector('.results-count p');
-        if (countElem) {
-            const visibleCount = document.querySelectorAll('.job-result-item[style="display: block;"], .job-result-item:not([style*="display"])').length;
-            countElem.textContent = `Showing ${visibleCount} of ${allJobs.length} jobs`;
-        }
+        loadResults();
     }
     
     function displayError(message) {
@@ -584,33 +708,19 @@ document.addEventListener('DOMContentLoaded', function() {
         sortControls.innerHTML = `
             <label for="sort-jobs">Sort by:</label>
             <select id="sort-jobs" class="form-select">
+                <option value="position">Order Found</option>
+                <option value="relevance">Best Match</option>
                 <option value="closing-soon">Closing Soon</option>
                 <option value="closing-later">Closing Later</option>
+                <option value="newest">Newest</option>
             </select>
         `;
         
         resultsCount.appendChild(sortControls);
         
-        // Add event listener for sorting
-        document.getElementById('sort-jobs').addEventListener('change', function(e) {
-            const sortBy = e.target.value;
-            const jobItems = document.querySelectorAll('.job-result-item');
-            const jobArray = Array.from(jobItems);
-            
-            jobArray.sort((a, b) => {
-                switch(sortBy) {
-                    case 'closing-soon':
-                        return new Date(a.getAttribute('data-closing-date')) - new Date(b.getAttribute('data-closing-date'));
-                    case 'closing-later':
-                        return new Date(b.getAttribute('data-closing-date')) - new Date(a.getAttribute('data-closing-date'));
-                    default:
-                        return 0;
-                }
-            });
-            
-            // Re-append sorted items
-            const resultsContainer = document.getElementById('results-container');
-            jobArray.forEach(item => resultsContainer.appendChild(item));
+        // Sorting is done by the server
+        document.getElementById('sort-jobs').addEventListener('change', function() {
+            loadResults();
         });
     }
 }); 
\ No newline at end of file
@@ -0,0 +1,53 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import job_archive  # noqa: E402
+
+
+@unittest.skipIf(job_archive.pa is None, "pyarrow is not installed")
+class JobArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='jobscrape-archive-')
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def save(self, jobs):
+        return job_archive.save_jobs(jobs, 'graduate-jobs', 'computer-science', root=self.root)
+
+    def load(self, **kwargs):
+        return job_archive.load_jobs('graduate-jobs', 'computer-science', root=self.root, **kwargs)
+
+    def test_saving_a_link_twice_keeps_the_newest_row(self):
+        self.save([{'title': 'Graduate Engineer', 'link': 'https://example.com/1'}])
+        self.save([{'title': 'Graduate Software Engineer', 'link': 'https://example.com/1'}])
+
+        self.assertEqual(self.load(), [{'title': 'Graduate Software Engineer', 'link': 'https://example.com/1'}])
+
+        job_archive.compact('graduate-jobs', 'computer-science', root=self.root)
+        self.assertEqual(len(job_archive._parts(job_archive.partition_dir('graduate-jobs', 'computer-science', self.root))), 1)
+        self.assertEqual(self.load(), [{'title': 'Graduate Software Engineer', 'link': 'https://example.com/1'}])
+
+    def test_imported_rows_are_keyed_on_their_link_column(self):
+        self.save([{'Program Title': 'Graduate Engineer', 'Link': 'https://example.com/1'}])
+        self.save([{'title': 'Graduate Software Engineer', 'link': 'https://example.com/1'}])
+
+        jobs = self.load()
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual(jobs[0]['title'], 'Graduate Software Engineer')
+
+    def test_partition_columns_only_when_asked_for(self):
+        self.save([{'title': 'Graduate Engineer', 'link': 'https://example.com/1'}])
+
+        self.assertNotIn('job_level', self.load()[0])
+        self.assertEqual(self.load(columns=['title', 'job_level']),
+                         [{'title': 'Graduate Engineer', 'job_level': 'graduate-jobs'}])
+
+
+if __name__ == '__main__':
+    unittest.main()